@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+完了済みアイテムのアーカイブのベンチマーク
+Auto-save cost with a long completed history, with and without CompletedArchive.
+
+完了済みアイテムの履歴が HISTORY 件あるリスト（未完了 ITEMS 件）で、アイテムの追加と
+完了を OPERATIONS 回繰り返したときの1回あたりの時間と保存ファイルの大きさを、
+アーカイブなし・あり（recent_completed=100）で比較します。
+あわせて、アーカイブを含む履歴の completed_page() の時間を表示します。
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import shopping_backend  # noqa: E402
+from shopping_archive import CompletedArchive  # noqa: E402
+from shopping_item import ShoppingItem  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+ITEMS = 100
+HISTORY = 50000
+OPERATIONS = 20
+PAGES = [1, 100, 400]
+
+
+def write_list(filename):
+    """履歴が HISTORY 件（2年分）のリストファイルを作成"""
+    start = datetime(2024, 1, 1).timestamp()
+    step = timedelta(days=730).total_seconds() / HISTORY
+    completed = [ShoppingItem(i + 1, f"履歴{i}", i % 3 + 1, 98 + i % 400,
+                              start + i * step, start + i * step) for i in range(HISTORY)]
+    items = [ShoppingItem(HISTORY + i + 1, f"アイテム{i}", 1, 198) for i in range(ITEMS)]
+    shopping_backend.write_file(filename, (items, completed, HISTORY + ITEMS + 1, 0))
+
+
+def run_operations(shopping):
+    """アイテムの追加と完了を OPERATIONS 回繰り返し、1回あたりの秒数を返す"""
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        shopping.add_item(f"追加{i}", 1, 298)
+        shopping.complete_item(0)
+    return (time.perf_counter() - start) / (2 * OPERATIONS)
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print(f"完了済み {HISTORY}件・未完了 {ITEMS}件のリストで追加と完了を{OPERATIONS}回")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, archived in (("アーカイブなし", False), ("アーカイブあり", True)):
+            filename = os.path.join(tmp, f"{label}.json")
+            write_list(filename)
+            archive = CompletedArchive(filename + ".archive") if archived else None
+            shopping = ShoppingList(filename, archive=archive)
+            shopping.compact()  # 既存の履歴をアーカイブに移す（アーカイブありの場合）
+            elapsed = run_operations(shopping)
+            size = os.path.getsize(filename) / 1024
+            print(f"{label:>10}: {elapsed * 1e3:.2f}ms/回 ファイル {size:.0f}KB "
+                  f"メモリ上の完了済み {len(shopping.get_completed_items())}件")
+            if archived:
+                for page in PAGES:
+                    start = time.perf_counter()
+                    result = shopping.completed_page(page, per_page=50)
+                    elapsed = time.perf_counter() - start
+                    print(f"{'':>10}  completed_page({page}/{result.pages}): "
+                          f"{elapsed * 1e3:.2f}ms")
+            shopping.close()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+バッチモードのベンチマーク
+Benchmark of the batch command mode against scripting the interactive menu.
+
+同じ件数のアイテム追加を、対話メニューへのキー入力のパイプと
+バッチモード（--batch -）でそれぞれ実行し、1秒あたりのコマンド数を比較します。
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                   "shopping_calculator.py")
+
+COMMANDS = [2000, 20000]
+INTERACTIVE_LIMIT = 2000  # 対話メニューは1件ごとに保存するため件数を抑える
+
+
+def measure(script, args, count):
+    """アプリケーションに script を標準入力から渡し、1秒あたりのコマンド数を返す"""
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, APP, "--list", os.path.join(tmp, "bench.json")] + args,
+                       input=script.encode('utf-8'), stdout=subprocess.DEVNULL, check=False)
+        return count / (time.perf_counter() - start)
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print(f"{'件数':>8} {'対話メニュー(件/秒)':>18} {'バッチ(件/秒)':>14}")
+    for count in COMMANDS:
+        batch = "".join(f"add item{i} 1 100\n" for i in range(count))
+        interactive = "-"
+        if count <= INTERACTIVE_LIMIT:
+            keys = "2\n" + "".join(f"1\nitem{i}\n1\n100\n" for i in range(count)) + "6\n5\n"
+            interactive = f"{measure(keys, [], count):.0f}"
+        print(f"{count:>8} {interactive:>18} {measure(batch, ['--batch', '-'], count):>14.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数式計算のマイクロベンチマーク
+Micro-benchmark comparing the compiled expression engine with plain eval(),
+row-wise calculate_expression() with column-wise evaluate_many(), the result
+cache for repeated expressions, and calculate_many() with shared subexpressions.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import expression  # noqa: E402
+from calculator import Calculator  # noqa: E402
+from shopping_money import MoneyMode  # noqa: E402
+
+EXPRESSIONS = [
+    "298 * 1.08",
+    "(100 + 200 + 150) * 1.08",
+    "((1280 - 128) * 3 + 298 % 7) / 2 ** 3",
+]
+NUMBER = 20000
+ROWS = 100000
+
+# 共通の部分式（小計）を持つダッシュボードの式
+SUBTOTAL = "(p1 * q1 + p2 * q2 + p3 * q3 - discount)"
+DASHBOARD = [
+    f"{SUBTOTAL} * 1.08",
+    f"{SUBTOTAL} * 0.08",
+    f"{SUBTOTAL} * 1.08 - budget",
+    f"p1 * q1 / {SUBTOTAL}",
+    f"p2 * q2 / {SUBTOTAL}",
+    f"p3 * q3 / {SUBTOTAL}",
+]
+DASHBOARD_VARIABLES = {'p1': 298, 'q1': 3, 'p2': 158.5, 'q2': 2, 'p3': 1280, 'q3': 1,
+                       'discount': 50, 'budget': 3000}
+
+
+def repeated_expressions():
+    """同じ定数式を繰り返し計算し、金額モードの結果のキャッシュの有無で比較"""
+    print(f"\n同じ式の繰り返し（{NUMBER}回、1回あたりus）")
+    print(f"{'式':<40} {'通常':>8} {'金額':>8} {'金額(キャッシュ)':>16}")
+    for expr in EXPRESSIONS:
+        times = []
+        for money, cache_size in ((None, 0), (MoneyMode(), 0), (MoneyMode(), 1024)):
+            calc = Calculator(history_limit=0, money=money, cache_size=cache_size)
+            times.append(timeit.timeit(lambda: calc.calculate_expression(expr), number=NUMBER))
+        print(f"{expr:<40} {times[0] / NUMBER * 1e6:>8.2f} {times[1] / NUMBER * 1e6:>8.2f} "
+              f"{times[2] / NUMBER * 1e6:>16.2f}")
+    print(f"  {calc.cache_info()}")
+
+
+def shared_subexpressions():
+    """共通の部分式を持つ式を1つずつ計算する場合と calculate_many() を比較"""
+    print(f"\n共通の部分式を持つ{len(DASHBOARD)}個の式（{NUMBER}回、1回あたりus）")
+    calc = Calculator(history_limit=0, cache_size=0)
+    one_by_one = timeit.timeit(
+        lambda: [calc.calculate_expression(expr, DASHBOARD_VARIABLES) for expr in DASHBOARD],
+        number=NUMBER)
+    batch = timeit.timeit(lambda: calc.calculate_many(DASHBOARD, DASHBOARD_VARIABLES),
+                          number=NUMBER)
+    cached = Calculator(history_limit=0)
+    memoized = timeit.timeit(lambda: cached.calculate_many(DASHBOARD, DASHBOARD_VARIABLES),
+                             number=NUMBER)
+    print(f"  1つずつ calculate_expression: {one_by_one / NUMBER * 1e6:.2f}")
+    print(f"  calculate_many: {batch / NUMBER * 1e6:.2f} ({one_by_one / batch:.1f}倍)")
+    print(f"  calculate_many（同じ値、キャッシュあり）: {memoized / NUMBER * 1e6:.2f} "
+          f"({one_by_one / memoized:.1f}倍)")
+    print(f"  {cached.cache_info()}")
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print(f"{'式':<40} {'eval(us)':>10} {'コンパイル済み(us)':>18}")
+    for expr in EXPRESSIONS:
+        baseline = timeit.timeit(lambda: eval(expr), number=NUMBER)
+        compiled = timeit.timeit(lambda: expression.evaluate(expr), number=NUMBER)
+        print(f"{expr:<40} {baseline / NUMBER * 1e6:>10.2f} {compiled / NUMBER * 1e6:>18.2f}")
+    print(f"キャッシュ: {expression.compile_expression.cache_info()}")
+
+    calc = Calculator()
+    columns = {
+        'price': [float(i % 500) for i in range(ROWS)],
+        'qty': [i % 5 + 1 for i in range(ROWS)],
+        'discount': [10] * ROWS,
+    }
+    rows = list(zip(columns['price'], columns['qty'], columns['discount']))
+    sample = rows[:ROWS // 10]
+    row_wise = timeit.timeit(
+        lambda: [calc.calculate_expression(f"{p} * {q} * 1.08 - {d}") for p, q, d in sample],
+        number=1) * (ROWS / len(sample))
+    print(f"\n{ROWS}行の価格計算 (price * qty * 1.08 - discount)")
+    print(f"  1行ずつ calculate_expression: {row_wise:.3f}秒（推定）")
+    for use_numpy in (False, True):
+        if use_numpy and expression.numpy is None:
+            print("  evaluate_many (NumPy): NumPy未インストールのためスキップ")
+            continue
+        elapsed = timeit.timeit(
+            lambda: calc.evaluate_many("price * qty * 1.08 - discount", columns, use_numpy),
+            number=1)
+        label = "NumPy" if use_numpy else "Python"
+        print(f"  evaluate_many ({label}): {elapsed:.3f}秒 ({row_wise / elapsed:.0f}倍)")
+
+    repeated_expressions()
+    shared_subexpressions()
+
+
+if __name__ == "__main__":
+    run_benchmark()
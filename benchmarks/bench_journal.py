@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ジャーナル保存モードのベンチマーク
+Benchmark comparing full-file auto-save with journaled auto-save.
+
+リストのサイズが大きくなっても、ジャーナルモードでは
+1回の変更あたりのコストがほぼ一定であることを確認します。
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_list import ShoppingList  # noqa: E402
+
+SIZES = [1000, 5000, 20000]
+SAMPLES = 200
+
+
+def measure(size, journal):
+    """size件のリストに対する add_item 1回あたりの平均時間（ミリ秒）を計測"""
+    with tempfile.TemporaryDirectory() as tmp:
+        shopping = ShoppingList(os.path.join(tmp, "bench.json"), journal=journal,
+                                compact_threshold=10 ** 9)
+        shopping.add_items((f"item{i}", 1, 100) for i in range(size))
+        shopping.compact()
+
+        start = time.perf_counter()
+        for i in range(SAMPLES):
+            shopping.add_item(f"new{i}", 1, 100)
+        elapsed = time.perf_counter() - start
+    return elapsed / SAMPLES * 1000
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print(f"{'件数':>8} {'全体保存(ms)':>14} {'ジャーナル(ms)':>14}")
+    for size in SIZES:
+        full = measure(size, journal=False)
+        journaled = measure(size, journal=True)
+        print(f"{size:>8} {full:>14.3f} {journaled:>14.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
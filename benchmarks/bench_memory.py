@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+アイテム表現のメモリベンチマーク
+Memory benchmark comparing dict-based items with slotted ShoppingItem records.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_item import ShoppingItem  # noqa: E402
+
+SIZES = [10000, 100000, 1000000]
+
+
+def build_dicts(size):
+    """従来の辞書形式のアイテムを作成"""
+    return [
+        {
+            'name': f"item{i}",
+            'quantity': 1,
+            'price': 100,
+            'added_date': time.strftime("%Y-%m-%d %H:%M"),
+        }
+        for i in range(size)
+    ]
+
+
+def build_records(size):
+    """ShoppingItem形式のアイテムを作成"""
+    now = time.time()
+    return [ShoppingItem(i, f"item{i}", 1, 100, now) for i in range(size)]
+
+
+def measure(builder, size):
+    """builder で size 件作成したときのメモリ使用量（バイト）を計測"""
+    tracemalloc.start()
+    items = builder(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print(f"{'件数':>10} {'辞書(MB)':>10} {'ShoppingItem(MB)':>18} {'削減率':>8}")
+    for size in SIZES:
+        dicts = measure(build_dicts, size)
+        records = measure(build_records, size)
+        print(f"{size:>10} {dicts / 2**20:>10.1f} {records / 2**20:>18.1f} "
+              f"{1 - records / dicts:>8.0%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
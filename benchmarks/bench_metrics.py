@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+計測のオーバーヘッドのベンチマーク
+Overhead of the shopping_metrics instrumentation, disabled vs enabled.
+
+計測の有効・無効はモジュールの読み込み時に決まるため、SHOPPING_METRICS の有無を
+変えた子プロセスで同じ処理（式計算・ジャーナル保存モードでのアイテム追加）を実行し、
+1回あたりの時間を比較します。
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+CALCULATIONS = 100000
+ADDS = 5000
+
+# 子プロセスで実行する計測（1回あたりのマイクロ秒を出力）
+WORKLOAD = f"""
+import os, sys, time
+sys.path.insert(0, {ROOT!r})
+from calculator import Calculator
+from shopping_list import ShoppingList
+
+calculator = Calculator(history_limit=0)
+start = time.perf_counter()
+for i in range({CALCULATIONS}):
+    calculator.calculate_expression("298 * 3 + 158")
+print((time.perf_counter() - start) / {CALCULATIONS} * 1e6)
+
+shopping = ShoppingList(os.path.join(sys.argv[1], "bench.json"), journal=True)
+start = time.perf_counter()
+for i in range({ADDS}):
+    shopping.add_item("item", 1, 100)
+print((time.perf_counter() - start) / {ADDS} * 1e6)
+"""
+
+
+def measure(metrics):
+    """子プロセスで計測し、(式計算, アイテム追加) の1回あたりのマイクロ秒を返す"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.pop("SHOPPING_METRICS", None)
+        if metrics:
+            env["SHOPPING_METRICS"] = os.path.join(tmp, "metrics.json")
+        output = subprocess.run([sys.executable, "-c", WORKLOAD, tmp], env=env,
+                                capture_output=True, text=True, check=True).stdout
+    return [float(value) for value in output.split()]
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print("1回あたりの時間（マイクロ秒）")
+    print(f"{'計測':>6} {'式計算':>10} {'アイテム追加':>12}")
+    for label, metrics in (("無効", False), ("有効", True)):
+        calculate, add = measure(metrics)
+        print(f"{label:>6} {calculate:>10.2f} {add:>12.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+金額モードのベンチマーク
+Money arithmetic on 1,000,000 line items: float vs decimal vs integer minor units.
+
+ITEMS 件の明細（価格 × 数量）の合計と、行ごとに切り捨てた消費税の合計を
+浮動小数点数・Decimal（明細ごとに quantize）・MoneyMode（最小単位の整数）で計算し、
+時間と結果を比較します。浮動小数点数の結果は誤差を含むことがあります。
+あわせて Calculator の式計算を通常モードと金額モードで比較します。
+"""
+
+import os
+import sys
+import time
+from decimal import ROUND_FLOOR, ROUND_HALF_EVEN, Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from calculator import Calculator  # noqa: E402
+from shopping_money import FLOOR, MoneyMode, TaxRule  # noqa: E402
+
+ITEMS = 1000000
+PRICES = [98, 158, 1.1, 298, 0.3, 49.8, 1280, 12.34]
+TAX_RATE = "0.10"
+CALCULATIONS = 100000
+EXPRESSION = "298 * 1.08 + 158 * 3"
+
+
+def line_items():
+    """ITEMS 件の (価格, 数量) の組を作成"""
+    return [(PRICES[i % len(PRICES)], i % 4 + 1) for i in range(ITEMS)]
+
+
+def with_float(items):
+    """浮動小数点数で合計と行ごとの税額（切り捨て）を計算"""
+    rate = float(TAX_RATE)
+    total = tax = 0.0
+    for price, quantity in items:
+        amount = price * quantity
+        total += amount
+        tax += int(amount * rate)
+    return total, tax
+
+
+def with_decimal(items):
+    """Decimalで明細ごとに銭単位に丸めて合計と行ごとの税額（切り捨て）を計算"""
+    rate = Decimal(TAX_RATE)
+    cent, yen = Decimal("0.01"), Decimal(1)
+    total = tax = Decimal(0)
+    for price, quantity in items:
+        amount = (Decimal(str(price)) * quantity).quantize(cent, ROUND_HALF_EVEN)
+        total += amount
+        tax += (amount * rate).quantize(yen, ROUND_FLOOR)
+    return total, tax
+
+
+def with_money(items):
+    """MoneyMode（最小単位の整数）で合計と行ごとの税額（切り捨て）を計算"""
+    money = MoneyMode(digits=2, tax=TaxRule(TAX_RATE, FLOOR, per_line=True))
+    amount = money.amount
+    result = money.totals([amount(price, quantity) for price, quantity in items])
+    return result.subtotal, result.tax
+
+
+def timed(function, *args):
+    """関数を実行し、(経過秒, 戻り値) を返す"""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    items = line_items()
+    print(f"{ITEMS}件の明細（税率{TAX_RATE}、行ごとに切り捨て）")
+    baseline = None
+    for label, function in (("float", with_float), ("decimal", with_decimal),
+                            ("整数（MoneyMode）", with_money)):
+        elapsed, (total, tax) = timed(function, items)
+        baseline = baseline or elapsed
+        print(f"{label:>18}: {elapsed:.2f}秒 ({elapsed / baseline:.1f}倍) "
+              f"合計 {total} 税額 {tax}")
+
+    print(f"\n式計算 {EXPRESSION!r} を{CALCULATIONS}回")
+    for label, calculator in (("通常", Calculator(history_limit=0)),
+                              ("金額モード", Calculator(history_limit=0, money=MoneyMode()))):
+        start = time.perf_counter()
+        for _ in range(CALCULATIONS):
+            result = calculator.calculate_expression(EXPRESSION)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>18}: {elapsed / CALCULATIONS * 1e6:.2f}µs/回 結果 {result}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
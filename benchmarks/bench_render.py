@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+出力レンダラーのベンチマーク
+Benchmark of the streaming renderers and buffered writes.
+
+100万件のアイテムを各形式で出力し、1行ずつ write() する場合と
+write_lines() でまとめて書き込む場合の時間と、メモリ使用量のピークを比較します。
+アイテムはジェネレータで作成するため、メモリ使用量は件数によらず一定になります。
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_item import ShoppingItem  # noqa: E402
+from shopping_render import RENDERERS, write_lines  # noqa: E402
+
+SIZE = 1_000_000
+
+
+def generate_items(count):
+    """count件のアイテムを1件ずつ作成"""
+    for i in range(count):
+        yield ShoppingItem(i + 1, f"item{i}", i % 5 + 1, (i % 300) + 0.5 if i % 7 else None,
+                           1700000000.0)
+
+
+def render_to_file(format, buffered):
+    """SIZE件を一時ファイルに出力し、かかった時間（秒）を返す"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "out"), 'w', encoding='utf-8') as f:
+            start = time.perf_counter()
+            lines = RENDERERS[format](generate_items(SIZE), ())
+            if buffered:
+                write_lines(lines, f)
+            else:
+                for line in lines:
+                    f.write(line + "\n")
+            return time.perf_counter() - start
+
+
+def measure_peak(format):
+    """write_lines() で出力した場合のメモリ使用量のピーク（MB）を計測"""
+    tracemalloc.start()
+    render_to_file(format, buffered=True)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return peak
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print(f"{SIZE}件の出力")
+    print(f"{'形式':<10} {'1行ずつ(秒)':>12} {'まとめて(秒)':>12} {'ピーク(MB)':>10}")
+    for format in RENDERERS:
+        per_line = render_to_file(format, buffered=False)
+        buffered = render_to_file(format, buffered=True)
+        print(f"{format:<10} {per_line:>12.2f} {buffered:>12.2f} {measure_peak(format):>10.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
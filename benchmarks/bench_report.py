@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数リストの集計のベンチマーク
+Benchmark of shopping_report.aggregate() against loading lists one by one.
+
+LISTS 個のリストファイル（各 ITEMS 件）を作成し、ShoppingList.load_from_file() と
+calculate_total() を1つずつ繰り返す従来の方法と、aggregate() のワーカー数を変えた場合の
+集計時間を比較します。ワーカー数はCPUの数まで2倍ずつ増やします。
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import shopping_backend  # noqa: E402
+from shopping_item import ShoppingItem  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+from shopping_report import aggregate  # noqa: E402
+
+LISTS = 2000
+ITEMS = 200
+NAMES = ["りんご", "牛乳", "食パン", "卵", "バナナ", "豆腐", "納豆", "緑茶"]
+
+
+def write_lists(directory):
+    """LISTS 個のリストファイルを作成し、ファイル名のリストを返す"""
+    filenames = []
+    for n in range(LISTS):
+        items = [ShoppingItem(i + 1, NAMES[(n + i) % len(NAMES)], i % 3 + 1, 98 + (n * i) % 400)
+                 for i in range(ITEMS)]
+        completed = [item.completed() for item in items[:n % ITEMS]]
+        filename = os.path.join(directory, f"list{n}.json")
+        shopping_backend.write_file(filename, (items[n % ITEMS:], completed, ITEMS + 1, 0))
+        filenames.append(filename)
+    return filenames
+
+
+def load_one_by_one(directory, filenames):
+    """ShoppingList で1つずつ読み込んで合計金額を求める（従来の方法）"""
+    shopping = ShoppingList(os.path.join(directory, "scratch.json"))
+    total = 0
+    for filename in filenames:
+        shopping.load_from_file(filename)
+        total += shopping.calculate_total()
+    return total
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        filenames = write_lists(tmp)
+        print(f"{LISTS}個のリスト（各{ITEMS}件）、CPU {cpus}個")
+
+        start = time.perf_counter()
+        load_one_by_one(tmp, filenames)
+        baseline = time.perf_counter() - start
+        print(f"{'load_from_file を1つずつ':>24}: {baseline:.2f}秒")
+
+        workers = 1
+        while True:
+            start = time.perf_counter()
+            aggregate(filenames, workers)
+            elapsed = time.perf_counter() - start
+            print(f"{f'aggregate(workers={workers})':>24}: {elapsed:.2f}秒 "
+                  f"({baseline / elapsed:.1f}倍)")
+            if workers >= cpus:
+                break
+            workers = min(workers * 2, cpus)
+
+
+if __name__ == "__main__":
+    run_benchmark()
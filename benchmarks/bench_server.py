@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+買い物リストサーバーの負荷テスト
+Load test measuring requests/sec of the JSON line-protocol server.
+
+shopping_server.py を別プロセスで起動し、同時接続数を変えながら各接続から
+要求を1件ずつ送って応答を待つ操作を繰り返し、1秒あたりの処理件数を計測します。
+要求はアイテムの追加・合計金額の取得・式計算の組み合わせで、リストは LISTS 個に分散させます。
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+REQUESTS = 20000
+CONCURRENCY = [1, 10, 100]
+LISTS = 10
+
+
+def free_port():
+    """空いているTCPポートを取得"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def requests_for(client, count):
+    """client 番目の接続が送る要求（JSON行）を作成"""
+    lines = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            request = {"method": "add_item",
+                       "params": {"item": f"c{client}-{i}", "quantity": 1, "price": 100,
+                                  "list": f"list{client % LISTS}"}}
+        elif kind == 1:
+            request = {"method": "calculate_total", "params": {"list": f"list{client % LISTS}"}}
+        else:
+            request = {"method": "calculate", "params": {"expression": "298 * 3 + 158"}}
+        request["id"] = i
+        lines.append(json.dumps(request).encode() + b"\n")
+    return lines
+
+
+async def client(port, lines):
+    """要求を1件ずつ送り、応答を待つ"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for line in lines:
+        writer.write(line)
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        assert "result" in response, response
+    writer.close()
+
+
+async def load(port, concurrency):
+    """concurrency 個の接続から合計 REQUESTS 件の要求を送り、1秒あたりの件数を返す"""
+    per_client = REQUESTS // concurrency
+    batches = [requests_for(n, per_client) for n in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, lines) for lines in batches))
+    return per_client * concurrency / (time.perf_counter() - start)
+
+
+def run(option):
+    """サーバーを起動して各同時接続数で計測
+
+    Args:
+        option (str): リストの保存方法を指定するサーバーのオプション
+
+    Returns:
+        list: 同時接続数ごとの1秒あたりの処理件数
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        command = [sys.executable, os.path.join(ROOT, "shopping_server.py"),
+                   "--port", str(port), "--directory", tmp, option]
+        server = subprocess.Popen(command, stderr=subprocess.PIPE)
+        try:
+            server.stderr.readline()  # 待ち受け開始のメッセージ
+            return [asyncio.run(load(port, concurrency)) for concurrency in CONCURRENCY]
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def run_benchmark():
+    """負荷テストを実行して結果を表示"""
+    print(f"合計 {REQUESTS} 件の要求（追加・合計金額・式計算）、1秒あたりの処理件数")
+    print(f"{'同時接続数':>10} " + " ".join(f"{n:>10}" for n in CONCURRENCY))
+    for label, option in (("ジャーナル", "--journal"), ("書き込み遅延", "--write-behind")):
+        print(f"{label:>10} " + " ".join(f"{rate:>10.0f}" for rate in run(option)))
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+スナップショット形式のベンチマーク
+Benchmark comparing the JSON snapshot with the columnar binary snapshot.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_columnar import ColumnarSnapshot  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+SIZE = 200000
+
+
+def timed(function):
+    """関数の実行時間（秒）と戻り値を返す"""
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    with tempfile.TemporaryDirectory() as tmp:
+        shopping = ShoppingList(os.path.join(tmp, "source.slc"), journal=True,
+                                compact_threshold=10 ** 9)
+        shopping.add_items((f"item{i % 1000}", i % 5 + 1, i % 300) for i in range(SIZE))
+
+        print(f"{SIZE}件のリスト")
+        print(f"{'形式':<8} {'保存(秒)':>10} {'読み込み(秒)':>12} {'サイズ(MB)':>11}")
+        for extension in (".json", ".slc"):
+            filename = os.path.join(tmp, "bench" + extension)
+            save_time, _ = timed(lambda: shopping.save_to_file(filename))
+            load_time, _ = timed(lambda: ShoppingList(filename))
+            size = os.path.getsize(filename) / 2 ** 20
+            print(f"{extension:<8} {save_time:>10.3f} {load_time:>12.3f} {size:>11.1f}")
+
+        def open_and_total():
+            with ColumnarSnapshot(os.path.join(tmp, "bench.slc")) as snapshot:
+                return snapshot.total()
+
+        elapsed, total = timed(open_and_total)
+        print(f"\n.slc を mmap で開いて合計金額を計算: {elapsed:.3f}秒 (¥{total:.0f})")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite保存先のベンチマーク
+Benchmark of the SQLite backend: auto-save latency and pushed-down queries.
+
+リストのサイズごとに add_item 1回あたりの自動保存の時間を、JSONファイル（全体保存・
+ジャーナル）とSQLiteBackend で比較します。続いて、読み込み前のリストに対する
+合計金額・期間内の完了アイテムの取得を、リスト全体を読み込む場合と比較します。
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_backend import SQLiteBackend  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+SIZES = [1000, 10000, 100000]
+SAMPLES = 200
+QUERY_SIZE = 100000
+DAY = 24 * 60 * 60
+
+
+def open_list(tmp, kind):
+    """kind（'json'・'journal'・'sqlite'）に応じた保存先のリストを開く"""
+    if kind == 'sqlite':
+        return ShoppingList(backend=SQLiteBackend(os.path.join(tmp, "bench.db")))
+    return ShoppingList(os.path.join(tmp, "bench.json"), journal=(kind == 'journal'),
+                        compact_threshold=10 ** 9)
+
+
+def measure_save(size, kind):
+    """size件のリストに対する add_item 1回あたりの平均時間（ミリ秒）を計測"""
+    # 全体保存は1回ごとにファイル全体を書き直すため、大きいリストでは回数を減らす
+    samples = SAMPLES if kind != 'json' else max(5, SAMPLES * 1000 // size)
+    with tempfile.TemporaryDirectory() as tmp:
+        shopping = open_list(tmp, kind)
+        shopping.add_items((f"item{i}", 1, 100) for i in range(size))
+        shopping.compact()
+
+        start = time.perf_counter()
+        for i in range(samples):
+            shopping.add_item(f"new{i}", 1, 100)
+        elapsed = time.perf_counter() - start
+        shopping.close()
+    return elapsed / samples * 1000
+
+
+def measure_queries(tmp, kind):
+    """読み込み前のリストに対する合計金額・1日分の完了アイテムの取得時間（ミリ秒）"""
+    results = []
+    start_day = datetime.now() - timedelta(days=180)
+    for query in (lambda shopping: shopping.calculate_total(),
+                  lambda shopping: shopping.completed_between(start_day,
+                                                              start_day + timedelta(days=1))):
+        shopping = open_list(tmp, kind)
+        start = time.perf_counter()
+        query(shopping)
+        results.append((time.perf_counter() - start) * 1000)
+        shopping.close()
+    return results
+
+
+def prepare_queries(tmp, kind):
+    """QUERY_SIZE 件の未完了アイテムと、1年間に分散した同数の完了アイテムを保存"""
+    shopping = open_list(tmp, kind)
+    now = time.time()
+    with shopping.batch():
+        shopping.add_items((f"item{i}", i % 5 + 1, 98 + i % 300) for i in range(QUERY_SIZE * 2))
+        for i, item in enumerate(list(shopping.get_items())[:QUERY_SIZE]):
+            shopping.complete_by_id(item.id, completed_at=now - i * 365 * DAY / QUERY_SIZE)
+    shopping.close()
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print("add_item 1回あたりの自動保存（ms）")
+    print(f"{'件数':>8} {'全体保存':>10} {'ジャーナル':>10} {'SQLite':>10}")
+    for size in SIZES:
+        times = [measure_save(size, kind) for kind in ('json', 'journal', 'sqlite')]
+        print(f"{size:>8} " + " ".join(f"{t:>10.3f}" for t in times))
+
+    print(f"\n読み込み前のリスト（未完了・完了済み各{QUERY_SIZE}件）に対する問い合わせ（ms）")
+    print(f"{'保存先':>10} {'合計金額':>10} {'1日分の完了':>12}")
+    for kind in ('journal', 'sqlite'):
+        with tempfile.TemporaryDirectory() as tmp:
+            prepare_queries(tmp, kind)
+            total, completed = measure_queries(tmp, kind)
+        label = "ジャーナル" if kind == 'journal' else "SQLite"
+        print(f"{label:>10} {total:>10.2f} {completed:>12.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動時間とストリーミング出力のベンチマーク
+Benchmark for lazy startup and streaming export with a large (~50 MB) list file.
+
+最初に、アプリケーションを別プロセスで起動してメニューから終了するまでの時間
+（コールドスタート）を、何もしない Python の起動時間と比較します。
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from shopping_calculator import ShoppingCalculatorApp  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+TARGET_BYTES = 50 * 2 ** 20
+STARTUP_RUNS = 20
+
+
+def write_large_list(filename):
+    """約50MBの買い物リストJSONファイルを作成"""
+    item = {'id': 0, 'name': "", 'quantity': 2, 'price': 298,
+            'added_date': "2025-01-16 14:30"}
+    sample = {'items': [dict(item, id=i, name=f"アイテム{i}") for i in range(1000)]}
+    size = len(json.dumps(sample, ensure_ascii=False, indent=2).encode('utf-8')) / 1000
+    count = int(TARGET_BYTES / size)
+    data = {
+        'items': [dict(item, id=i + 1, name=f"アイテム{i}") for i in range(count)],
+        'completed_items': [],
+        'next_id': count + 1,
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return count
+
+
+def timed(function):
+    """関数の実行時間（秒）と戻り値を返す"""
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def peak_memory(function):
+    """関数実行中のピークメモリ（MB）を返す"""
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def cold_start(command, keys):
+    """command を STARTUP_RUNS 回起動し、最短の実行時間（ミリ秒）を返す"""
+    best = float('inf')
+    for _ in range(STARTUP_RUNS):
+        elapsed, _ = timed(lambda: subprocess.run(command, input=keys,
+                                                  stdout=subprocess.DEVNULL, check=True))
+        best = min(best, elapsed)
+    return best * 1000
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    python_only = cold_start([sys.executable, "-c", "pass"], b"")
+    menu = cold_start([sys.executable, os.path.join(ROOT, "shopping_calculator.py")], b"5\n")
+    print("コールドスタート（最短）")
+    print(f"  Python の起動のみ: {python_only:.1f}ミリ秒")
+    print(f"  メニュー表示から終了まで: {menu:.1f}ミリ秒")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        count = write_large_list("shopping_list.json")
+        size = os.path.getsize("shopping_list.json") / 2 ** 20
+        print(f"{count}件 ({size:.0f}MB) のリストファイル")
+
+        elapsed, app = timed(ShoppingCalculatorApp)
+        print(f"  ShoppingCalculatorApp() の作成: {elapsed * 1000:.1f}ミリ秒")
+        elapsed, _ = timed(lambda: len(app.shopping_list.get_items()))
+        print(f"  最初のアイテムアクセス（全件読み込み）: {elapsed:.2f}秒")
+
+        export_stream = lambda: ShoppingList().export_to_text("stream.txt")  # noqa: E731
+        elapsed, _ = timed(export_stream)
+        print(f"  ストリーミングでのテキスト出力: {elapsed:.2f}秒, "
+              f"ピークメモリ {peak_memory(export_stream):.1f}MB")
+
+        def export_loaded():
+            shopping = ShoppingList()
+            shopping.get_items()
+            shopping.export_to_text("loaded.txt")
+
+        elapsed, _ = timed(export_loaded)
+        print(f"  全件読み込み後のテキスト出力: {elapsed:.2f}秒, "
+              f"ピークメモリ {peak_memory(export_loaded):.1f}MB")
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    run_benchmark()
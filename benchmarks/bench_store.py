@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数リストのストアのベンチマーク
+Benchmark of opening, mutating and closing many lists.
+
+10,000件のリストを ShoppingListStore（1つのSQLiteデータベース）で開いて変更して閉じる場合と、
+リストごとにJSONファイルを作る場合（ShoppingList）を比較します。
+続いて、キャッシュより多いリストを無作為に開いて変更し、LRUキャッシュの効果を計測します。
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_list import ShoppingList  # noqa: E402
+from shopping_store import ShoppingListStore  # noqa: E402
+
+LISTS = 10000
+ITEMS = [('りんご', 3, 298), ('牛乳', 1, 189), ('パン', 2, 120)]
+RANDOM_OPERATIONS = 20000
+HOT_LISTS = 500
+
+
+def bench_json(tmp):
+    """リストごとのJSONファイルで開く・変更する・閉じる1回あたりの時間（ミリ秒）"""
+    start = time.perf_counter()
+    for i in range(LISTS):
+        shopping = ShoppingList(os.path.join(tmp, f"user{i}.json"))
+        shopping.add_items(ITEMS)
+        shopping.complete_item(0)
+    return (time.perf_counter() - start) / LISTS * 1000
+
+
+def bench_store(database):
+    """ストアで開く・変更する・閉じる1回あたりの時間（ミリ秒）"""
+    with ShoppingListStore(database) as store:
+        start = time.perf_counter()
+        for i in range(LISTS):
+            shopping = store.open(f"user{i}")
+            shopping.add_items(ITEMS)
+            shopping.complete_item(0)
+            shopping.close()
+        elapsed = time.perf_counter() - start
+    return elapsed / LISTS * 1000
+
+
+def bench_random(database, cache_size):
+    """HOT_LISTS 件に偏ったアクセスで無作為に開いて変更する1回あたりの時間（ミリ秒）
+
+    リストの大きさが変わらないよう、1件追加した後に削除します。
+    """
+    rng = random.Random(0)
+    with ShoppingListStore(database, cache_size=cache_size) as store:
+        start = time.perf_counter()
+        for _ in range(RANDOM_OPERATIONS):
+            # 9割のアクセスは HOT_LISTS 件のリストに集中させる
+            upper = HOT_LISTS if rng.random() < 0.9 else LISTS
+            shopping = store.open(f"user{rng.randrange(upper)}")
+            shopping.add_item('卵', 1, 298)
+            shopping.remove_by_id(shopping.find_by_name('卵')[0].id)
+        store.flush()
+        elapsed = time.perf_counter() - start
+        info = store.cache_info()
+    return elapsed / RANDOM_OPERATIONS * 1000, info.hits / (info.hits + info.misses)
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "store.db")
+        print("開く・3件追加・1件完了・閉じる（1リストあたり）")
+        print(f"  JSONファイル ({LISTS}件): {bench_json(tmp):.3f} ms")
+        print(f"  ストア ({LISTS}件): {bench_store(database):.3f} ms")
+        print(f"\n無作為に開いて1件追加・削除（{RANDOM_OPERATIONS}回、1回あたり）")
+        for cache_size in (16, 128, 1024):
+            elapsed, hit_rate = bench_random(database, cache_size)
+            print(f"  cache_size={cache_size:<5} {elapsed:.3f} ms  ヒット率 {hit_rate:.0%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能回帰テストのベンチマークスイート
+Benchmark suite for the calculator and shopping-list hot paths with baseline comparison.
+
+1,000件から1,000,000件の合成リストを作成し、主要な操作ごとに1秒あたりの処理件数・
+レイテンシのパーセンタイル（p50・p95・p99）・ピークメモリを計測します。
+--output で結果をJSONに保存し、--baseline で保存済みの結果と比較して、
+最短時間（マシンの速さで補正）またはピークメモリが許容範囲（--tolerance）を超えて悪化した操作があれば
+終了コード1で終了します。
+
+使用例:
+    python3 benchmarks/bench_suite.py --output benchmarks/baseline.json
+    python3 benchmarks/bench_suite.py --baseline benchmarks/baseline.json
+    python3 benchmarks/bench_suite.py --sizes 1000 1000000 --cases add_item
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import shopping_backend  # noqa: E402
+from calculator import Calculator  # noqa: E402
+from shopping_item import ShoppingItem  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+SIZES = [1000, 10000, 100000, 1000000]
+TIME_BUDGET = 0.5  # 1つの操作・件数あたりの計測時間の目安（秒）
+MIN_SAMPLES = 3
+MAX_SAMPLES = 2000
+TOLERANCE = 0.5
+MEMORY_SLACK = 64 * 1024  # 小さな割り当ての揺らぎを回帰としないための余裕（バイト）
+CALIBRATION_RUNS = 5
+
+SIMPLE_EXPRESSION = "298 * 3 + 158"
+NESTED_EXPRESSION = "((298 * 3 + 158 * 2) * (1 + 0.08) - (100 / (4 + 1))) * ((2 + 3) * (4 - 1))"
+
+
+class _MemoryBackend(shopping_backend.StorageBackend):
+    """何も保存しない保存先（自動保存なしの計測用）"""
+
+    location = "memory"
+
+    def __init__(self, size):
+        self.size = size
+
+    def read(self):
+        return synthetic_items(self.size), [], self.size + 1, 0, []
+
+    def write(self, records, state=None, force=False):
+        return True
+
+
+def synthetic_items(size):
+    """size件の合成アイテム（5件に1件は価格未設定）を作成"""
+    return [ShoppingItem(i + 1, f"アイテム{i}", i % 5 + 1, None if i % 5 == 0 else 98 + i % 300)
+            for i in range(size)]
+
+
+def memory_list(size):
+    """保存しない size件の読み込み済みリスト"""
+    shopping = ShoppingList(backend=_MemoryBackend(size))
+    shopping.get_items()
+    return shopping
+
+
+def json_list(tmp, size):
+    """size件のJSONファイルを自動保存する読み込み済みリスト（全体保存）"""
+    filename = os.path.join(tmp, "autosave.json")
+    shopping_backend.write_file(filename, (synthetic_items(size), [], size + 1, 0))
+    shopping = ShoppingList(filename)
+    shopping.get_items()
+    return shopping
+
+
+# 計測する操作: (名前, 件数に依存するか, 1サンプルあたりの実行回数, アイテムを減らすか, 準備する関数)
+# 準備する関数は (tmp, size) を受け取り、1回分の操作を行う関数を返す。
+# アイテムを減らす操作は、リストの半分を使い切るまでで計測を打ち切る
+
+def _add_item_autosave(tmp, size):
+    shopping = json_list(tmp, size)
+    return lambda: shopping.add_item("新しいアイテム", 2, 198)
+
+
+def _add_item(tmp, size):
+    shopping = memory_list(size)
+    return lambda: shopping.add_item("新しいアイテム", 2, 198)
+
+
+def _complete_front(tmp, size):
+    shopping = memory_list(size)
+    return lambda: shopping.complete_item(0)
+
+
+def _complete_back(tmp, size):
+    shopping = memory_list(size)
+    return lambda: shopping.complete_item(len(shopping.get_items()) - 1)
+
+
+def _calculate_total(tmp, size):
+    return memory_list(size).calculate_total
+
+
+def _save_to_file(tmp, size):
+    shopping = memory_list(size)
+    filename = os.path.join(tmp, "save.json")
+    return lambda: shopping.save_to_file(filename)
+
+
+def _load_from_file(tmp, size):
+    filename = os.path.join(tmp, "load.json")
+    memory_list(size).save_to_file(filename)
+    shopping = memory_list(0)
+    return lambda: shopping.load_from_file(filename)
+
+
+def _export_to_text(tmp, size):
+    shopping = memory_list(size)
+    filename = os.path.join(tmp, "export.txt")
+    return lambda: shopping.export_to_text(filename)
+
+
+def _expression(expression):
+    def prepare(tmp, size):
+        calculator = Calculator(history_limit=0)
+        return lambda: calculator.calculate_expression(expression)
+    return prepare
+
+
+CASES = [
+    ("add_item(自動保存)", True, 1, False, _add_item_autosave),
+    ("add_item(保存なし)", True, 100, False, _add_item),
+    ("complete_item(先頭)", True, 10, True, _complete_front),
+    ("complete_item(末尾)", True, 1, True, _complete_back),
+    ("calculate_total", True, 1000, False, _calculate_total),
+    ("save_to_file", True, 1, False, _save_to_file),
+    ("load_from_file", True, 1, False, _load_from_file),
+    ("export_to_text", True, 1, False, _export_to_text),
+    ("calculate_expression(単純)", False, 100, False, _expression(SIMPLE_EXPRESSION)),
+    ("calculate_expression(入れ子)", False, 100, False, _expression(NESTED_EXPRESSION)),
+]
+
+
+def percentile(sorted_values, fraction):
+    """昇順に並べた値のパーセンタイル（最近傍順位法）"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(operation, inner, budget, max_samples=MAX_SAMPLES):
+    """操作を時間の目安まで繰り返し、1回あたりの時間（秒）のリストを返す"""
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_samples and (len(samples) < MIN_SAMPLES
+                                          or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        for _ in range(inner):
+            operation()
+        samples.append((time.perf_counter() - start) / inner)
+    return samples
+
+
+def calibrate():
+    """マシンの速さの目安として、決まった処理の最短時間（秒）を計測
+
+    基準との比較では最短時間をこの時間の比で補正し、マシンの違いや
+    実行中の負荷の変化による揺らぎを回帰とみなさないようにします。
+    """
+    best = float('inf')
+    for _ in range(CALIBRATION_RUNS):
+        start = time.perf_counter()
+        table = {}
+        for i in range(20000):
+            table[i] = f"アイテム{i}"
+        sum(len(name) for name in table.values())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(operation):
+    """1回の操作で新たに割り当てたメモリのピーク（バイト）"""
+    tracemalloc.start()
+    try:
+        operation()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(name, size, inner, consumes, prepare, budget):
+    """1つの操作・件数を計測し、結果の辞書を返す"""
+    max_samples = max(MIN_SAMPLES, size // (2 * inner)) if consumes else MAX_SAMPLES
+    with tempfile.TemporaryDirectory() as tmp:
+        operation = prepare(tmp, size)
+        # 最短時間と対応させるため、計測の前後で速い方のマシンの速さを使う
+        calibration = calibrate()
+        samples = sorted(measure(operation, inner, budget, min(max_samples, MAX_SAMPLES)))
+        calibration = min(calibration, calibrate())
+        peak = peak_memory(operation)
+    return {
+        'case': name,
+        'size': size,
+        'samples': len(samples),
+        'ops_per_sec': len(samples) / sum(samples),
+        'min': samples[0],
+        'p50': percentile(samples, 0.50),
+        'p95': percentile(samples, 0.95),
+        'p99': percentile(samples, 0.99),
+        'peak_bytes': peak,
+        'calibration': calibration,
+    }
+
+
+def format_seconds(seconds):
+    """時間を読みやすい単位で整形"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def run_suite(sizes=SIZES, names=None, budget=TIME_BUDGET):
+    """スイートを実行して結果を表示
+
+    Args:
+        sizes (list): リストの件数
+        names (list, optional): 計測する操作名（部分一致、省略時はすべて）
+        budget (float): 1つの操作・件数あたりの計測時間の目安（秒）
+
+    Returns:
+        list: 操作・件数ごとの結果の辞書
+    """
+    print(f"{'件数':>8} {'件/秒':>12} {'p50':>10} {'p95':>10} {'p99':>10} {'ピークMB':>9}  操作")
+    results = []
+    for name, sized, inner, consumes, prepare in CASES:
+        if names and not any(pattern in name for pattern in names):
+            continue
+        for size in (sizes if sized else [0]):
+            result = run_case(name, size, inner, consumes, prepare, budget)
+            results.append(result)
+            print(f"{size or '-':>8} {result['ops_per_sec']:>12.1f} "
+                  f"{format_seconds(result['p50']):>10} {format_seconds(result['p95']):>10} "
+                  f"{format_seconds(result['p99']):>10} "
+                  f"{result['peak_bytes'] / 2 ** 20:>9.2f}  {name}", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """保存済みの結果と比較し、回帰した操作を表示
+
+    Args:
+        results (list): 今回の結果
+        baseline (dict): 保存済みの結果（--output で保存したJSON）
+        tolerance (float): 許容する悪化の割合（0.5 の場合は50%）
+
+    Returns:
+        int: 回帰した操作・件数の数
+    """
+    # 比較には揺らぎの小さい最短時間を使い、計測時のマシンの速さ（calibrate() の時間）の比で補正する
+    previous = {(result['case'], result['size']): result for result in baseline['results']}
+    regressions = 0
+    print(f"\n基準との比較（許容範囲 {tolerance:.0%}）")
+    for result in results:
+        base = previous.get((result['case'], result['size']))
+        if base is None:
+            continue
+        time_ratio = (result['min'] / base['min']) / (result['calibration'] / base['calibration'])
+        memory_limit = base['peak_bytes'] * (1 + tolerance) + MEMORY_SLACK
+        regressed = time_ratio > 1 + tolerance or result['peak_bytes'] > memory_limit
+        regressions += regressed
+        print(f"{'回帰' if regressed else 'OK':>4} 時間 {time_ratio:>6.2f}倍 "
+              f"メモリ {result['peak_bytes'] / max(base['peak_bytes'], 1):>6.2f}倍  "
+              f"{result['case']} ({result['size'] or '-'})")
+    return regressions
+
+
+def main(argv=None):
+    """コマンドラインからスイートを実行
+
+    Args:
+        argv (list, optional): コマンドライン引数（省略時は sys.argv[1:]）
+
+    Returns:
+        int: 終了ステータス（基準と比較して回帰があった場合は1）
+    """
+    parser = argparse.ArgumentParser(description="買い物リスト & 電卓のベンチマークスイート")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="リストの件数")
+    parser.add_argument("--cases", nargs="+", help="計測する操作名（部分一致）")
+    parser.add_argument("--budget", type=float, default=TIME_BUDGET,
+                        help="1つの操作・件数あたりの計測時間の目安（秒）")
+    parser.add_argument("--output", help="結果を保存するJSONファイル（基準として使用できる）")
+    parser.add_argument("--baseline", help="比較する基準のJSONファイル")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="回帰とみなさない悪化の割合")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.cases, args.budget)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f,
+                      ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差分同期のベンチマーク
+Delta sync with changes_since()/apply_changes() against shipping the whole file.
+
+ITEMS 件のリストに EDITS 件の変更（追加・完了・削除）を加え、クライアントへの同期を
+save_to_file() のファイル全体の転送と load_from_file() で行う場合と、
+changes_since() の差分（JSON）と apply_changes() で行う場合の転送量と時間を比較します。
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_list import ShoppingList  # noqa: E402
+
+ITEMS = 100000
+EDITS = [1, 10, 100, 1000]
+
+
+def edit(shopping, count):
+    """count件の変更（追加・完了・削除を順に）を加える"""
+    for i in range(count):
+        if i % 3 == 0:
+            shopping.add_item(f"追加{i}", 1, 198)
+        elif i % 3 == 1:
+            shopping.complete_item(0)
+        else:
+            shopping.remove_item(len(shopping.get_items()) - 1)
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    with tempfile.TemporaryDirectory() as tmp:
+        server = ShoppingList(os.path.join(tmp, "server.json"), journal=True,
+                              compact_threshold=10 ** 6)
+        server.add_items((f"アイテム{i}", i % 5 + 1, 98 + i % 300) for i in range(ITEMS))
+        client = ShoppingList(os.path.join(tmp, "client.json"), journal=True,
+                              compact_threshold=10 ** 6)
+        client.apply_changes(server.changes_since(0))
+        revision = server.revision
+        transfer = os.path.join(tmp, "transfer.json")
+
+        print(f"{ITEMS}件のリストの同期")
+        print(f"{'変更':>6} {'全体(KB)':>10} {'全体(ms)':>10} {'差分(KB)':>10} {'差分(ms)':>10}")
+        for count in EDITS:
+            edit(server, count)
+
+            start = time.perf_counter()
+            server.save_to_file(transfer)
+            full_size = os.path.getsize(transfer)
+            ShoppingList(os.path.join(tmp, "full.json")).load_from_file(transfer)
+            full = time.perf_counter() - start
+
+            start = time.perf_counter()
+            payload = json.dumps(server.changes_since(revision), ensure_ascii=False)
+            client.apply_changes(json.loads(payload))
+            delta = time.perf_counter() - start
+            revision = server.revision
+
+            assert ([item.to_dict() for item in client.get_items()]
+                    == [item.to_dict() for item in server.get_items()])
+            print(f"{count:>6} {full_size / 1024:>10.1f} {full * 1e3:>10.1f} "
+                  f"{len(payload.encode('utf-8')) / 1024:>10.2f} {delta * 1e3:>10.2f}")
+        server.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+書き込み遅延モードのベンチマーク
+Benchmark of add_item latency with synchronous and write-behind auto-save.
+
+add_item 1回ごとの所要時間を計測し、p50・p99 を比較します。
+書き込み遅延モードでは、ディスクへの書き込みが add_item の所要時間に含まれません。
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_list import ShoppingList  # noqa: E402
+
+SIZE = 5000
+SAMPLES = 500
+
+
+def measure(journal, write_behind):
+    """SIZE件のリストに対する add_item の所要時間の p50・p99（ミリ秒）を計測"""
+    with tempfile.TemporaryDirectory() as tmp:
+        shopping = ShoppingList(os.path.join(tmp, "bench.json"), journal=journal,
+                                compact_threshold=10 ** 9, write_behind=write_behind,
+                                save_interval=0.05)
+        shopping.add_items((f"item{i}", 1, 100) for i in range(SIZE))
+        shopping.compact()
+
+        latencies = []
+        for i in range(SAMPLES):
+            start = time.perf_counter()
+            shopping.add_item(f"new{i}", 1, 100)
+            latencies.append((time.perf_counter() - start) * 1000)
+        shopping.close()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return quantiles[49], quantiles[98]
+
+
+def run_benchmark():
+    """ベンチマークを実行して結果を表示"""
+    print(f"{SIZE}件のリストへの add_item")
+    print(f"{'保存方式':<22} {'p50(ms)':>10} {'p99(ms)':>10}")
+    for journal in (False, True):
+        for write_behind in (False, True):
+            p50, p99 = measure(journal, write_behind)
+            mode = "ジャーナル" if journal else "全体保存"
+            mode += "・書き込み遅延" if write_behind else "・同期"
+            print(f"{mode:<22} {p50:>10.3f} {p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
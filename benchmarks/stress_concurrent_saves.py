@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+同時保存のストレステスト
+Multi-process stress test for concurrent ShoppingList auto-saves.
+
+複数のプロセスが同じファイル（またはSQLiteデータベース）に対してアイテムの追加・完了を繰り返し、
+終了後のファイルが正しく読み込めること、どのプロセスの変更も失われていないことを確認します。
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_backend import SQLiteBackend  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+WORKERS = 4
+OPERATIONS = 100
+
+
+def open_list(filename, journal=False, write_behind=False):
+    """ファイル名の拡張子が .db の場合はSQLite、それ以外はJSONファイルのリストを開く"""
+    backend = SQLiteBackend(filename) if filename.endswith(".db") else None
+    return ShoppingList(filename, journal=journal, compact_threshold=50,
+                        write_behind=write_behind, save_interval=0.01, backend=backend)
+
+
+def worker(filename, worker_id, journal, write_behind):
+    """アイテムの追加と、追加したアイテムの一部の完了を繰り返す"""
+    shopping = open_list(filename, journal, write_behind)
+    for i in range(OPERATIONS):
+        shopping.add_item(f"w{worker_id}-{i}", 1, 100)
+        if i % 3 == 0:
+            shopping.complete_by_name(f"w{worker_id}-{i}")
+    # multiprocessing の子プロセスは atexit を実行しないため明示的に閉じる
+    shopping.close()
+
+
+def run(journal, write_behind=False, sqlite=False):
+    """WORKERS 個のプロセスを同時に実行して結果を検証
+
+    Returns:
+        float: 実行時間（秒）
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "stress.db" if sqlite else "stress.json")
+        processes = [multiprocessing.Process(target=worker,
+                                             args=(filename, n, journal, write_behind))
+                     for n in range(WORKERS)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        assert all(process.exitcode == 0 for process in processes)
+
+        if not sqlite and os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                json.load(f)  # スナップショットが壊れていないこと
+
+        shopping = open_list(filename)
+        pending = [item.name for item in shopping.get_items()]
+        completed = [item.name for item in shopping.get_completed_items()]
+        expected_completed = {f"w{n}-{i}" for n in range(WORKERS)
+                              for i in range(OPERATIONS) if i % 3 == 0}
+        expected_pending = {f"w{n}-{i}" for n in range(WORKERS)
+                            for i in range(OPERATIONS)} - expected_completed
+        assert len(pending) == len(set(pending)) and len(completed) == len(set(completed))
+        assert set(pending) == expected_pending, "未完了アイテムが失われました"
+        assert set(completed) == expected_completed, "完了済みアイテムが失われました"
+        ids = [item.id for item in shopping.get_items()] + \
+              [item.id for item in shopping.get_completed_items()]
+        assert len(ids) == len(set(ids)), "IDが重複しています"
+        shopping.close()
+    return elapsed
+
+
+def run_stress_test():
+    """全体保存モード・ジャーナルモード・SQLite（それぞれ書き込み遅延あり・なし）の
+    ストレステストを実行"""
+    for write_behind in (False, True):
+        for mode, journal, sqlite in (("全体保存", False, False), ("ジャーナル", True, False),
+                                      ("SQLite", False, True)):
+            elapsed = run(journal, write_behind, sqlite)
+            if write_behind:
+                mode += "（書き込み遅延）"
+            print(f"{mode}: {WORKERS}プロセス × {OPERATIONS}件 OK ({elapsed:.2f}秒)")
+
+
+if __name__ == "__main__":
+    run_stress_test()
@@ -5,6 +5,25 @@
 Calculator module for basic arithmetic operations and expression evaluation.
 """
 
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import expression as expression_engine
+import shopping_metrics
+
+# 計算履歴の既定の最大件数
+DEFAULT_HISTORY_LIMIT = 1000
+
+# 式の計算結果をキャッシュする既定の最大件数
+DEFAULT_CACHE_SIZE = 1024
+
+# 式の計算結果のキャッシュの統計（saved_seconds はミス時の平均計算時間から見積もった短縮時間、
+# compiled はコンパイル済みの式のキャッシュ（全Calculator共通）の統計）
+ExpressionCacheInfo = namedtuple('ExpressionCacheInfo', ['hits', 'misses', 'maxsize', 'currsize',
+                                                         'hit_rate', 'saved_seconds', 'compiled'])
+
+_MISSING = object()
+
 
 class Calculator:
     """電卓機能を提供するクラス
@@ -13,12 +32,49 @@ class Calculator:
     Basic arithmetic operations and expression calculations with history management.
     """
     
-    def __init__(self):
+    def __init__(self, history_limit=DEFAULT_HISTORY_LIMIT, money=None,
+                 cache_size=DEFAULT_CACHE_SIZE):
         """Calculatorクラスの初期化
         
-        計算履歴を空のリストで初期化します。
+        計算履歴を空のリングバッファで初期化します。履歴は演算子・オペランド・結果の
+        タプルとして保持し、文字列への整形は履歴の読み出し時にのみ行います。
+        
+        Args:
+            history_limit (int, optional): 保持する計算履歴の最大件数
+                （古いものから破棄）。0の場合は履歴を記録しない。Noneの場合は無制限
+            money (MoneyMode, optional): 金額モード。指定した場合、四則演算と数式計算を
+                浮動小数点数ではなく整数の固定小数点数で行い、結果を最小単位に丸める
+                （298 * 1.08 は 321.84000000000003 ではなく 321.84 になる）
+            cache_size (int, optional): 金額モードの式と calculate_many() の計算結果を
+                キャッシュする最大件数（式と変数の値の組ごと、古いものから破棄）。
+                0の場合はキャッシュしない
+        """
+        self.money = money
+        self.history_enabled = history_limit != 0
+        self._history = deque(maxlen=history_limit)
+        self.variables = {}
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._miss_seconds = 0.0
+    
+    @property
+    def history(self):
+        """計算履歴（文字列のリスト）
+        
+        get_history() と同じく、読み出し時に整形したリストを返します。
         """
-        self.history = []
+        return self.get_history()
+    
+    def set_variable(self, name, value):
+        """式計算で使用する変数を設定
+        
+        Args:
+            name (str): 変数名（例: "tax"）
+            value (float): 変数の値
+        """
+        self.variables[name] = value
     
     def add(self, a, b):
         """加算を実行
@@ -30,8 +86,9 @@ class Calculator:
         Returns:
             float: 加算結果 (a + b)
         """
-        result = a + b
-        self.history.append(f"{a} + {b} = {result}")
+        result = a + b if self.money is None else self.money.add(a, b)
+        if self.history_enabled:
+            self._history.append(('+', a, b, result))
         return result
     
     def subtract(self, a, b):
@@ -44,8 +101,9 @@ class Calculator:
         Returns:
             float: 減算結果 (a - b)
         """
-        result = a - b
-        self.history.append(f"{a} - {b} = {result}")
+        result = a - b if self.money is None else self.money.subtract(a, b)
+        if self.history_enabled:
+            self._history.append(('-', a, b, result))
         return result
     
     def multiply(self, a, b):
@@ -58,8 +116,9 @@ class Calculator:
         Returns:
             float: 乗算結果 (a × b)
         """
-        result = a * b
-        self.history.append(f"{a} × {b} = {result}")
+        result = a * b if self.money is None else self.money.multiply(a, b)
+        if self.history_enabled:
+            self._history.append(('×', a, b, result))
         return result
     
     def divide(self, a, b):
@@ -77,15 +136,24 @@ class Calculator:
         """
         if b == 0:
             raise ValueError("ゼロで割ることはできません")
-        result = a / b
-        self.history.append(f"{a} ÷ {b} = {result}")
+        result = a / b if self.money is None else self.money.divide(a, b)
+        if self.history_enabled:
+            self._history.append(('÷', a, b, result))
         return result
     
-    def calculate_expression(self, expression):
+    @shopping_metrics.timed('calculator_calculate_expression')
+    def calculate_expression(self, expression, variables=None):
         """文字列として与えられた数式を計算
         
+        定数だけの部分式（例: "(100 + 200 + 150) * 1.08"）はコンパイル時に計算済みのため、
+        同じ式の再計算はコンパイル済みの式のキャッシュから結果を読み出すだけです。
+        金額モードでは、同じ式を同じ変数の値で計算した結果をキャッシュから返します
+        （cache_info() を参照）。
+        
         Args:
-            expression (str): 計算する数式（例: "100 + 200 * 1.08"）
+            expression (str): 計算する数式（例: "100 + 200 * 1.08", "price * tax"）
+            variables (dict, optional): 式中の変数名と値の対応
+                （set_variable() で設定した変数より優先）
             
         Returns:
             float: 計算結果
@@ -93,26 +161,167 @@ class Calculator:
         Raises:
             ValueError: 無効な式の場合
         """
+        # 安全な計算のため、eval()の代わりに数値と基本的な演算子のみを許可した
+        # コンパイル済みの式（LRUキャッシュ）で計算
+        expression = expression_engine.normalize(expression)
+        if variables:
+            variables = {**self.variables, **variables}
+        else:
+            variables = self.variables
+        if self.money is None:
+            # 浮動小数点数の式は、結果のキャッシュのキーを作るより計算する方が速い
+            result = expression_engine.evaluate(expression, variables)
+        else:
+            result = self._cached(expression, expression_engine.compile_exact(expression).names,
+                                  variables, self.money.evaluate)
+        if self.history_enabled:
+            self._history.append(('=', expression, None, result))
+        return result
+    
+    def calculate_many(self, expressions, variables=None):
+        """複数の数式をまとめて計算
+        
+        式をまとめてコンパイルし、式の間で共通する部分式（例: "(a + b) * 1.08" と
+        "(a + b) * 1.08 + c" の "(a + b) * 1.08"）を1回だけ計算します。
+        金額モードでは1つずつ計算します。結果は式の組と変数の値ごとにキャッシュします。
+        
+        Args:
+            expressions (iterable): 計算する数式
+            variables (dict, optional): 式中の変数名と値の対応
+                （set_variable() で設定した変数より優先）
+            
+        Returns:
+            list: 各式の計算結果
+            
+        Raises:
+            ValueError: 計算できない式がある場合（最初に計算できなかった式のエラー）
+        """
+        expressions = tuple(expression_engine.normalize(expression) for expression in expressions)
+        if variables:
+            variables = {**self.variables, **variables}
+        else:
+            variables = self.variables
+        if self.money is None:
+            names = expression_engine.compile_batch(expressions).names
+            results = self._cached(expressions, names, variables,
+                                   expression_engine.evaluate_batch)
+        else:
+            results = [self._cached(expression, expression_engine.compile_exact(expression).names,
+                                    variables, self.money.evaluate)
+                       for expression in expressions]
+        if self.history_enabled:
+            self._history.extend(('=', expression, None, result)
+                                 for expression, result in zip(expressions, results))
+        return list(results)
+    
+    def cache_info(self):
+        """式の計算結果のキャッシュの統計を取得
+        
+        Returns:
+            ExpressionCacheInfo: 計算結果のキャッシュ（金額モードの式と calculate_many()）の
+                ヒット数・ミス数・最大件数・現在の件数・ヒット率・短縮した時間の見積もり（秒）と、
+                コンパイル済みの式のキャッシュの統計
+        """
+        calls = self._hits + self._misses
+        saved = self._hits * self._miss_seconds / self._misses if self._misses else 0.0
+        return ExpressionCacheInfo(self._hits, self._misses, self.cache_size, len(self._cache),
+                                   self._hits / calls if calls else 0.0, saved,
+                                   expression_engine.compile_expression.cache_info())
+    
+    def cache_clear(self):
+        """式の計算結果のキャッシュと統計をクリア"""
+        self._cache.clear()
+        self._hits = self._misses = 0
+        self._miss_seconds = 0.0
+    
+    def _cached(self, source, names, variables, compute):
+        """計算結果をキャッシュから取得し、なければ計算してキャッシュ（内部メソッド）
+        
+        キーは式・金額モード・参照する変数の値とその型です（1 と 1.0 は別のキー）。
+        未定義の変数やハッシュできない値を含む場合はキャッシュせずに計算します。
+        計算に失敗した場合（ValueError）はキャッシュしません。
+        
+        Args:
+            source (str | tuple): 正規化済みの数式、または数式のタプル
+            names (tuple): 式が参照する変数名
+            variables (dict): 変数名と値の対応
+            compute (callable): (source, variables) を受け取って計算する関数
+            
+        Returns:
+            計算結果
+        """
+        if not self.cache_size:
+            return compute(source, variables)
+        cache = self._cache
         try:
-            # 安全な計算のため、eval()の代わりに基本的な演算子のみ許可
-            expression = expression.replace('×', '*').replace('÷', '/')
-            result = eval(expression)
-            self.history.append(f"{expression} = {result}")
+            values = tuple([variables[name] for name in names])
+            if names:
+                key = (source, self.money, values, tuple(map(type, values)))
+            else:
+                key = (source, self.money)
+            result = cache.get(key, _MISSING)
+        except (KeyError, TypeError):
+            return compute(source, variables)
+        if result is not _MISSING:
+            cache.move_to_end(key)
+            self._hits += 1
             return result
-        except:
-            raise ValueError("無効な式です")
+        start = time.perf_counter()
+        result = compute(source, variables)
+        self._miss_seconds += time.perf_counter() - start
+        self._misses += 1
+        cache[key] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+    
+    def evaluate_many(self, expression, columns, use_numpy=None):
+        """1つの数式を列全体に対して一括で計算
+        
+        式は1回だけコンパイルされ、NumPyがあればNumPy配列で、
+        なければPythonのループで全行を計算します。計算履歴には記録しません。
+        
+        Args:
+            expression (str): 計算する数式（例: "price * qty * 1.08 - discount"）
+            columns (dict): 変数名と値の列の対応（set_variable() で設定した変数より優先）
+            use_numpy (bool, optional): NumPyを使うかどうか（省略時は自動判定）
+            
+        Returns:
+            list | numpy.ndarray: 各行の計算結果
+            
+        Raises:
+            ValueError: 無効な式、未定義の変数、または列の長さが一致しない場合
+        """
+        return expression_engine.evaluate_many(expression, {**self.variables, **columns},
+                                               use_numpy)
     
     def get_history(self):
         """計算履歴を取得
         
         Returns:
-            list: 計算履歴のコピー
+            list: 計算履歴を整形した文字列のリスト（古い順）
         """
-        return self.history.copy()
+        return [self._format_record(record) for record in self._history]
     
     def clear_history(self):
         """計算履歴をクリア
         
-        履歴リストを空にします。
+        履歴のリングバッファを空にします。
+        """
+        self._history.clear()
+    
+    @staticmethod
+    def _format_record(record):
+        """履歴レコードを表示用の文字列に整形（内部メソッド）
+        
+        Args:
+            record (tuple): (演算子, 第一の値, 第二の値, 結果) のタプル。
+                演算子が '=' の場合、第一の値は数式
+            
+        Returns:
+            str: 整形した履歴（例: "298 + 158 = 456"）
         """
-        self.history.clear()
\ No newline at end of file
+        op, a, b, result = record
+        if op == '=':
+            return f"{a} = {result}"
+        return f"{a} {op} {b} = {result}"
\ No newline at end of file
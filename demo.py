@@ -8,6 +8,7 @@ Demo script for Shopping List Manager with Calculator Functionality
 from calculator import Calculator
 from shopping_list import ShoppingList
 from shopping_calculator import ShoppingCalculatorApp
+from shopping_render import iter_text, write_lines
 
 def run_demo():
     """アプリケーションの機能をデモンストレーション"""
@@ -49,10 +50,7 @@ def run_demo():
     
     # リスト表示
     print("\n現在の買い物リスト:")
-    items = shopping.get_items()
-    for i, item in enumerate(items, 1):
-        price_str = f" - ¥{item['price']}" if item['price'] else ""
-        print(f"  {i}. {item['name']} (数量: {item['quantity']}){price_str}")
+    write_lines(iter_text(shopping.get_items(), title=None, show_total=False, indent="  "))
     
     print(f"\n合計金額: ¥{shopping.calculate_total()}")
     
@@ -63,18 +61,8 @@ def run_demo():
     
     # 最終リスト表示
     print("\n買い物完了後のリスト:")
-    remaining_items = shopping.get_items()
-    completed_items = shopping.get_completed_items()
-    
-    print("【未完了アイテム】")
-    for i, item in enumerate(remaining_items, 1):
-        price_str = f" - ¥{item['price']}" if item['price'] else ""
-        print(f"  {i}. {item['name']} (数量: {item['quantity']}){price_str}")
-    
-    print("【完了済みアイテム】")
-    for item in completed_items:
-        price_str = f" - ¥{item['price']}" if item['price'] else ""
-        print(f"  ✓ {item['name']} (数量: {item['quantity']}){price_str}")
+    write_lines(iter_text(shopping.get_items(), shopping.get_completed_items(),
+                          title=None, show_total=False, indent="  "))
     
     print(f"\n残りの合計金額: ¥{shopping.calculate_total()}")
     
@@ -94,6 +82,10 @@ def run_demo():
     text_filename = "demo_shopping_list.txt"
     print(f"  {new_shopping.export_to_text(text_filename)}")
     
+    # CSV・Markdown形式での出力
+    print(f"  {new_shopping.export('demo_shopping_list.csv')}")
+    print(f"  {new_shopping.export('demo_shopping_list.md')}")
+    
     print("\n" + "="*60)
     print("デモが完了しました!")
     print("実際のアプリケーションを起動するには:")
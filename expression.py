@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数式コンパイルモジュール
+Safe arithmetic expression compiler with a bounded LRU cache of compiled forms.
+
+数式をASTに変換し、数値・変数名と + - * / ** % および括弧のみを許可した上で
+バイトコードにコンパイルします。コンパイル結果は正規化した式をキーとして
+LRUキャッシュに保持されるため、同じ式の再計算では構文解析を省略できます。
+数値だけからなる部分式（べき乗を含む）はコンパイル時に計算して定数に置き換えます。
+実数のみを扱うため、計算結果が複素数・無限大・NaN になる式は無効な式とします。
+evaluate_batch() は複数の式をまとめてコンパイルし、式の間で共通する部分式を1回だけ計算します。
+evaluate_many() は1つの式を列（価格・数量など）全体に対して一括で計算します。
+NumPyがインストールされていればNumPy配列で、なければPythonのループで計算します。
+evaluate_exact() は数値リテラルと変数の値を指定した数値型に変換して計算します
+（金額モードで浮動小数点数の誤差を避けるために使用します）。
+"""
+
+import ast
+import math
+import operator
+import sys
+from functools import lru_cache
+from itertools import repeat
+
+try:
+    import numpy
+except ImportError:  # NumPyはオプション
+    numpy = None
+
+# キャッシュするコンパイル済み式の最大数
+CACHE_SIZE = 256
+
+# べき乗の指数の上限（巨大な整数計算によるハングを防ぐ）
+MAX_EXPONENT = 1000
+
+# 整数の計算結果の大きさの上限（ビット数、(9 ** 999) ** 999 のような入れ子のべき乗を防ぐ）。
+# 整数を文字列に変換できる桁数に上限がある場合は、max_result_bits() でそれ以下にする
+MAX_RESULT_BITS = 1 << 16
+
+# 10進数1桁あたりのビット数（log2(10) より小さく丸め、桁数の上限を超えないようにする）
+_BITS_PER_DIGIT = 3.32
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+# 定数畳み込みで使用する演算（べき乗は _pow() 呼び出しに置き換え済み）
+_FOLD_BINARY = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+                ast.Div: operator.truediv, ast.Mod: operator.mod}
+_FOLD_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def max_result_bits():
+    """整数の計算結果の大きさの上限（ビット数）を取得
+
+    計算結果は履歴などで文字列に変換するため、整数を文字列に変換できる桁数の上限
+    （Python 3.11 以降の sys.get_int_max_str_digits()）を超えない大きさにします。
+
+    Returns:
+        int: ビット数
+    """
+    get_digits = getattr(sys, 'get_int_max_str_digits', None)
+    digits = get_digits() if get_digits is not None else 0
+    if digits:
+        return min(MAX_RESULT_BITS, int(digits * _BITS_PER_DIGIT))
+    return MAX_RESULT_BITS
+
+
+def check_result(value):
+    """計算結果を検査
+
+    Args:
+        value: 計算結果
+
+    Returns:
+        value をそのまま返す
+
+    Raises:
+        ValueError: 複素数・無限大・NaN、または max_result_bits() より大きい整数の場合
+    """
+    if isinstance(value, complex) or (isinstance(value, float) and not math.isfinite(value)):
+        raise ValueError("無効な式です")
+    if isinstance(value, int) and value.bit_length() > max_result_bits():
+        raise ValueError("計算結果が大きすぎます")
+    return value
+
+
+def check_power(base_bits, exponent):
+    """整数のべき乗を計算する前に、指数と結果の大きさを検査
+
+    結果のビット数は 底のビット数 × 指数 以下のため、計算せずに見積もれます。
+
+    Args:
+        base_bits (int): 底（絶対値が2以上の整数）のビット数
+        exponent (int): 指数
+
+    Raises:
+        ValueError: 指数または結果が大きすぎる場合
+    """
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError("指数が大きすぎます")
+    if base_bits * exponent > max_result_bits():
+        raise ValueError("べき乗の結果が大きすぎます")
+
+
+def _safe_pow(base, exponent):
+    """指数と結果の大きさを制限したべき乗（整数同士の場合のみ制限）
+
+    Raises:
+        ValueError: 指数または結果が大きすぎる場合
+    """
+    if type(base) is int and type(exponent) is int and abs(base) not in (0, 1):
+        check_power(base.bit_length(), exponent)
+    return base ** exponent
+
+
+_GLOBALS = {'__builtins__': {}, '_pow': _safe_pow}
+
+
+class CompiledExpression:
+    """コンパイル済みの数式
+
+    Attributes:
+        code (code): evalで実行するバイトコード
+        names (tuple): 式が参照する変数名（出現順）
+        function (function): 変数の値を names の順に位置引数で受け取って計算する関数
+    """
+
+    __slots__ = ('code', 'names', 'function')
+
+    def __init__(self, code, names, function):
+        self.code = code
+        self.names = names
+        self.function = function
+
+
+class _Validator(ast.NodeTransformer):
+    """許可されたノードのみで構成されているか検証するASTトランスフォーマー
+
+    べき乗は指数を検査する _pow() 呼び出しに置き換えます。
+    """
+
+    def __init__(self):
+        self.names = []
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if type(node.value) not in (int, float):
+            raise ValueError("無効な式です")
+        return node
+
+    def visit_Name(self, node):
+        # '_' で始まる名前は内部用に予約
+        if node.id.startswith('_') or not isinstance(node.ctx, ast.Load):
+            raise ValueError("無効な式です")
+        if node.id not in self.names:
+            self.names.append(node.id)
+        return node
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise ValueError("無効な式です")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise ValueError("無効な式です")
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        if isinstance(node.op, ast.Pow):
+            call = ast.Call(func=ast.Name(id='_pow', ctx=ast.Load()),
+                            args=[node.left, node.right], keywords=[])
+            return ast.copy_location(call, node)
+        return node
+
+    def generic_visit(self, node):
+        raise ValueError("無効な式です")
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """数値だけからなる部分式を計算済みの定数に置き換えるASTトランスフォーマー
+
+    _Validator で検証した後の木に適用します。ゼロ除算や大きすぎるべき乗など計算できない
+    部分式や、結果が check_result() を通らない部分式は置き換えず、実行時に通常どおり
+    エラーにします。
+    """
+
+    def visit_UnaryOp(self, node):
+        node.operand = self.visit(node.operand)
+        if isinstance(node.operand, ast.Constant):
+            return self._fold(node, _FOLD_UNARY[type(node.op)], node.operand)
+        return node
+
+    def visit_BinOp(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            return self._fold(node, _FOLD_BINARY[type(node.op)], node.left, node.right)
+        return node
+
+    def visit_Call(self, node):
+        node.args = [self.visit(arg) for arg in node.args]
+        if all(isinstance(arg, ast.Constant) for arg in node.args):
+            return self._fold(node, _safe_pow, *node.args)
+        return node
+
+    @staticmethod
+    def _fold(node, function, *operands):
+        try:
+            value = check_result(function(*(operand.value for operand in operands)))
+        except Exception:
+            return node
+        return ast.copy_location(ast.Constant(value=value), node)
+
+
+class _Sharer(ast.NodeTransformer):
+    """複数回出現する部分式を1回だけ計算するASTトランスフォーマー
+
+    最初の出現を一時変数への代入式（_c0 := ...）に、以降の出現を一時変数の参照に
+    置き換えます。式は左から順に評価されるため、参照より先に代入が実行されます。
+    """
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.temporaries = {}
+
+    def visit(self, node):
+        if not isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Call)):
+            return node
+        key = ast.dump(node)
+        if key in self.temporaries:
+            return ast.Name(id=self.temporaries[key], ctx=ast.Load())
+        node = self.generic_visit(node)
+        if self.counts[key] < 2:
+            return node
+        name = self.temporaries[key] = f"_c{len(self.temporaries)}"
+        return ast.NamedExpr(target=ast.Name(id=name, ctx=ast.Store()), value=node)
+
+
+class _LiteralWrapper(ast.NodeTransformer):
+    """数値リテラルを書かれたとおりの文字列で _number() 呼び出しに置き換えるASTトランスフォーマー
+
+    浮動小数点数に変換してからでは誤差が入るため（1.08 など）、式の文字列から
+    リテラルの部分をそのまま取り出します。
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+
+    def visit_Constant(self, node):
+        text = ast.get_source_segment(self.expression, node)
+        call = ast.Call(func=ast.Name(id='_number', ctx=ast.Load()),
+                        args=[ast.Constant(value=text)], keywords=[])
+        return ast.copy_location(call, node)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize(expression):
+    """数式を正規化
+
+    全角の演算子（×, ÷）を置き換え、空白をまとめます（同じ式の正規化はキャッシュ）。
+
+    Args:
+        expression (str): 数式
+
+    Returns:
+        str: 正規化された数式
+    """
+    expression = expression.replace('×', '*').replace('÷', '/')
+    return " ".join(expression.split())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(expression):
+    """正規化済みの数式をバイトコードにコンパイル
+
+    Args:
+        expression (str): normalize() 済みの数式
+
+    Returns:
+        CompiledExpression: コンパイル済みの式
+
+    Raises:
+        ValueError: 無効な式の場合
+    """
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError:
+        raise ValueError("無効な式です")
+    validator = _Validator()
+    tree = ast.fix_missing_locations(_ConstantFolder().visit(validator.visit(tree)))
+    names = tuple(validator.names)
+    code = compile(tree, '<expression>', 'eval')
+
+    # 変数を位置引数で受け取る関数（列ごとの一括計算用）
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg=name) for name in names],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    function_tree = ast.fix_missing_locations(
+        ast.Expression(body=ast.Lambda(args=arguments, body=tree.body)))
+    function = eval(compile(function_tree, '<expression>', 'eval'), _GLOBALS)
+    return CompiledExpression(code, names, function)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_batch(expressions):
+    """正規化済みの複数の数式を、共通の部分式を1回だけ計算する関数にコンパイル
+
+    部分式は構造が同じ場合に共通とみなします（a + b と b + a は別の部分式です）。
+
+    Args:
+        expressions (tuple): normalize() 済みの数式
+
+    Returns:
+        CompiledExpression: コンパイル済みの式（code はNone、function は各式の
+            計算結果のタプルを返す）
+
+    Raises:
+        ValueError: 無効な式が含まれる場合
+    """
+    validator = _Validator()
+    bodies = []
+    for expression in expressions:
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError:
+            raise ValueError(f"無効な式です: {expression}")
+        bodies.append(_ConstantFolder().visit(validator.visit(tree)).body)
+
+    counts = {}
+    for body in bodies:
+        for node in ast.walk(body):
+            if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Call)):
+                key = ast.dump(node)
+                counts[key] = counts.get(key, 0) + 1
+    sharer = _Sharer(counts)
+    results = ast.Tuple(elts=[sharer.visit(body) for body in bodies], ctx=ast.Load())
+
+    names = tuple(validator.names)
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg=name) for name in names],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    function_tree = ast.fix_missing_locations(
+        ast.Expression(body=ast.Lambda(args=arguments, body=results)))
+    function = eval(compile(function_tree, '<expressions>', 'eval'), _GLOBALS)
+    return CompiledExpression(None, names, function)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_exact(expression):
+    """正規化済みの数式を、数値リテラルを変換する関数にコンパイル
+
+    返す式の function は、第1引数に数値リテラルの文字列（例: "1.08"）を受け取って
+    数値に変換する関数、続けて変数の値を names の順に位置引数で受け取ります。
+    CPythonの定数畳み込み（298 * 1.08 を浮動小数点数で計算済みにする）も行われません。
+
+    Args:
+        expression (str): normalize() 済みの数式
+
+    Returns:
+        CompiledExpression: コンパイル済みの式（code はNone）
+
+    Raises:
+        ValueError: 無効な式の場合
+    """
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError:
+        raise ValueError("無効な式です")
+    validator = _Validator()
+    body = _LiteralWrapper(expression).visit(validator.visit(tree).body)
+    names = tuple(validator.names)
+    arguments = ast.arguments(posonlyargs=[],
+                              args=[ast.arg(arg=name) for name in ('_number',) + names],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    function_tree = ast.fix_missing_locations(
+        ast.Expression(body=ast.Lambda(args=arguments, body=body)))
+    function = eval(compile(function_tree, '<expression>', 'eval'), _GLOBALS)
+    return CompiledExpression(None, names, function)
+
+
+def evaluate(expression, variables=None):
+    """数式を安全に計算
+
+    Args:
+        expression (str): 計算する数式（例: "100 + 200 * 1.08", "price * 1.08"）
+        variables (dict, optional): 式中の変数名と値の対応
+
+    Returns:
+        float: 計算結果
+
+    Raises:
+        ValueError: 無効な式、未定義の変数、ゼロ除算などで計算できない場合、
+            または計算結果が実数でない・大きすぎる場合（check_result() を参照）
+    """
+    compiled = compile_expression(normalize(expression))
+    try:
+        return check_result(eval(compiled.code, _GLOBALS, variables or {}))
+    except ValueError:
+        raise
+    except NameError as e:
+        raise ValueError(f"未定義の変数です: {e.name}")
+    except Exception:
+        raise ValueError("無効な式です")
+
+
+def evaluate_batch(expressions, variables=None):
+    """複数の数式を、共通の部分式を1回だけ計算してまとめて計算
+
+    Args:
+        expressions (iterable): 計算する数式
+        variables (dict, optional): 式中の変数名と値の対応
+
+    Returns:
+        list: 各式の計算結果
+
+    Raises:
+        ValueError: 無効な式、未定義の変数、またはゼロ除算などで計算できない式がある場合
+            （最初に計算できなかった式のエラー）
+    """
+    expressions = tuple(normalize(expression) for expression in expressions)
+    compiled = compile_batch(expressions)
+    variables = variables or {}
+    try:
+        return [check_result(result)
+                for result in compiled.function(*[variables[name] for name in compiled.names])]
+    except Exception:
+        # どの式で失敗したかを特定するため、1つずつ計算し直す
+        return [evaluate(expression, variables) for expression in expressions]
+
+
+def evaluate_exact(expression, variables, number):
+    """数値リテラルと変数の値を number() で変換して数式を計算
+
+    Args:
+        expression (str): 計算する数式
+        variables (dict): 式中の変数名と値の対応
+        number (callable): 数値リテラルの文字列または変数の値を受け取り、
+            四則演算・%・** に対応した数値に変換する関数
+
+    Returns:
+        object: number() が返す型の計算結果
+
+    Raises:
+        ValueError: 無効な式、未定義の変数、またはゼロ除算などで計算できない場合
+    """
+    compiled = compile_exact(normalize(expression))
+    try:
+        arguments = [number(variables[name]) for name in compiled.names]
+    except KeyError as e:
+        raise ValueError(f"未定義の変数です: {e.args[0]}")
+    try:
+        return compiled.function(number, *arguments)
+    except ValueError:
+        raise
+    except Exception:
+        raise ValueError("無効な式です")
+
+
+def evaluate_many(expression, columns, use_numpy=None):
+    """1つの式を列全体に対して一括で計算
+
+    式は1回だけコンパイルされます。列の値はすべて同じ長さである必要があります。
+    数値（スカラー）を渡した変数は全行で同じ値として扱います。
+
+    Args:
+        expression (str): 計算する数式（例: "price * qty * 1.08 - discount"）
+        columns (dict): 変数名と値の列（list・tupleなど）またはスカラーの対応
+        use_numpy (bool, optional): NumPyを使うかどうか
+            （省略時はNumPyがインストールされていれば使用）
+
+    Returns:
+        list | numpy.ndarray: 各行の計算結果（NumPy使用時はndarray）
+
+    Raises:
+        ValueError: 無効な式、未定義の変数、列の長さの不一致、
+            またはゼロ除算などで計算できない場合
+    """
+    compiled = compile_expression(normalize(expression))
+    missing = [name for name in compiled.names if name not in columns]
+    if missing:
+        raise ValueError(f"未定義の変数です: {', '.join(missing)}")
+    values = [columns[name] for name in compiled.names]
+    lengths = {len(value) for value in values if not isinstance(value, (int, float))}
+    if len(lengths) > 1:
+        raise ValueError("列の長さが一致しません")
+    length = lengths.pop() if lengths else 1
+
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    try:
+        if use_numpy:
+            if numpy is None:
+                raise ImportError("NumPyがインストールされていません")
+            arrays = [numpy.asarray(value, dtype=float) for value in values]
+            with numpy.errstate(divide='raise', invalid='raise', over='raise'):
+                result = compiled.function(*arrays)
+            return numpy.broadcast_to(result, (length,)).copy()
+        arguments = [repeat(value, length) if isinstance(value, (int, float)) else value
+                     for value in values]
+        if not arguments:
+            return [check_result(compiled.function())] * length
+        return list(map(check_result, map(compiled.function, *arguments)))
+    except (ValueError, ImportError):
+        raise
+    except Exception:
+        raise ValueError("無効な式です")
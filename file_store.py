@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ファイル保存ユーティリティモジュール
+Atomic writes, advisory file locks and file version signatures.
+
+保存は一時ファイルへ書き込んで fsync した後、rename で置き換えるため、
+書き込み途中でクラッシュしても元のファイルが壊れることはありません。
+複数のプロセスで同じファイルを共有する場合は、file_lock() による
+アドバイザリロックで書き込みを直列化します。
+"""
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # Windows以外
+    msvcrt = None
+
+# 新規作成するファイルの権限
+_DEFAULT_MODE = 0o644
+
+# 最後の行を探すときに末尾から1回に読み込むバイト数
+_TAIL_BLOCK = 4096
+
+
+@contextmanager
+def atomic_write(filename, mode='w', encoding='utf-8'):
+    """ファイルを原子的に書き込むコンテキストマネージャ
+
+    同じディレクトリの一時ファイルに書き込み、fsync した後に
+    os.replace() で置き換えます。ブロック内で例外が発生した場合、
+    元のファイルは変更されません。
+
+    Args:
+        filename (str): 書き込み先ファイル名
+        mode (str): 'w'（テキスト）または 'wb'（バイナリ）
+        encoding (str): テキストモードでのエンコーディング
+
+    Yields:
+        file: 一時ファイルのファイルオブジェクト
+    """
+    # tempfile は shutil・random などを読み込み起動が遅くなるため、最初の書き込み時に読み込む
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_name = tempfile.mkstemp(prefix=f".{os.path.basename(filename)}.",
+                                     suffix=".tmp", dir=directory)
+    try:
+        with open(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            # mkstemp は所有者のみ読み書き可能な権限で作成するため、既存ファイルの権限に合わせる
+            try:
+                os.chmod(temp_name, os.stat(filename).st_mode & 0o7777)
+            except FileNotFoundError:
+                os.chmod(temp_name, _DEFAULT_MODE)
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_name, filename)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
+
+
+def fsync_directory(directory):
+    """ファイルの作成・rename の結果を確実に永続化するため、ディレクトリを fsync する"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return  # Windowsではディレクトリを開けない
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def file_lock(filename, shared=False):
+    """ファイルに対するアドバイザリロックを取得するコンテキストマネージャ
+
+    ロックは '<filename>.lock' ファイルに対して取得するため、
+    対象ファイルが rename で置き換えられても有効です。
+    同じプロセス内で入れ子に取得するとデッドロックするため、呼び出し側で管理してください。
+
+    排他ロックの解放時にはロックファイルを削除します（ロックファイルが溜まらないように）。
+    削除の前に同じファイルを開いて待っていたプロセスは、ロックの取得後にファイルが
+    削除されていることを検出して、新しいロックファイルで取得し直します。
+    fcntl が使えない環境（Windows）では、開いているファイルを削除できないため残ります。
+
+    Args:
+        filename (str): ロック対象のファイル名
+        shared (bool): Trueの場合は共有ロック（fcntlが使えない環境では排他ロック）
+    """
+    lock_name = filename + ".lock"
+    while True:
+        f = open(lock_name, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                if not _is_current(f, lock_name):
+                    # 待っている間に他のプロセスが解放して削除した
+                    f.close()
+                    continue
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            f.close()
+            raise
+        break
+    with f:
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                if not shared:
+                    try:
+                        os.remove(lock_name)
+                    except OSError:
+                        pass
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _is_current(f, filename):
+    """開いているファイルが filename の現在のファイルか判定（削除・置き換えされていないか）"""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(f.fileno())
+    return (stat.st_dev, stat.st_ino) == (opened.st_dev, opened.st_ino)
+
+
+def signature(*filenames):
+    """ファイルの版を識別するシグネチャを取得
+
+    原子的な保存では毎回新しいファイルに置き換わるため、
+    inode・サイズ・更新時刻の組で変更を検出できます。
+
+    Args:
+        *filenames (str): 対象のファイル名
+
+    Returns:
+        tuple: 各ファイルの (inode, サイズ, 更新時刻) の組（存在しないファイルはNone）
+    """
+    result = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            result.append(None)
+        else:
+            result.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return tuple(result)
+
+
+def tail(filename):
+    """ファイルの最後の完全な行と、その行末までのバイト数を取得
+
+    書き込み途中でクラッシュした場合に残る不完全な末尾行（改行で終わらない行）は無視します。
+    追記するファイルは、追記の前にこのバイト数まで切り詰めて不完全な末尾行を取り除きます。
+
+    Args:
+        filename (str): 対象のファイル名
+
+    Returns:
+        tuple: (最後の行のバイト列（完全な行がない場合はNone）, 完全な行の末尾までのバイト数)
+    """
+    with open(filename, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        while position > 0:
+            step = min(_TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+            end = data.rfind(b"\n")
+            if end < 0:
+                continue
+            start = data.rfind(b"\n", 0, end)
+            if start >= 0 or position == 0:
+                return data[start + 1:end + 1], position + end + 1
+    return None, 0
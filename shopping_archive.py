@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+完了済みアイテムのアーカイブモジュール
+Append-only archive of completed items, segmented by month.
+
+完了済みアイテムの履歴を、完了した月ごとのファイル（<ディレクトリ>/YYYY-MM.jsonl、
+1行1アイテムのJSON Lines形式）に追記して保存します。ShoppingList に archive を
+指定すると、完了済みアイテムは直近の recent_completed 件だけをリストに残し、
+それより古いものをアーカイブに移すため、自動保存の時間は履歴の長さによりません。
+
+履歴は月ごとに読み出すため、ページ単位の取得（items()）や期間の検索
+（completed_between()）は対象の月のファイルだけを読み込みます。
+
+使用例:
+    archive = CompletedArchive("shopping_list.archive")
+    shopping = ShoppingList("shopping_list.json", archive=archive)
+    page = shopping.completed_page(1, per_page=50)   # 新しい順の最初の50件
+"""
+
+import json
+import os
+import re
+from collections import namedtuple
+from math import ceil
+
+import file_store
+from shopping_item import ShoppingItem, format_timestamp
+
+# 月ごとのファイル名
+_SEGMENT = re.compile(r"(\d{4}-\d{2})\.jsonl")
+
+# 完了済みアイテムの1ページ（items は新しい順）
+CompletedPage = namedtuple('CompletedPage', ['items', 'page', 'per_page', 'total', 'pages'])
+
+
+def make_page(items, page, per_page, total):
+    """ページ番号・件数から CompletedPage を作成
+
+    Args:
+        items (list): ページのアイテム（ShoppingItem）
+        page (int): ページ番号（1から）
+        per_page (int): 1ページの件数
+        total (int): 全体の件数
+
+    Returns:
+        CompletedPage: ページ
+    """
+    return CompletedPage(items, page, per_page, total, ceil(total / per_page))
+
+
+def month_of(timestamp):
+    """完了日時が属する月を取得
+
+    Args:
+        timestamp (float): エポック秒
+
+    Returns:
+        str: "YYYY-MM" 形式の月
+    """
+    return format_timestamp(timestamp)[:7]
+
+
+class CompletedArchive:
+    """完了済みアイテムを月ごとのファイルに追記して保存するアーカイブ
+
+    ファイルへの追記はアドバイザリロックの下で行い、fsync してから戻ります。
+    追記の後でリストの保存前にクラッシュした場合、同じアイテムが再びアーカイブに
+    渡されますが、月ごとのファイルの最後の行と照合して、既にアーカイブしたアイテムは
+    追記しません（アイテムはIDと完了日時で識別します）。
+    Append-only, month-segmented JSON Lines archive of completed items.
+
+    Attributes:
+        directory (str): 月ごとのファイルを置くディレクトリ
+    """
+
+    def __init__(self, directory):
+        """CompletedArchiveクラスの初期化
+
+        Args:
+            directory (str): 月ごとのファイルを置くディレクトリ（最初の追記時に作成）
+        """
+        self.directory = directory
+        self._counts = {}  # 月 → (ファイルのシグネチャ, 件数)
+
+    def months(self):
+        """アーカイブされている月の一覧を取得
+
+        Returns:
+            list: "YYYY-MM" 形式の月（古い順）
+        """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(match.group(1) for match in map(_SEGMENT.fullmatch, names) if match)
+
+    def append(self, items):
+        """完了済みアイテムをアーカイブに追記
+
+        アイテムは完了した月ごとのファイルに、渡した順に追記します。
+
+        Args:
+            items (list): 完了済みアイテム（ShoppingItem、完了順）
+
+        Raises:
+            IOError: ファイル書き込みエラーの場合
+        """
+        segments = {}
+        for item in items:
+            segments.setdefault(month_of(item.completed_at), []).append(item)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with file_store.file_lock(os.path.join(self.directory, "archive")):
+                created = False
+                for month, group in segments.items():
+                    created |= self._append_segment(month, group)
+                if created:
+                    file_store.fsync_directory(self.directory)
+        except Exception as e:
+            raise IOError(f"アーカイブ書き込みエラー: {e}")
+
+    def count(self, month=None):
+        """アーカイブされているアイテムの件数を取得
+
+        月ごとの件数はファイルが変わるまでキャッシュします。
+
+        Args:
+            month (str, optional): "YYYY-MM" 形式の月（省略時はすべての月）
+
+        Returns:
+            int: 件数
+        """
+        months = self.months() if month is None else [month]
+        return sum(self._count(month) for month in months)
+
+    def iter_items(self, newest_first=False):
+        """アーカイブされているアイテムを1件ずつ返す
+
+        読み込みは月ごとに行うため、履歴全体をメモリに読み込みません。
+
+        Args:
+            newest_first (bool): Trueの場合は新しい順（省略時は古い順）
+
+        Yields:
+            ShoppingItem: 完了済みアイテム
+        """
+        months = self.months()
+        if not newest_first:
+            for month in months:
+                yield from self._read(month)
+            return
+        for month in reversed(months):
+            yield from reversed(self._read(month))
+
+    def items(self, offset=0, limit=None, newest_first=True):
+        """アーカイブされているアイテムの一部を取得（ページ単位の表示用）
+
+        月ごとの件数で読み飛ばすため、読み込むのは対象のアイテムを含む月のファイルだけです。
+
+        Args:
+            offset (int): 読み飛ばす件数
+            limit (int, optional): 取得する最大件数（省略時はすべて）
+            newest_first (bool): Trueの場合は新しい順（省略時）
+
+        Returns:
+            list: 完了済みアイテム（ShoppingItem）
+        """
+        months = self.months()
+        if newest_first:
+            months.reverse()
+        result = []
+        for month in months:
+            if limit is not None and len(result) >= limit:
+                break
+            count = self._count(month)
+            if offset >= count:
+                offset -= count
+                continue
+            items = self._read(month)
+            if newest_first:
+                items.reverse()
+            end = None if limit is None else offset + limit - len(result)
+            result.extend(items[offset:end])
+            offset = 0
+        return result
+
+    def completed_between(self, start, end):
+        """期間内に完了したアイテムを取得
+
+        期間に含まれる月のファイルだけを読み込みます。
+
+        Args:
+            start (float): 期間の開始（エポック秒、この時刻を含む）
+            end (float): 期間の終了（エポック秒、この時刻を含まない）
+
+        Returns:
+            list: 完了済みアイテム（ShoppingItem、古い月から順に）
+        """
+        if start >= end:
+            return []
+        first, last = month_of(start), month_of(end)
+        return [item for month in self.months() if first <= month <= last
+                for item in self._read(month) if start <= item.completed_at < end]
+
+    def _path(self, month):
+        """月のファイル名（内部メソッド）"""
+        return os.path.join(self.directory, f"{month}.jsonl")
+
+    def _append_segment(self, month, items):
+        """1か月分のアイテムをファイルに追記（内部メソッド、ロックの下で呼び出す）
+
+        ファイルの最後の行のアイテムが items に含まれる場合は、それ以前のアイテムは
+        アーカイブ済みとして追記しません。不完全な末尾行は切り詰めてから追記します。
+
+        Returns:
+            bool: ファイルを新しく作成した場合True
+        """
+        path = self._path(month)
+        try:
+            last, size = file_store.tail(path)
+        except FileNotFoundError:
+            last, size, created = None, 0, True
+        else:
+            created = False
+        if last is not None:
+            data = json.loads(last)
+            keys = [(item.id, format_timestamp(item.completed_at)) for item in items]
+            key = (data.get('id'), data.get('completed_date'))
+            if key in keys:
+                items = items[len(keys) - keys[::-1].index(key):]
+        if not items:
+            return False
+        lines = "".join(json.dumps(item.to_dict(), ensure_ascii=False, separators=(',', ':'))
+                        + "\n" for item in items)
+        with open(path, 'ab') as f:
+            if f.tell() != size:
+                f.truncate(size)
+            f.write(lines.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        return created
+
+    def _read(self, month):
+        """1か月分のアイテムを読み込む（内部メソッド）
+
+        Returns:
+            list: 完了済みアイテム（ShoppingItem、追記した順）
+        """
+        items = []
+        try:
+            with open(self._path(month), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # 不完全な末尾行
+                    items.append(ShoppingItem.from_dict(json.loads(line)))
+        except FileNotFoundError:
+            pass
+        return items
+
+    def _count(self, month):
+        """1か月分の件数（内部メソッド、ファイルが変わるまでキャッシュ）"""
+        path = self._path(month)
+        signature = file_store.signature(path)
+        cached = self._counts.get(month)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        count = 0
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    count += block.count(b"\n")
+        except FileNotFoundError:
+            pass
+        self._counts[month] = (signature, count)
+        return count
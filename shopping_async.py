@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+非同期APIモジュール
+Asyncio front end for ShoppingList and Calculator.
+
+asyncio のサービスから買い物リストと電卓を使うためのコルーチン版のAPIです。
+ファイルの読み書きを伴う操作はイベントループをブロックしないようスレッドプール（executor）で
+実行し、同じリストへの操作はリストごとの asyncio.Lock で要求した順に直列化します。
+
+使用例:
+    shopping = AsyncShoppingList(ShoppingList("shopping_list.json"))
+    await shopping.add_item('りんご', 3, 298)
+    total = await shopping.calculate_total()
+"""
+
+import asyncio
+from functools import partial
+
+from calculator import Calculator
+from shopping_list import ShoppingList
+
+
+class AsyncShoppingList:
+    """ShoppingList のコルーチン版のAPIを提供するクラス
+
+    変更操作は自動保存でファイルに書き込むため executor で実行します。
+    ただし、読み込み済みで書き込み遅延モードのリストはメモリ上の変更だけで済むため、
+    イベントループ上で直接実行します（アーカイブを使用するリストは、変更のたびに
+    アーカイブに追記する場合があるため executor で実行します）。
+
+    Attributes:
+        shopping_list (ShoppingList): 操作対象のリスト
+        executor (concurrent.futures.Executor): ファイル操作を実行する executor
+            （Noneの場合はイベントループの既定の executor）
+    """
+
+    def __init__(self, shopping_list=None, executor=None):
+        """AsyncShoppingListクラスの初期化
+
+        Args:
+            shopping_list (ShoppingList, optional): 操作対象のリスト（省略時は shopping_list.json）
+            executor (concurrent.futures.Executor, optional): ファイル操作を実行する executor
+        """
+        self.shopping_list = ShoppingList() if shopping_list is None else shopping_list
+        self.executor = executor
+        # asyncio.Lock はイベントループの中で作成する（Python 3.9以前はループに結び付くため）
+        self._lock = None
+
+    async def add_item(self, item, quantity=1, price=None):
+        """アイテムをリストに追加
+
+        Returns:
+            str: 追加完了メッセージ
+        """
+        return await self._mutate(self.shopping_list.add_item, item, quantity, price)
+
+    async def add_items(self, items):
+        """複数のアイテムをまとめてリストに追加
+
+        Args:
+            items (iterable): (アイテム名, 数量, 価格) のタプル
+
+        Returns:
+            str: 追加完了メッセージ
+        """
+        return await self._mutate(self.shopping_list.add_items, list(items))
+
+    async def remove_item(self, index):
+        """指定されたインデックスのアイテムを削除
+
+        Raises:
+            IndexError: インデックスが範囲外の場合
+        """
+        return await self._mutate(self.shopping_list.remove_item, index)
+
+    async def complete_item(self, index):
+        """アイテムを完了済みに移動
+
+        Raises:
+            IndexError: インデックスが範囲外の場合
+        """
+        return await self._mutate(self.shopping_list.complete_item, index)
+
+    async def remove_by_id(self, item_id):
+        """IDを指定してアイテムを削除
+
+        Raises:
+            KeyError: 該当する未完了アイテムがない場合
+        """
+        return await self._mutate(self.shopping_list.remove_by_id, item_id)
+
+    async def complete_by_id(self, item_id):
+        """IDを指定してアイテムを完了済みに移動
+
+        Raises:
+            KeyError: 該当する未完了アイテムがない場合
+        """
+        return await self._mutate(self.shopping_list.complete_by_id, item_id)
+
+    async def get_items(self):
+        """未完了アイテムを取得
+
+        Returns:
+            list: 未完了アイテム（ShoppingItem、追加順）
+        """
+        return await self._read(lambda: list(self.shopping_list.get_items()))
+
+    async def get_completed_items(self):
+        """完了済みアイテムを取得
+
+        Returns:
+            list: 完了済みアイテム（ShoppingItem、完了順）
+        """
+        return await self._read(lambda: list(self.shopping_list.get_completed_items()))
+
+    async def completed_page(self, page=1, per_page=50):
+        """アーカイブを含む完了済みアイテムを新しい順にページ単位で取得
+
+        アーカイブを使用するリストは月ごとのファイルを読み込むため、executor で実行します。
+
+        Returns:
+            CompletedPage: ページ（ShoppingList.completed_page() を参照）
+        """
+        function = partial(self.shopping_list.completed_page, page, per_page)
+        if self.shopping_list.archive is not None:
+            return await self._run(function)
+        return await self._read(function)
+
+    async def calculate_total(self):
+        """価格が設定されている未完了アイテムの合計金額を取得
+
+        Returns:
+            int | float: 合計金額
+        """
+        return await self._read(self.shopping_list.calculate_total)
+
+    async def changes_since(self, revision):
+        """指定したリビジョンより後の変更を差分として取得
+
+        Returns:
+            dict: 差分（ShoppingList.changes_since() を参照）
+        """
+        return await self._read(partial(self.shopping_list.changes_since, revision))
+
+    async def apply_changes(self, delta):
+        """changes_since() で取得した差分をリストに適用
+
+        Returns:
+            dict: 適用結果（ShoppingList.apply_changes() を参照）
+        """
+        return await self._run(self.shopping_list.apply_changes, delta)
+
+    async def apply_ids(self, ids):
+        """apply_changes() で受け取り側が振り直したアイテムIDを適用
+
+        Returns:
+            int: IDを変更したアイテムの数（ShoppingList.apply_ids() を参照）
+        """
+        return await self._run(self.shopping_list.apply_ids, ids)
+
+    async def save_to_file(self, filename, format=None):
+        """リストをファイルに保存
+
+        Raises:
+            IOError: ファイル保存エラーの場合
+        """
+        return await self._run(self.shopping_list.save_to_file, filename, format)
+
+    async def load_from_file(self, filename, format=None):
+        """ファイルからリストを読み込み
+
+        Raises:
+            FileNotFoundError: ファイルが見つからない場合
+            IOError: ファイル読み込みエラーの場合
+        """
+        return await self._run(self.shopping_list.load_from_file, filename, format)
+
+    async def export(self, filename, format=None):
+        """リストを人間が読みやすい形式で出力
+
+        Raises:
+            ValueError: 未対応の形式の場合
+            IOError: ファイル出力エラーの場合
+        """
+        return await self._run(self.shopping_list.export, filename, format)
+
+    async def flush(self):
+        """保存待ちの変更を直ちに保存"""
+        return await self._run(self.shopping_list.flush)
+
+    async def close(self):
+        """保存待ちの変更を保存してリストを閉じる"""
+        return await self._run(self.shopping_list.close)
+
+    def _get_lock(self):
+        """リストのロックを取得（初回はここで作成、内部メソッド）"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _run(self, method, *args):
+        """メソッドをリストのロックの下で executor で実行（内部メソッド）"""
+        async with self._get_lock():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(method, *args))
+
+    async def _mutate(self, method, *args):
+        """変更操作を実行（内部メソッド）
+
+        ディスクに書き込まない場合（読み込み済みの書き込み遅延モードで、アーカイブを
+        使用しない場合）は直接実行します。
+        """
+        shopping = self.shopping_list
+        if shopping.loaded and shopping.write_behind and shopping.archive is None:
+            async with self._get_lock():
+                return method(*args)
+        return await self._run(method, *args)
+
+    async def _read(self, function):
+        """読み出し操作を実行（内部メソッド）
+
+        読み込み済みの場合はメモリ上の読み出しのみのため直接実行し、
+        未読み込みの場合は読み込みを executor で行います。
+        """
+        if self.shopping_list.loaded:
+            async with self._get_lock():
+                return function()
+        return await self._run(function)
+
+
+class AsyncCalculator:
+    """Calculator のコルーチン版のAPIを提供するクラス
+
+    計算はメモリ上で完結し短時間で終わるため、executor を使わずイベントループ上で実行します。
+
+    Attributes:
+        calculator (Calculator): 計算に使用する電卓
+    """
+
+    def __init__(self, calculator=None):
+        """AsyncCalculatorクラスの初期化
+
+        Args:
+            calculator (Calculator, optional): 計算に使用する電卓（省略時は新しく作成）
+        """
+        self.calculator = Calculator() if calculator is None else calculator
+
+    async def add(self, a, b):
+        """加算を実行"""
+        return self.calculator.add(a, b)
+
+    async def subtract(self, a, b):
+        """減算を実行"""
+        return self.calculator.subtract(a, b)
+
+    async def multiply(self, a, b):
+        """乗算を実行"""
+        return self.calculator.multiply(a, b)
+
+    async def divide(self, a, b):
+        """除算を実行
+
+        Raises:
+            ValueError: 除数が0の場合
+        """
+        return self.calculator.divide(a, b)
+
+    async def calculate(self, expression, variables=None):
+        """文字列として与えられた数式を計算
+
+        Raises:
+            ValueError: 無効な式の場合
+        """
+        return self.calculator.calculate_expression(expression, variables)
+
+    async def get_history(self):
+        """計算履歴を取得
+
+        Returns:
+            list: 計算履歴を整形した文字列のリスト（古い順）
+        """
+        return self.calculator.get_history()
+
+    async def clear_history(self):
+        """計算履歴をクリア"""
+        self.calculator.clear_history()
@@ -0,0 +1,686 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+買い物リストの保存先モジュール
+Pluggable storage backends for ShoppingList (JSON files and SQLite).
+
+ShoppingList はアイテムをメモリ上で管理し、変更内容（'add'・'remove'・'complete'・'archive'、
+差分同期の 'recomplete'・'remove_completed'・'rename' のレコード）を保存先（バックエンド）に
+渡して永続化します。
+
+- JsonFileBackend: JSONファイル（または列指向形式）とジャーナル（既定）
+- SQLiteBackend: SQLiteデータベース。変更は1行単位の INSERT・DELETE・UPDATE で保存し、
+  合計金額・未完了アイテム・期間内の完了アイテムはリストを読み込まずにSQLで取得できます
+
+使用例:
+    shopping = ShoppingList(backend=SQLiteBackend("shopping_list.db"))
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from datetime import datetime
+from decimal import Decimal
+from itertools import groupby
+
+import file_store
+import shopping_columnar
+import shopping_metrics
+import shopping_stream
+from shopping_item import ShoppingItem, parse_timestamp
+from shopping_journal import MutationJournal
+
+# 読み込み中にファイルが更新された場合に読み直す回数
+READ_RETRIES = 5
+
+# SQLite保存先のスキーマ（ShoppingListStore と共通）
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lists (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    next_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    list_id INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    quantity NUMERIC NOT NULL,
+    price NUMERIC,
+    added_at REAL NOT NULL,
+    completed_at REAL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (list_id, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_by_seq ON items (list_id, seq);
+CREATE INDEX IF NOT EXISTS pending_items ON items (list_id, seq, price, quantity, completed_at)
+    WHERE completed_at IS NULL;
+CREATE INDEX IF NOT EXISTS completed_items ON items (list_id, completed_at)
+    WHERE completed_at IS NOT NULL;
+"""
+
+# SQL文は定数とし、sqlite3 の接続ごとの文キャッシュでコンパイル済みの文を再利用する
+# 合計金額は未完了アイテムの部分インデックス pending_items（カバリングインデックス）だけで計算する
+_SELECT_LIST = "SELECT id, next_id, seq FROM lists WHERE name = ?"
+_CREATE_LIST = ("INSERT OR IGNORE INTO lists (name, next_id, seq, updated_at)"
+                " VALUES (?, 1, 0, 0)")
+_UPDATE_LIST = ("UPDATE lists SET next_id = MAX(next_id, ?), seq = MAX(seq, ?),"
+                " updated_at = ? WHERE id = ?")
+_SET_SEQ = "UPDATE lists SET seq = ? WHERE id = ?"
+_SELECT_ITEMS = ("SELECT item_id, name, quantity, price, added_at, completed_at"
+                 " FROM items WHERE list_id = ? ORDER BY seq")
+_INSERT_ITEM = ("INSERT INTO items (list_id, item_id, name, quantity, price,"
+                " added_at, completed_at, seq) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_DELETE_ITEM = ("DELETE FROM items WHERE list_id = ? AND item_id = ?"
+                " AND completed_at IS NULL")
+_COMPLETE_ITEM = ("UPDATE items SET completed_at = ?, seq = ?"
+                  " WHERE list_id = ? AND item_id = ? AND completed_at IS NULL")
+_RECOMPLETE_ITEM = ("UPDATE items SET completed_at = ?"
+                    " WHERE list_id = ? AND item_id = ? AND completed_at IS NOT NULL")
+_DELETE_COMPLETED = ("DELETE FROM items WHERE list_id = ? AND item_id = ?"
+                     " AND completed_at IS NOT NULL")
+_RENAME_ITEM = "UPDATE items SET item_id = ? WHERE list_id = ? AND item_id = ?"
+_CLEAR_ITEMS = "DELETE FROM items WHERE list_id = ?"
+_ARCHIVE_ITEMS = ("DELETE FROM items WHERE list_id = ? AND completed_at IS NOT NULL AND seq <="
+                  " (SELECT seq FROM items WHERE list_id = ? AND item_id = ?"
+                  " AND completed_at IS NOT NULL)")
+_PENDING_PAGE = ("SELECT item_id, name, quantity, price, added_at, completed_at, seq"
+                 " FROM items WHERE list_id = ? AND completed_at IS NULL AND seq > ?"
+                 " ORDER BY seq LIMIT ?")
+_COMPLETED_PAGE = ("SELECT item_id, name, quantity, price, added_at, completed_at, seq"
+                   " FROM items WHERE list_id = ? AND completed_at IS NOT NULL AND seq > ?"
+                   " ORDER BY seq LIMIT ?")
+_TOTAL = ("SELECT SUM(price * quantity),"
+          " MAX(typeof(price) = 'real' OR typeof(quantity) = 'real')"
+          " FROM items WHERE list_id = ? AND completed_at IS NULL AND price")
+_EXACT_TOTAL = ("SELECT exact_total(price, quantity) FROM items"
+                " WHERE list_id = ? AND completed_at IS NULL AND price")
+_COMPLETED_BETWEEN = ("SELECT item_id, name, quantity, price, added_at, completed_at"
+                      " FROM items WHERE list_id = ? AND completed_at >= ?"
+                      " AND completed_at < ? ORDER BY seq")
+
+# iter_items() で1回に読み出す行数
+PAGE_SIZE = 1000
+
+
+def replace_record(state):
+    """リスト全体を置き換える変更内容を作成
+
+    Args:
+        state (tuple): (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq)
+
+    Returns:
+        dict: 'replace' レコード
+    """
+    items, completed_items, next_id, seq = state
+    return {'op': 'replace', 'items': items, 'completed_items': completed_items,
+            'next_id': next_id, 'seq': seq}
+
+
+def ensure_list(connection, name):
+    """リストの行を（なければ作成して）取得
+
+    Args:
+        connection (sqlite3.Connection): データベース接続
+        name (str): リスト名
+
+    Returns:
+        tuple: (行ID, next_id, seq)
+    """
+    connection.execute(_CREATE_LIST, (name,))
+    return connection.execute(_SELECT_LIST, (name,)).fetchone()
+
+
+def read_list(connection, name):
+    """リストをデータベースから読み込む
+
+    Args:
+        connection (sqlite3.Connection): データベース接続
+        name (str): リスト名
+
+    Returns:
+        tuple: (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq)
+    """
+    row = connection.execute(_SELECT_LIST, (name,)).fetchone()
+    if row is None:
+        return [], [], 1, 0
+    list_id, next_id, seq = row
+    items = []
+    completed_items = []
+    for row in connection.execute(_SELECT_ITEMS, (list_id,)):
+        item = ShoppingItem(*row)
+        (items if item.completed_at is None else completed_items).append(item)
+    return items, completed_items, next_id, seq
+
+
+def write_records(connection, list_id, records):
+    """変更内容をデータベースに反映（トランザクションは呼び出し側で管理）
+
+    連続する同じ種類の変更は executemany() でまとめて実行します。
+    リストの next_id・seq は変更内容から求めた値に更新します（小さくはしません）。
+
+    Args:
+        connection (sqlite3.Connection): データベース接続
+        list_id (int): リストの行ID
+        records (list): 変更内容の列
+
+    Raises:
+        sqlite3.IntegrityError: 既に存在するIDのアイテムを追加しようとした場合
+    """
+    next_id, seq = 1, 0
+    for op, group in groupby(records, key=lambda record: record['op']):
+        group = list(group)
+        _apply(connection, list_id, op, group)
+        for record in group:
+            if op == 'add':
+                next_id = max(next_id, record['item']['id'] + 1)
+            elif op == 'rename':
+                next_id = max(next_id, record['new_id'] + 1)
+            elif op == 'replace':
+                next_id = max(next_id, record['next_id'])
+            seq = max(seq, record['seq'])
+    connection.execute(_UPDATE_LIST, (next_id, seq, time.time(), list_id))
+
+
+def _apply(connection, list_id, op, records):
+    """同じ種類の変更内容をまとめてデータベースに反映（内部関数）
+
+    Args:
+        connection (sqlite3.Connection): データベース接続
+        list_id (int): リストの行ID
+        op (str): 'add'・'remove'・'complete'・'recomplete'・'remove_completed'・'rename'・
+            'archive'・'replace'
+        records (list): 変更内容の列
+    """
+    execute = connection.executemany
+    if op == 'add':
+        execute(_INSERT_ITEM, [
+            (list_id, record['item']['id'], record['item']['name'],
+             record['item']['quantity'], record['item']['price'],
+             parse_timestamp(record['item']['added_date']), None, record['seq'])
+            for record in records])
+    elif op == 'remove':
+        execute(_DELETE_ITEM, [(list_id, record['id']) for record in records])
+    elif op == 'complete':
+        execute(_COMPLETE_ITEM, [(parse_timestamp(record['completed_date']), record['seq'],
+                                  list_id, record['id']) for record in records])
+    elif op == 'recomplete':
+        execute(_RECOMPLETE_ITEM, [(parse_timestamp(record['completed_date']), list_id,
+                                    record['id']) for record in records])
+    elif op == 'remove_completed':
+        execute(_DELETE_COMPLETED, [(list_id, record['id']) for record in records])
+    elif op == 'rename':
+        execute(_RENAME_ITEM, [(record['new_id'], list_id, record['id']) for record in records])
+    elif op == 'archive':
+        # アーカイブに移した完了済みアイテム（完了順で record['id'] まで）を取り除く
+        execute(_ARCHIVE_ITEMS, [(list_id, list_id, record['id']) for record in records])
+    elif op == 'replace':
+        # 全件を置き換える（並び順は負の連番で保持）
+        record = records[-1]
+        connection.execute(_CLEAR_ITEMS, (list_id,))
+        for section in (record['items'], record['completed_items']):
+            execute(_INSERT_ITEM, [
+                (list_id, item.id, item.name, item.quantity, item.price,
+                 item.added_at, item.completed_at, position - len(section))
+                for position, item in enumerate(section)])
+
+
+def is_columnar(filename, format=None):
+    """保存形式が列指向形式か判定
+
+    Args:
+        filename (str): ファイル名
+        format (str, optional): 'json'・'columnar'（省略時は拡張子で判定）
+
+    Returns:
+        bool: 列指向形式の場合True
+    """
+    if format is None:
+        return shopping_columnar.is_columnar_file(filename)
+    return format == 'columnar'
+
+
+def read_file(filename, format=None, journal=None):
+    """スナップショットファイルとジャーナルを読み込む
+
+    読み込みはロックを取得せずに行い、読み込み中に他のプロセスがファイルを
+    更新した場合は読み直します（更新が続く場合はロックを取得して読み込みます）。
+    ジャーナルのみが存在する場合は、空のリストにジャーナルを再生した状態とします。
+
+    Args:
+        filename (str): スナップショットのファイル名
+        format (str, optional): 'json'・'columnar'（省略時は拡張子で判定）
+        journal (MutationJournal, optional): 再生するジャーナル
+            （省略時は '<filename>.journal'）
+
+    Returns:
+        tuple: ((未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq,
+            スナップショット以降のジャーナルレコードのリスト), 読み込んだ版のシグネチャ)
+
+    Raises:
+        FileNotFoundError: ファイルが見つからない場合
+        ValueError: ファイルの内容が正しくない場合
+    """
+    if journal is None:
+        journal = MutationJournal(filename + ".journal")
+    for _ in range(READ_RETRIES):
+        before = file_store.signature(filename, journal.filename)
+        state = _read_file_once(filename, format, journal)
+        if file_store.signature(filename, journal.filename) == before:
+            return state, before
+    with file_store.file_lock(filename):
+        before = file_store.signature(filename, journal.filename)
+        return _read_file_once(filename, format, journal), before
+
+
+def _read_file_once(filename, format, journal):
+    """read_file() の1回分の読み込み（内部関数）"""
+    if not os.path.exists(filename) and os.path.exists(journal.filename):
+        items, completed_items, next_id, seq = [], [], 1, 0
+    elif is_columnar(filename, format):
+        items, completed_items, next_id, seq = shopping_columnar.read_snapshot(filename)
+    else:
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        items = [ShoppingItem.from_dict(item) for item in data.get('items', [])]
+        completed_items = [ShoppingItem.from_dict(item)
+                           for item in data.get('completed_items', [])]
+        next_id = data.get('next_id', 1)
+        seq = data.get('journal_seq', 0)
+    return items, completed_items, next_id, seq, list(journal.replay(after_seq=seq))
+
+
+def write_file(filename, state, format=None):
+    """リストの状態をスナップショットファイルに原子的に書き込む
+
+    Args:
+        filename (str): 保存先ファイル名
+        state (tuple): (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq)
+        format (str, optional): 'json'・'columnar'（省略時は拡張子で判定）
+    """
+    if is_columnar(filename, format):
+        shopping_columnar.write_snapshot(filename, *state)
+        return
+    items, completed_items, next_id, seq = state
+    data = {
+        'items': [item.to_dict() for item in items],
+        'completed_items': [item.to_dict() for item in completed_items],
+        'next_id': next_id,
+        'journal_seq': seq,
+        'saved_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    with file_store.atomic_write(filename) as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class StorageBackend:
+    """買い物リストの保存先の基底クラス
+
+    ShoppingList は read() で状態を読み込み、変更のたびに write() で変更内容を保存します。
+    iter_items()・total()・completed_between() は、リストを読み込まずに保存先から直接
+    結果を得られる場合に実装します（None を返すと ShoppingList がリストを読み込んで計算します）。
+
+    Attributes:
+        location (str): メッセージに表示する保存先の名前
+    """
+
+    location = ""
+
+    def read(self):
+        """保存されている状態を読み込む
+
+        Returns:
+            tuple: (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq,
+                読み込み後に適用する変更内容のリスト)
+        """
+        raise NotImplementedError
+
+    def needs_snapshot(self, count):
+        """次の書き込みでリスト全体の状態が必要か判定
+
+        Args:
+            count (int): 書き込む変更内容の数
+
+        Returns:
+            bool: write() に状態を渡す必要がある場合True
+        """
+        return False
+
+    def write(self, records, state=None, force=False):
+        """変更内容を保存
+
+        Args:
+            records (list): 変更内容の列（連番 'seq' 付き）
+            state (tuple, optional): 変更内容を適用した後のリスト全体の状態
+                (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq)。
+                指定した場合は変更内容の代わりに状態全体を保存する
+            force (bool): Trueの場合、他のプロセスが更新していても state で上書きする
+                （リスト全体を置き換える load_from_file() などで使用する）
+
+        Returns:
+            bool: 保存した場合True。最後に read()・write() した後で他のプロセスが
+                更新していたため保存しなかった場合False（読み直してやり直す）
+        """
+        raise NotImplementedError
+
+    def iter_items(self, completed=False):
+        """保存先からアイテムを1件ずつ読み出す
+
+        Args:
+            completed (bool): Trueの場合は完了済みアイテム
+
+        Returns:
+            iterator: ShoppingItem のイテレータ（対応していない場合はNone）
+        """
+        return None
+
+    def total(self):
+        """保存先から未完了アイテムの合計金額を計算
+
+        Returns:
+            Decimal: 合計金額（対応していない場合はNone）
+        """
+        return None
+
+    def completed_between(self, start, end):
+        """保存先から期間内に完了したアイテムを取得
+
+        Args:
+            start (float): 期間の開始（エポック秒、この時刻を含む）
+            end (float): 期間の終了（エポック秒、この時刻を含まない）
+
+        Returns:
+            list: 完了済みアイテム（完了順、対応していない場合はNone）
+        """
+        return None
+
+    def file_saved(self, filename):
+        """リストがファイルに保存されたことを通知する
+
+        Args:
+            filename (str): 保存先ファイル名
+        """
+
+    def flush(self):
+        """バッファしている変更を保存"""
+
+    def close(self):
+        """保存先を閉じる"""
+
+
+class JsonFileBackend(StorageBackend):
+    """JSONファイル（拡張子 .slc の場合は列指向形式）に保存する保存先
+
+    通常は変更のたびにファイル全体を原子的に書き直します。journal=True の場合は
+    変更内容をジャーナル（<filename>.journal）に追記し、compact_threshold 件ごとに
+    スナップショットにまとめます。書き込みはアドバイザリロックの下で行い、
+    最後に同期した後で他のプロセスがファイルを更新していた場合は False を返します。
+
+    Attributes:
+        filename (str): スナップショットのファイル名
+        journal_mode (bool): ジャーナルに追記して保存するかどうか
+        compact_threshold (int): ジャーナルをスナップショットにまとめるまでのレコード数
+        journal (MutationJournal): ジャーナル
+    """
+
+    def __init__(self, filename="shopping_list.json", journal=False, compact_threshold=1000):
+        """JsonFileBackendクラスの初期化
+
+        Args:
+            filename (str): スナップショットのファイル名
+            journal (bool): Trueの場合、変更をジャーナルに追記して保存する
+            compact_threshold (int): ジャーナルをスナップショットにまとめるまでのレコード数
+        """
+        self.filename = self.location = filename
+        self.journal_mode = journal
+        self.compact_threshold = compact_threshold
+        self.journal = MutationJournal(filename + ".journal")
+        self._signature = None  # 最後に同期した時点のファイルのシグネチャ
+
+    def read(self):
+        """ファイルを読み込む
+
+        ファイル（またはジャーナル）がない場合は空のリストとします。
+        ファイルが壊れていて読み込めない場合は、次の保存で上書きされないよう
+        '<ファイル名>.corrupt' に退避して警告を出した上で空のリストとします。
+
+        Returns:
+            tuple: (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq,
+                スナップショット以降のジャーナルレコードのリスト)
+
+        Raises:
+            OSError: 内容以外の理由（権限など）でファイルを読み込めない場合
+        """
+        self._signature = self._current_signature()
+        if not any(self._signature):
+            return [], [], 1, 0, []
+        try:
+            state, self._signature = read_file(self.filename, journal=self.journal)
+            return state
+        except FileNotFoundError:
+            # 読み込み中に他のプロセスがジャーナルをまとめた場合など
+            return self.read()
+        except (ValueError, KeyError, TypeError) as e:
+            backup = self.filename + ".corrupt"
+            try:
+                os.replace(self.filename, backup)
+                # スナップショットなしでは再生できないジャーナルも退避する
+                if os.path.exists(self.journal.filename):
+                    os.replace(self.journal.filename, backup + ".journal")
+            except OSError:
+                backup = None
+            warnings.warn(f"'{self.filename}' を読み込めませんでした: {e}"
+                          + (f"（'{backup}' に退避しました）" if backup else ""))
+            self.journal.count = 0
+            self._signature = self._current_signature()
+            return [], [], 1, 0, []
+
+    def needs_snapshot(self, count):
+        return (not self.journal_mode
+                or self.journal.count + count >= self.compact_threshold)
+
+    def write(self, records, state=None, force=False):
+        with file_store.file_lock(self.filename):
+            previous = self._signature
+            if not force and previous is not None and self._current_signature() != previous:
+                return False
+            if state is not None:
+                write_file(self.filename, state)
+                self.journal.truncate()
+            elif records:
+                self.journal.append_many(records)
+            self._signature = self._current_signature()
+        if shopping_metrics.enabled:
+            shopping_metrics.increment('shopping_list_bytes_written_total',
+                                       _written_bytes(previous, self._signature, state is not None),
+                                       list=self.location)
+        return True
+
+    def iter_items(self, completed=False):
+        """スナップショットからアイテムを1件ずつ読み出す
+
+        ジャーナルが残っている場合はスナップショットだけでは最新の状態にならないため、
+        None を返します。
+        """
+        if os.path.exists(self.filename) and not os.path.exists(self.journal.filename):
+            return shopping_stream.iter_items(self.filename, completed)
+        return None
+
+    def file_saved(self, filename):
+        if filename == self.filename:
+            # 現在の状態で上書きしたため、以降はこの版を基準とする
+            self._signature = self._current_signature()
+
+    def _current_signature(self):
+        """ファイルとジャーナルの現在のシグネチャ（内部メソッド）"""
+        return file_store.signature(self.filename, self.journal.filename)
+
+
+def _written_bytes(previous, current, snapshot):
+    """書き込み前後のシグネチャから書き込んだバイト数を求める（内部関数）
+
+    スナップショットの場合はファイル全体、それ以外はジャーナルの増加分です。
+    """
+    def size(signature, index):
+        return signature[index][1] if signature and signature[index] else 0
+    if snapshot:
+        return size(current, 0) + size(current, 1)
+    return size(current, 1) - size(previous, 1)
+
+
+class _ExactTotal:
+    """価格 × 数量 を誤差なく合計するSQLiteの集約関数（内部クラス）
+
+    SQLiteはDecimalを扱えないため、合計は文字列で返します。
+    """
+
+    def __init__(self):
+        self.total = Decimal(0)
+
+    def step(self, price, quantity):
+        self.total += Decimal(str(price)) * Decimal(str(quantity))
+
+    def finalize(self):
+        return str(self.total)
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLiteデータベースに保存する保存先
+
+    変更は1行単位の INSERT・DELETE・UPDATE で保存するため、リストの大きさによらず
+    保存の時間は一定です。1つのデータベースに名前の異なる複数のリストを保存でき、
+    スキーマは ShoppingListStore と共通です。
+
+    合計金額（SUM(price * quantity)）・未完了アイテム・期間内に完了したアイテムは、
+    部分インデックスを使ってリストを読み込まずにSQLで取得します。
+    書き込みは BEGIN IMMEDIATE のトランザクションで行い、リストの連番が最後に同期した
+    時点から変わっていた場合（他のプロセスが更新した場合）は False を返します。
+
+    Attributes:
+        database (str): データベースファイル名
+        name (str): リスト名
+    """
+
+    def __init__(self, database="shopping_list.db", name="default"):
+        """SQLiteBackendクラスの初期化
+
+        Args:
+            database (str): データベースファイル名
+            name (str): リスト名
+        """
+        self.database = database
+        self.name = name
+        self.location = database if name == "default" else f"{database}#{name}"
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database, check_same_thread=False,
+                                           isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._connection.create_aggregate("exact_total", 2, _ExactTotal)
+        self._list_id = None
+        self._version = None  # 最後に同期した時点のリストの連番
+
+    def read(self):
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                items, completed_items, next_id, seq = read_list(self._connection, self.name)
+            finally:
+                self._connection.execute("COMMIT")
+            self._version = seq
+        return items, completed_items, next_id, seq, []
+
+    def write(self, records, state=None, force=False):
+        if state is not None:
+            records = [replace_record(state)]
+        if not records:
+            return True
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._list_id, _, seq = ensure_list(connection, self.name)
+                if not force and self._version is not None and seq != self._version:
+                    connection.execute("ROLLBACK")
+                    return False
+                write_records(connection, self._list_id, records)
+                if force:
+                    # 他のプロセスが置き換えを検出して読み直すよう、連番を必ず進める
+                    seq = max(seq + 1, records[-1]['seq'])
+                    connection.execute(_SET_SEQ, (seq, self._list_id))
+                connection.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                connection.execute("ROLLBACK")
+                return False
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            # リストの連番は変更内容の連番より小さくしない（_UPDATE_LIST）
+            self._version = max([seq] + [record['seq'] for record in records])
+        return True
+
+    def iter_items(self, completed=False):
+        """未完了（または完了済み）アイテムを部分インデックスの順に読み出す
+
+        PAGE_SIZE 件ずつ連番で区切って読み出すため、読み出し中も書き込めます。
+        """
+        return self._iter_pages(_COMPLETED_PAGE if completed else _PENDING_PAGE)
+
+    def _iter_pages(self, query):
+        """query の結果を PAGE_SIZE 件ずつ読み出す（内部メソッド）"""
+        list_id = self._get_list_id()
+        if list_id is None:
+            return
+        seq = -(1 << 63)
+        while True:
+            with self._lock:
+                rows = self._connection.execute(query, (list_id, seq, PAGE_SIZE)).fetchall()
+            for row in rows:
+                yield ShoppingItem(*row[:6])
+            if len(rows) < PAGE_SIZE:
+                return
+            seq = rows[-1][6]
+
+    def total(self):
+        """未完了アイテムの合計金額をSQLで計算
+
+        価格・数量がすべて整数の場合は SUM(price * quantity) で、
+        小数を含む場合は誤差が出ないよう集約関数 exact_total() で合計します。
+        """
+        list_id = self._get_list_id()
+        if list_id is None:
+            return Decimal(0)
+        with self._lock:
+            total, inexact = self._connection.execute(_TOTAL, (list_id,)).fetchone()
+            if inexact:
+                total, = self._connection.execute(_EXACT_TOTAL, (list_id,)).fetchone()
+        return Decimal(0) if total is None else Decimal(total)
+
+    def completed_between(self, start, end):
+        list_id = self._get_list_id()
+        if list_id is None:
+            return []
+        with self._lock:
+            rows = self._connection.execute(_COMPLETED_BETWEEN, (list_id, start, end)).fetchall()
+        return [ShoppingItem(*row) for row in rows]
+
+    def close(self):
+        """データベース接続を閉じる"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _get_list_id(self):
+        """リストの行IDを取得（リストがまだ保存されていない場合はNone、内部メソッド）"""
+        if self._list_id is None:
+            with self._lock:
+                row = self._connection.execute(_SELECT_LIST, (self.name,)).fetchone()
+            if row is not None:
+                self._list_id = row[0]
+        return self._list_id
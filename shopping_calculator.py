@@ -8,13 +8,15 @@ Shopping List Manager with Calculator Functionality
 - 四則演算（電卓機能）
 - 買い物リストの作成・編集・管理
 - JSONファイルでのリスト永続化
+
+起動を速くするため、電卓と買い物リストは対応するメニューを最初に使用した時点で
+モジュールの読み込みと作成を行います（--profile-startup で各部分の時間を確認できます）。
 """
 
+import importlib
 import os
 import sys
-
-from calculator import Calculator
-from shopping_list import ShoppingList
+import time
 
 
 class ShoppingCalculatorApp:
@@ -24,15 +26,46 @@ class ShoppingCalculatorApp:
     Main application class that integrates calculator and shopping list functionality.
     """
     
-    def __init__(self):
+    def __init__(self, shopping_list=None, list_file="shopping_list.json", money=None,
+                 archive=None):
         """ShoppingCalculatorAppクラスの初期化
         
-        電卓とショッピングリストのインスタンスを作成し、アプリケーション状態を初期化します。
+        アプリケーション状態を初期化します。電卓とショッピングリストは
+        最初に使用した時点で作成します。
+        
+        Args:
+            shopping_list (ShoppingList, optional): 使用する買い物リスト
+                （ShoppingListStore.open() で開いたリストなど。省略時は list_file）
+            list_file (str): shopping_list を省略した場合に自動保存するファイル
+            money (MoneyMode, optional): 電卓と買い物リスト（list_file）の金額モード
+            archive (CompletedArchive, optional): 買い物リスト（list_file）の完了済みアイテムの
+                履歴を移すアーカイブ
         """
-        self.calculator = Calculator()
-        self.shopping_list = ShoppingList()
+        self.money = money
+        self.archive = archive
+        self._calculator = None
+        self._shopping_list = shopping_list
+        self.list_file = list_file
+        self._list_status_shown = False
         self.running = True
     
+    @property
+    def calculator(self):
+        """電卓（最初に使用した時点で作成）"""
+        if self._calculator is None:
+            from calculator import Calculator
+            self._calculator = Calculator(money=self.money)
+        return self._calculator
+    
+    @property
+    def shopping_list(self):
+        """買い物リスト（最初に使用した時点で作成）"""
+        if self._shopping_list is None:
+            from shopping_list import ShoppingList
+            self._shopping_list = ShoppingList(self.list_file, money=self.money,
+                                               archive=self.archive)
+        return self._shopping_list
+    
     def display_menu(self):
         """メインメニューを表示
         
@@ -149,6 +182,7 @@ class ShoppingCalculatorApp:
         
         買い物リストの各種操作（追加、削除、完了、表示など）のサブメニューを提供します。
         """
+        self.show_list_status()
         while True:
             print("\n" + "-"*30)
             print("    買い物リスト管理")
@@ -180,6 +214,19 @@ class ShoppingCalculatorApp:
             except Exception as e:
                 print(f"エラーが発生しました: {e}")
     
+    def show_list_status(self):
+        """保存されたリストの状況を表示（最初の1回のみ）
+        
+        リストの読み込みは起動時ではなく、買い物リストを最初に使用する時点で行います。
+        """
+        if self._list_status_shown:
+            return
+        self._list_status_shown = True
+        items = self.shopping_list.get_items()
+        completed_items = self.shopping_list.get_completed_items()
+        if items or completed_items:
+            print(f"保存されたリストを読み込みました：未完了 {len(items)} 件、完了済み {len(completed_items)} 件")
+    
     def add_shopping_item(self):
         """買い物アイテムを追加
         
@@ -249,24 +296,12 @@ class ShoppingCalculatorApp:
         
         未完了および完了済みのアイテムを整理して表示します。
         """
-        items = self.shopping_list.get_items()
-        completed_items = self.shopping_list.get_completed_items()
-        
-        print("\n=== 買い物リスト ===")
-        
-        if items:
-            print("【未完了アイテム】")
-            for i, item in enumerate(items, 1):
-                price_str = f" - ¥{item['price']}" if item['price'] else ""
-                print(f"{i}. {item['name']} (数量: {item['quantity']}){price_str}")
-        else:
-            print("【未完了アイテム】\n(なし)")
+        from shopping_render import iter_text, write_lines
         
-        if completed_items:
-            print("\n【完了済みアイテム】")
-            for item in completed_items:
-                price_str = f" - ¥{item['price']}" if item['price'] else ""
-                print(f"✓ {item['name']} (数量: {item['quantity']}){price_str}")
+        print()
+        write_lines(iter_text(self.shopping_list.iter_items(),
+                              self.shopping_list.iter_items(completed=True),
+                              show_total=False))
     
     def display_total(self):
         """合計金額を計算・表示
@@ -306,6 +341,157 @@ class ShoppingCalculatorApp:
         except Exception as e:
             print(f"読み込みエラー: {e}")
     
+    def run_batch(self, lines, output=None):
+        """コマンドの列を対話なしで実行（バッチモード）
+        
+        1行に1つのコマンドを実行し、結果を1行に1つのJSONで出力します。
+        リストの自動保存はすべてのコマンドの実行後に1回だけ行います
+        （途中で中断された場合は変更を保存しません）。空行と '#' で始まる行は無視します。
+        
+        コマンド（引数は shlex で区切るため、空白を含む名前は引用符で囲みます）:
+            add 名前 [数量] [価格]      アイテムを追加
+            complete 番号 / remove 番号  アイテムを完了・削除（番号は1から）
+            complete-id ID / remove-id ID  IDを指定して完了・削除
+            calc 式                     式を計算（行の残り全体が式）
+            total                       合計金額
+            list                        未完了・完了済みアイテム
+            history [ページ] [件数]      アーカイブを含む完了済みアイテム（新しい順）
+            save ファイル名 / export ファイル名  保存・出力
+        
+        出力: {"line": 行番号, "command": コマンド, "result": 結果}
+        （エラーの場合は "result" の代わりに "error"）
+        
+        Args:
+            lines (iterable): コマンドの行
+            output (file, optional): 結果の出力先（省略時は標準出力）
+            
+        Returns:
+            int: エラーになったコマンドの数
+        """
+        import json
+        
+        if output is None:
+            output = sys.stdout
+        errors = 0
+        with self.shopping_list.batch():
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                command, _, rest = line.partition(' ')
+                response = {'line': number, 'command': command}
+                try:
+                    handler = self._BATCH_COMMANDS.get(command)
+                    if handler is None:
+                        raise ValueError(f"未対応のコマンドです: {command}")
+                    response.update(handler(self, rest.strip()))
+                except Exception as e:
+                    errors += 1
+                    response['error'] = str(e)
+                output.write(json.dumps(response, ensure_ascii=False))
+                output.write("\n")
+        return errors
+    
+    def _batch_add(self, args):
+        """バッチモードの add コマンド（内部メソッド）"""
+        import shlex
+        
+        args = shlex.split(args)
+        if not 1 <= len(args) <= 3:
+            raise ValueError("使い方: add 名前 [数量] [価格]")
+        quantity = int(args[1]) if len(args) > 1 else 1
+        price = float(args[2]) if len(args) > 2 else None
+        message = self.shopping_list.add_item(args[0], quantity, price)
+        item = self.shopping_list.get_items()[-1]
+        return {'result': message, 'id': item.id}
+    
+    def _batch_item_command(self, method, args):
+        """番号・IDを1つ受け取るバッチモードのコマンド（内部メソッド）"""
+        try:
+            number = int(args)
+        except ValueError:
+            raise ValueError("番号（整数）を指定してください")
+        return {'result': method(number)}
+    
+    def _batch_complete(self, args):
+        """バッチモードの complete コマンド（内部メソッド）"""
+        return self._batch_item_command(
+            lambda number: self.shopping_list.complete_item(number - 1), args)
+    
+    def _batch_remove(self, args):
+        """バッチモードの remove コマンド（内部メソッド）"""
+        return self._batch_item_command(
+            lambda number: self.shopping_list.remove_item(number - 1), args)
+    
+    def _batch_complete_id(self, args):
+        """バッチモードの complete-id コマンド（内部メソッド）"""
+        return self._batch_item_command(self.shopping_list.complete_by_id, args)
+    
+    def _batch_remove_id(self, args):
+        """バッチモードの remove-id コマンド（内部メソッド）"""
+        return self._batch_item_command(self.shopping_list.remove_by_id, args)
+    
+    def _batch_calc(self, args):
+        """バッチモードの calc コマンド（内部メソッド）"""
+        return {'result': self.calculator.calculate_expression(args)}
+    
+    def _batch_total(self, args):
+        """バッチモードの total コマンド（内部メソッド）"""
+        return {'result': self.shopping_list.calculate_total()}
+    
+    def _batch_list(self, args):
+        """バッチモードの list コマンド（内部メソッド）"""
+        return {'result': {
+            'items': [item.to_dict() for item in self.shopping_list.get_items()],
+            'completed_items': [item.to_dict()
+                                for item in self.shopping_list.get_completed_items()],
+        }}
+    
+    def _batch_history(self, args):
+        """バッチモードの history コマンド（内部メソッド）"""
+        try:
+            numbers = [int(arg) for arg in args.split()]
+        except ValueError:
+            raise ValueError("使い方: history [ページ] [件数]")
+        if len(numbers) > 2:
+            raise ValueError("使い方: history [ページ] [件数]")
+        page = self.shopping_list.completed_page(*numbers)
+        return {'result': [item.to_dict() for item in page.items],
+                'page': page.page, 'pages': page.pages, 'total': page.total}
+    
+    def _batch_save(self, args):
+        """バッチモードの save コマンド（内部メソッド）"""
+        return {'result': self.shopping_list.save_to_file(self._batch_filename(args))}
+    
+    def _batch_export(self, args):
+        """バッチモードの export コマンド（内部メソッド）"""
+        return {'result': self.shopping_list.export(self._batch_filename(args))}
+    
+    @staticmethod
+    def _batch_filename(args):
+        """ファイル名を1つ受け取る（内部メソッド）"""
+        import shlex
+        
+        args = shlex.split(args)
+        if len(args) != 1:
+            raise ValueError("ファイル名を1つ指定してください")
+        return args[0]
+    
+    # バッチモードのコマンド名と処理の対応
+    _BATCH_COMMANDS = {
+        'add': _batch_add,
+        'complete': _batch_complete,
+        'remove': _batch_remove,
+        'complete-id': _batch_complete_id,
+        'remove-id': _batch_remove_id,
+        'calc': _batch_calc,
+        'total': _batch_total,
+        'list': _batch_list,
+        'history': _batch_history,
+        'save': _batch_save,
+        'export': _batch_export,
+    }
+    
     def run(self):
         """アプリケーションのメインループ
         
@@ -314,12 +500,6 @@ class ShoppingCalculatorApp:
         """
         print("買い物リスト & 電卓アプリケーションを開始します")
         
-        # 起動時にショッピングリストの状況を表示
-        items = self.shopping_list.get_items()
-        completed_items = self.shopping_list.get_completed_items()
-        if items or completed_items:
-            print(f"保存されたリストを読み込みました：未完了 {len(items)} 件、完了済み {len(completed_items)} 件")
-        
         while self.running:
             try:
                 self.display_menu()
@@ -346,18 +526,116 @@ class ShoppingCalculatorApp:
                 print(f"予期しないエラーが発生しました: {e}")
 
 
-def main():
+def profile_startup(list_file="shopping_list.json", output=None):
+    """起動時間の内訳を計測して表示（--profile-startup）
+    
+    アプリケーションの作成と、各コンポーネントのモジュールの読み込み（import）・
+    初期化にかかった時間を、通常の起動と同じ順序で計測します。
+    
+    Args:
+        list_file (str): 自動保存する買い物リストのファイル
+        output (file, optional): 結果の出力先（省略時は標準出力）
+        
+    Returns:
+        list: (コンポーネント名, importの秒数, 初期化の秒数) のタプルのリスト
+    """
+    if output is None:
+        output = sys.stdout
+    
+    def timed(function):
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+    
+    app = None
+    
+    def create_app():
+        nonlocal app
+        app = ShoppingCalculatorApp(list_file=list_file)
+    
+    # (コンポーネント名, モジュール名, 初期化処理)
+    components = [
+        ("アプリケーション", None, create_app),
+        ("電卓", "calculator", lambda: app.calculator),
+        ("買い物リスト", "shopping_list", lambda: app.shopping_list),
+        ("リストの読み込み", None, lambda: app.shopping_list.get_items()),
+        ("リスト表示", "shopping_render", None),
+    ]
+    rows = []
+    for label, module, initialize in components:
+        import_time = timed(lambda: importlib.import_module(module)) if module else 0.0
+        init_time = timed(initialize) if initialize else 0.0
+        rows.append((label, import_time, init_time))
+    
+    # 全角文字は幅が揃わないため、コンポーネント名は最後の列に表示する
+    output.write(f"{'import(ms)':>12}{'初期化(ms)':>10}  コンポーネント\n")
+    for label, import_time, init_time in rows:
+        output.write(f"{import_time * 1000:>12.2f}{init_time * 1000:>12.2f}  {label}\n")
+    total = sum(import_time + init_time for _, import_time, init_time in rows)
+    output.write(f"{total * 1000:>24.2f}  合計\n")
+    return rows
+
+
+def main(argv=None):
     """メイン関数
     
     アプリケーションのエントリーポイント。ShoppingCalculatorAppのインスタンスを
-    作成し、メインループを開始します。
+    作成し、メインループを開始します。--batch を指定した場合は、ファイル
+    （'-' の場合は標準入力）のコマンドを対話なしで実行します。
+    --profile-startup を指定した場合は、起動時間の内訳を表示して終了します。
+    --money を指定した場合は、電卓と合計金額を金額モード（小数点以下2桁の整数）で計算します。
+    --archive を指定した場合は、古い完了済みアイテムを '<リストのファイル名>.archive' に移します。
+    
+    Args:
+        argv (list, optional): コマンドライン引数（省略時は sys.argv[1:]）
     
     Returns:
-        None
+        int: 終了ステータス（バッチモードでエラーがあった場合は1）
     """
-    app = ShoppingCalculatorApp()
-    app.run()
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        # 引数なしの通常の起動では argparse の読み込みを省く
+        ShoppingCalculatorApp().run()
+        return 0
+    
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="買い物リスト & 電卓アプリケーション")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="FILE（'-' の場合は標準入力）のコマンドを対話なしで実行する")
+    parser.add_argument("--list", default="shopping_list.json", metavar="FILE",
+                        help="自動保存する買い物リストのファイル")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="コンポーネントごとの import・初期化の時間を表示して終了する")
+    parser.add_argument("--money", action="store_true",
+                        help="浮動小数点数の誤差なしに金額を計算する（金額モード）")
+    parser.add_argument("--archive", action="store_true",
+                        help="古い完了済みアイテムを '<FILE>.archive' に月ごとに移す")
+    args = parser.parse_args(argv)
+    
+    if args.profile_startup:
+        profile_startup(args.list)
+        return 0
+    money = None
+    if args.money:
+        from shopping_money import MoneyMode
+        money = MoneyMode()
+    archive = None
+    if args.archive:
+        from shopping_archive import CompletedArchive
+        archive = CompletedArchive(args.list + ".archive")
+    app = ShoppingCalculatorApp(list_file=args.list, money=money, archive=archive)
+    if args.batch is None:
+        app.run()
+        return 0
+    if args.batch == '-':
+        errors = app.run_batch(sys.stdin)
+    else:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            errors = app.run_batch(f)
+    return 1 if errors else 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
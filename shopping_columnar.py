@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列指向バイナリスナップショットモジュール
+Columnar, memory-mappable binary snapshot format for shopping lists.
+
+JSONの代わりに、各フィールドを array 形式の列として連続して格納し、
+アイテム名は重複を除いた文字列テーブルに格納します。ファイルは mmap で開くため、
+大きなリストでもすぐに開くことができ、合計金額のような列の走査では
+アイテムを1件ずつ作成する必要がありません。
+
+ファイル構成（リトルエンディアン、各列は8バイト境界に配置）:
+    ヘッダー: マジック, バイト順, 未完了件数, 完了済み件数, 文字列数, next_id, journal_seq
+    未完了・完了済みの各セクション:
+        id (int64), quantity (float64), price (float64, 未設定はNaN),
+        added_at (float64), completed_at (float64, 未完了はNaN), name (uint32, 文字列番号)
+    文字列テーブル: オフセット (uint64 × (文字列数 + 1)), UTF-8バイト列
+
+使用例:
+    python3 shopping_columnar.py shopping_list.json shopping_list.slc
+    python3 shopping_columnar.py shopping_list.slc shopping_list.json
+"""
+
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from datetime import datetime
+
+from file_store import atomic_write
+from shopping_item import ShoppingItem
+
+# 列指向形式のファイル拡張子
+COLUMNAR_EXTENSION = ".slc"
+
+MAGIC = b"SLCOL\x00\x01\x00"
+_HEADER = struct.Struct("<8s?7xqqqqq")
+
+# (フィールド名, arrayの型コード)
+_COLUMNS = (
+    ('id', 'q'),
+    ('quantity', 'd'),
+    ('price', 'd'),
+    ('added_at', 'd'),
+    ('completed_at', 'd'),
+    ('name', 'I'),
+)
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+_NAN = float('nan')
+
+
+def is_columnar_file(filename):
+    """ファイル名が列指向形式を指すか判定
+
+    Args:
+        filename (str): ファイル名
+
+    Returns:
+        bool: 拡張子が COLUMNAR_EXTENSION の場合True
+    """
+    return filename.endswith(COLUMNAR_EXTENSION)
+
+
+def _padding(size):
+    """8バイト境界までの詰め物のバイト数"""
+    return -size % 8
+
+
+def _to_number(value):
+    """float64から読み出した値を、整数になる場合はintに戻す（NaNはNone）"""
+    if value != value:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def write_snapshot(filename, items, completed_items, next_id=1, journal_seq=0):
+    """アイテムを列指向形式でファイルに書き込む
+
+    Args:
+        filename (str): 出力先ファイル名
+        items (iterable): 未完了アイテム（ShoppingItem）
+        completed_items (iterable): 完了済みアイテム（ShoppingItem）
+        next_id (int): 次に割り当てるID
+        journal_seq (int): スナップショットに含まれる最後のジャーナル連番
+    """
+    strings = {}
+    sections = []
+    for section in (items, completed_items):
+        columns = {name: array(code) for name, code in _COLUMNS}
+        for item in section:
+            columns['id'].append(item.id)
+            columns['quantity'].append(item.quantity)
+            columns['price'].append(_NAN if item.price is None else item.price)
+            columns['added_at'].append(item.added_at)
+            columns['completed_at'].append(
+                _NAN if item.completed_at is None else item.completed_at)
+            columns['name'].append(strings.setdefault(item.name, len(strings)))
+        sections.append(columns)
+
+    encoded = [name.encode('utf-8') for name in strings]
+    offsets = array('Q', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    with atomic_write(filename, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, True, len(sections[0]['id']), len(sections[1]['id']),
+                             len(encoded), next_id, journal_seq))
+        for columns in sections:
+            for name, _ in _COLUMNS:
+                column = columns[name]
+                if not _LITTLE_ENDIAN:
+                    column.byteswap()
+                data = column.tobytes()
+                f.write(data + b"\0" * _padding(len(data)))
+        if not _LITTLE_ENDIAN:
+            offsets.byteswap()
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+
+
+class ColumnarSnapshot:
+    """列指向形式のスナップショットを mmap で読み込むクラス
+
+    各列はファイルを複製しない memoryview として参照できます。
+    使い終わったら close() するか、with 文で使用してください。
+
+    Attributes:
+        count (int): 未完了アイテム数
+        completed_count (int): 完了済みアイテム数
+        next_id (int): 次に割り当てるID
+        journal_seq (int): スナップショットに含まれる最後のジャーナル連番
+    """
+
+    def __init__(self, filename):
+        """ファイルを開いてヘッダーを読み込む
+
+        Args:
+            filename (str): 列指向形式のファイル名
+
+        Raises:
+            ValueError: 列指向形式のファイルでない場合
+        """
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            size = f.seek(0, 2)
+            if size < _HEADER.size:
+                raise ValueError("列指向形式のファイルではありません")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        (magic, _, self.count, self.completed_count, self._string_count,
+         self.next_id, self.journal_seq) = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("列指向形式のファイルではありません")
+
+        self._offsets = {}
+        position = _HEADER.size
+        for completed, count in ((False, self.count), (True, self.completed_count)):
+            for name, code in _COLUMNS:
+                size = array(code).itemsize * count
+                self._offsets[completed, name] = (position, size, code)
+                position += size + _padding(size)
+        string_offsets_size = 8 * (self._string_count + 1)
+        self._string_offsets = self._cast(position, string_offsets_size, 'Q')
+        self._string_base = position + string_offsets_size
+        self._names = {}
+
+    def _cast(self, position, size, code):
+        """バッファの一部を指定した型の列として参照（内部メソッド）"""
+        view = self._buffer[position:position + size]
+        if _LITTLE_ENDIAN:
+            return view.cast(code)
+        column = array(code, view.tobytes())
+        column.byteswap()
+        return column
+
+    def column(self, name, completed=False):
+        """列を取得
+
+        Args:
+            name (str): 'id'・'quantity'・'price'・'added_at'・'completed_at'・'name'
+                （'name' は文字列番号の列）
+            completed (bool): Trueの場合は完了済みセクションの列
+
+        Returns:
+            memoryview: 列の値（ファイルを複製しない）
+        """
+        return self._cast(*self._offsets[completed, name])
+
+    def name(self, index):
+        """文字列テーブルから名前を取得
+
+        Args:
+            index (int): 文字列番号
+
+        Returns:
+            str: アイテム名
+        """
+        name = self._names.get(index)
+        if name is None:
+            start = self._string_base + self._string_offsets[index]
+            end = self._string_base + self._string_offsets[index + 1]
+            name = self._names[index] = str(self._buffer[start:end], 'utf-8')
+        return name
+
+    def total(self):
+        """未完了アイテムの合計金額（価格 × 数量）をアイテムを作成せずに計算
+
+        Returns:
+            float: 合計金額
+        """
+        return math.fsum(price * quantity
+                         for price, quantity in zip(self.column('price'), self.column('quantity'))
+                         if price == price and price)
+
+    def iter_items(self, completed=False):
+        """アイテムを1件ずつ作成して返す
+
+        Args:
+            completed (bool): Trueの場合は完了済みアイテム
+
+        Yields:
+            ShoppingItem: アイテム
+        """
+        columns = [self.column(name, completed) for name, _ in _COLUMNS]
+        names = [self.name(index) for index in range(self._string_count)]
+        for item_id, quantity, price, added_at, completed_at, name in zip(*columns):
+            yield ShoppingItem(item_id, names[name], _to_number(quantity),
+                               _to_number(price), added_at,
+                               None if completed_at != completed_at else completed_at)
+
+    def close(self):
+        """mmapを閉じる"""
+        self._names = {}
+        self._string_offsets = None
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_snapshot(filename):
+    """列指向形式のファイルを読み込む
+
+    Args:
+        filename (str): 列指向形式のファイル名
+
+    Returns:
+        tuple: (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, journal_seq)
+    """
+    with ColumnarSnapshot(filename) as snapshot:
+        return (list(snapshot.iter_items()), list(snapshot.iter_items(completed=True)),
+                snapshot.next_id, snapshot.journal_seq)
+
+
+def convert(source, destination):
+    """JSON形式と列指向形式を相互に変換
+
+    拡張子が COLUMNAR_EXTENSION のファイルを列指向形式、それ以外をJSON形式として扱います。
+
+    Args:
+        source (str): 変換元ファイル名
+        destination (str): 変換先ファイル名
+    """
+    if is_columnar_file(source):
+        items, completed_items, next_id, journal_seq = read_snapshot(source)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        items = [ShoppingItem.from_dict(item) for item in data.get('items', [])]
+        completed_items = [ShoppingItem.from_dict(item)
+                           for item in data.get('completed_items', [])]
+        next_id = data.get('next_id', 1)
+        journal_seq = data.get('journal_seq', 0)
+        # IDを持たない旧形式のアイテムにIDを割り当てる
+        all_items = items + completed_items
+        next_id = max([next_id] + [item.id + 1 for item in all_items if item.id is not None])
+        for item in all_items:
+            if item.id is None:
+                item.id = next_id
+                next_id += 1
+
+    if is_columnar_file(destination):
+        write_snapshot(destination, items, completed_items, next_id, journal_seq)
+    else:
+        data = {
+            'items': [item.to_dict() for item in items],
+            'completed_items': [item.to_dict() for item in completed_items],
+            'next_id': next_id,
+            'journal_seq': journal_seq,
+            'saved_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with atomic_write(destination) as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    """コマンドラインから変換を実行"""
+    if len(sys.argv) != 3:
+        print(f"使用方法: python3 {sys.argv[0]} 変換元ファイル 変換先ファイル")
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2])
+    print(f"'{sys.argv[1]}' を '{sys.argv[2]}' に変換しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+買い物アイテムモジュール
+Compact slotted record type for shopping list items.
+
+アイテムを辞書ではなく __slots__ を持つクラスで表現し、1件あたりのメモリ使用量を
+抑えます。日時は数値（エポック秒）で保持し、JSON保存時のみ文字列に変換します。
+"""
+
+import time
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+
+# JSONファイルで使用する日時の形式
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+@lru_cache(maxsize=4096)
+def _format_minute(minute):
+    """エポック分を日時文字列に変換（同じ分の変換はキャッシュ）"""
+    return datetime.fromtimestamp(minute * 60).strftime(DATE_FORMAT)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(text):
+    """日時文字列をエポック秒に変換（同じ文字列の変換はキャッシュ）"""
+    return datetime.strptime(text, DATE_FORMAT).timestamp()
+
+
+def format_timestamp(timestamp):
+    """エポック秒を日時文字列（分単位）に変換
+
+    Args:
+        timestamp (float): エポック秒
+
+    Returns:
+        str: "YYYY-MM-DD HH:MM" 形式の日時
+    """
+    return _format_minute(int(timestamp // 60))
+
+
+def parse_timestamp(text):
+    """日時文字列をエポック秒に変換
+
+    Args:
+        text (str): "YYYY-MM-DD HH:MM" 形式の日時
+
+    Returns:
+        float: エポック秒（解析できない場合は0）
+    """
+    try:
+        return _parse_date(text)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@lru_cache(maxsize=4096)
+def _decimal(value):
+    """数値を誤差なくDecimalに変換（同じ値の変換はキャッシュ）"""
+    return Decimal(str(value))
+
+
+def amount(price, quantity):
+    """価格 × 数量 を誤差なく計算
+
+    Args:
+        price (int | float): 価格（未設定の場合はNone）
+        quantity (int | float): 数量
+
+    Returns:
+        Decimal: 金額（価格が設定されていない場合はNone）
+    """
+    if not price:
+        return None
+    return _decimal(price) * _decimal(quantity)
+
+
+def line_total(item):
+    """アイテムの小計（価格 × 数量）を誤差なく計算
+
+    Args:
+        item (ShoppingItem): アイテム
+
+    Returns:
+        Decimal: 小計（価格が設定されていない場合はNone）
+    """
+    return amount(item.price, item.quantity)
+
+
+def to_number(value):
+    """Decimalの金額を表示・計算用の数値に変換
+
+    Args:
+        value (Decimal): 金額
+
+    Returns:
+        int | float: 整数になる場合はint、それ以外はfloat
+    """
+    if value == value.to_integral_value():
+        return int(value)
+    return float(value)
+
+
+class ShoppingItem:
+    """買い物リストの1アイテムを表すクラス
+
+    既存の表示コードとの互換性のため、item['name'] のような辞書形式の
+    読み出しにも対応します（'added_date'・'completed_date' は文字列に変換）。
+
+    Attributes:
+        id (int): アイテムID
+        name (str): アイテム名
+        quantity (int): 数量
+        price (float): 価格（未設定の場合はNone）
+        added_at (float): 追加日時（エポック秒）
+        completed_at (float): 完了日時（エポック秒、未完了の場合はNone）
+    """
+
+    __slots__ = ('id', 'name', 'quantity', 'price', 'added_at', 'completed_at')
+
+    def __init__(self, id, name, quantity=1, price=None, added_at=None, completed_at=None):
+        self.id: int = id
+        self.name: str = name
+        self.quantity: int = quantity
+        self.price: float = price
+        self.added_at: float = time.time() if added_at is None else added_at
+        self.completed_at: float = completed_at
+
+    @classmethod
+    def from_dict(cls, data):
+        """JSON形式の辞書からアイテムを作成
+
+        Args:
+            data (dict): 'name'・'quantity'・'price'・'added_date' などのキーを持つ辞書
+
+        Returns:
+            ShoppingItem: 作成したアイテム
+        """
+        completed_date = data.get('completed_date')
+        return cls(
+            data.get('id'),
+            data['name'],
+            data.get('quantity', 1),
+            data.get('price'),
+            parse_timestamp(data.get('added_date')),
+            None if completed_date is None else parse_timestamp(completed_date),
+        )
+
+    def to_dict(self):
+        """JSON形式の辞書に変換
+
+        Returns:
+            dict: 'id'・'name'・'quantity'・'price'・'added_date'
+                （完了済みの場合は 'completed_date' も）を持つ辞書
+        """
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'quantity': self.quantity,
+            'price': self.price,
+            'added_date': format_timestamp(self.added_at),
+        }
+        if self.completed_at is not None:
+            data['completed_date'] = format_timestamp(self.completed_at)
+        return data
+
+    def completed(self, completed_at=None):
+        """完了済みにしたコピーを作成
+
+        Args:
+            completed_at (float, optional): 完了日時（エポック秒、省略時は現在時刻）
+
+        Returns:
+            ShoppingItem: 完了日時を設定した新しいアイテム
+        """
+        return ShoppingItem(self.id, self.name, self.quantity, self.price, self.added_at,
+                            time.time() if completed_at is None else completed_at)
+
+    def renamed(self, item_id):
+        """IDを変更したコピーを作成
+
+        Args:
+            item_id (int): 新しいID
+
+        Returns:
+            ShoppingItem: IDだけが異なる新しいアイテム
+        """
+        return ShoppingItem(item_id, self.name, self.quantity, self.price, self.added_at,
+                            self.completed_at)
+
+    def __getitem__(self, key):
+        if key == 'added_date':
+            return format_timestamp(self.added_at)
+        if key == 'completed_date':
+            if self.completed_at is None:
+                raise KeyError(key)
+            return format_timestamp(self.completed_at)
+        if key in ShoppingItem.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        """辞書の get() と同様にフィールドを取得"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if not isinstance(other, ShoppingItem):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"ShoppingItem(id={self.id!r}, name={self.name!r}, "
+                f"quantity={self.quantity!r}, price={self.price!r})")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+変更ジャーナルモジュール
+Append-only mutation journal used by ShoppingList's journaled storage mode.
+"""
+
+import json
+import os
+
+import file_store
+
+
+class MutationJournal:
+    """追記専用の変更ログを管理するクラス
+
+    1行1レコードのJSON Lines形式で変更内容を追記します。
+    各レコードには連番 (seq) が付与され、スナップショットに記録された
+    連番以下のレコードは再生時にスキップされます。
+    Append-only JSON Lines log of list mutations with sequence numbers.
+    """
+
+    def __init__(self, filename):
+        """MutationJournalクラスの初期化
+
+        Args:
+            filename (str): ジャーナルファイル名
+        """
+        self.filename = filename
+        self.count = 0
+
+    def append(self, record):
+        """レコードをジャーナルに追記
+
+        Args:
+            record (dict): 追記するレコード（'seq' と 'op' を含む）
+
+        Raises:
+            IOError: ファイル書き込みエラーの場合
+        """
+        self.append_many([record])
+
+    def append_many(self, records):
+        """複数のレコードを1行のバッチレコードとしてジャーナルに追記
+
+        バッチは1行で書き込まれるため、途中でクラッシュした場合は
+        バッチ全体が再生されません（部分的に適用されることはありません）。
+        クラッシュで残った不完全な末尾行は切り詰めてから追記し、fsync してから戻ります
+        （不完全な行の後ろに追記すると、再生がその行で止まり以降のレコードが失われるため）。
+
+        Args:
+            records (list): 追記するレコードの列
+
+        Raises:
+            IOError: ファイル書き込みエラーの場合
+        """
+        if len(records) > 1:
+            record = {'op': 'batch', 'seq': records[-1]['seq'], 'records': records}
+        else:
+            record = records[0]
+        data = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+        try:
+            created = not os.path.exists(self.filename)
+            with open(self.filename, 'a+b') as f:
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        f.truncate(file_store.tail(self.filename)[1])
+                f.write(data.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            if created:
+                file_store.fsync_directory(os.path.dirname(os.path.abspath(self.filename)))
+        except Exception as e:
+            raise IOError(f"ジャーナル書き込みエラー: {e}")
+        self.count += len(records)
+
+    def replay(self, after_seq=0):
+        """ジャーナルのレコードを順に返す
+
+        書き込み途中でクラッシュした場合に残る不完全な末尾行は無視します。
+
+        Args:
+            after_seq (int): この連番以下のレコードはスキップする
+
+        Yields:
+            dict: ジャーナルレコード
+        """
+        self.count = 0
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # 不完全な末尾行
+                if record.get('op') == 'batch':
+                    records = record['records']
+                else:
+                    records = [record]
+                self.count += len(records)
+                for record in records:
+                    if record.get('seq', 0) > after_seq:
+                        yield record
+
+    def truncate(self):
+        """ジャーナルを空にする（スナップショット作成後に呼び出す）"""
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+        self.count = 0
@@ -5,35 +5,271 @@
 Shopping list management module with JSON-based persistence.
 """
 
-import json
-import os
+import atexit
+import operator
+import threading
+import time
+import unicodedata
+import warnings
+from collections.abc import Sequence
+from contextlib import contextmanager
 from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache, wraps
+from itertools import islice
+
+import file_store
+import shopping_backend
+import shopping_metrics
+import shopping_render
+from shopping_item import (ShoppingItem, format_timestamp, line_total, parse_timestamp,
+                           to_number)
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name):
+    """アイテム名を検索用に正規化
+
+    全角・半角の違い、大文字・小文字の違い、前後の空白を無視します。
+
+    Args:
+        name (str): アイテム名
+
+    Returns:
+        str: 正規化されたアイテム名
+    """
+    return unicodedata.normalize('NFKC', name).strip().casefold()
+
+
+class _ListView(Sequence):
+    """リストを複製せずに公開する読み取り専用のビュー"""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._data!r})"
+
+
+class _ItemsView(Sequence):
+    """未完了アイテムを複製せずに公開する読み取り専用のビュー（追加順）
+    
+    リストの辞書を参照するため、常に最新の内容を表します。インデックスによる参照は
+    辞書の先頭・末尾の近い方から数えます。反復は開始時点のアイテムの並びに対して
+    行うため、反復中にアイテムを完了・削除できます。
+    """
+    
+    __slots__ = ('_owner',)
+    
+    def __init__(self, owner):
+        self._owner = owner
+    
+    def __getitem__(self, index):
+        values = self._owner._items.values()
+        if isinstance(index, slice):
+            return list(values)[index]
+        index = operator.index(index)
+        size = len(values)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("無効なアイテム番号です")
+        if index <= size // 2:
+            return next(islice(values, index, None))
+        return next(islice(reversed(values), size - 1 - index, None))
+    
+    def __len__(self):
+        return len(self._owner._items)
+    
+    def __iter__(self):
+        return iter(tuple(self._owner._items.values()))
+    
+    def __reversed__(self):
+        return reversed(tuple(self._owner._items.values()))
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self._owner._items.values())!r})"
+
+
+def _renamed(entries, item_id, new_id):
+    """差分の辞書（ID → アイテムの辞書）のIDを書き換えた辞書を作成（内部関数）
+
+    並び順は保ち、書き換えるアイテムの辞書は 'id' を変えたコピーに置き換えます。
+    """
+    if item_id not in entries:
+        return entries
+    return {(new_id if key == item_id else key):
+            (dict(value, id=new_id) if key == item_id else value)
+            for key, value in entries.items()}
+
+
+def _synchronized(method):
+    """メソッドをリストのロック（self._lock）の下で実行するデコレータ"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# 書き込み遅延モードで動作中のリスト（終了時に未保存の変更を保存する）
+_write_behind_lists = set()
+
+
+@atexit.register
+def _close_write_behind_lists():
+    """終了時に書き込み遅延モードのリストを閉じる"""
+    for shopping in list(_write_behind_lists):
+        shopping.close()
+
+
+# ファイルの読み込みまで作成を遅延する属性
+_LAZY_ATTRIBUTES = frozenset({
+    '_items', 'completed_items', '_next_id', '_seq',
+    '_name_index', '_subtotals', '_total', '_unpriced_count',
+    '_changes', '_changes_base',
+})
+
+# 差分の取得のためにメモリに保持する変更内容の既定の件数
+DEFAULT_CHANGE_LOG_SIZE = 1000
+
+# アーカイブを使用する場合にリストに残す完了済みアイテムの既定の件数
+DEFAULT_RECENT_COMPLETED = 100
 
 
 class ShoppingList:
     """買い物リスト管理機能を提供するクラス
     
     アイテムの追加、削除、完了管理、およびJSONファイルでの永続化を行います。
+    各アイテムには変化しないID（'id'）が割り当てられ、IDと正規化した名前の
+    ハッシュインデックスにより、IDや名前による操作をO(1)で行えます。
+    自動読み込みファイルは初期化時ではなく、アイテムに最初にアクセスした時点で読み込みます。
+    
+    保存は一時ファイルへの書き込みと rename による原子的な置き換えで行います。
+    複数のプロセスが同じファイルを共有する場合、自動保存はアドバイザリロックの下で
+    行い、読み込み後に他のプロセスがファイルを更新していれば、最新の内容を読み直して
+    自分の変更を適用し直してから保存します（読み込みはロックなしの楽観的な読み込み）。
+    
+    write_behind=True を指定すると、変更時にはディスクに書き込まず、バックグラウンドの
+    保存スレッドが save_interval 秒ごとに変更をまとめて保存します。flush() で直ちに保存、
+    close() で保存スレッドを停止できます（終了時にも自動的に close() します）。
+    変更操作はスレッドセーフで、複数のスレッドから呼び出せます。
+    
+    保存先は backend で差し替えられます（shopping_backend モジュール）。
+    SQLiteBackend では変更を1行単位で保存し、読み込み前の合計金額・未完了アイテム・
+    期間内の完了アイテムの取得はSQLで行います。
+    
+    変更のたびにリビジョン（revision、変更の連番）が1ずつ増えます。changes_since() で
+    指定したリビジョン以降の変更を差分として取得し、別のリストに apply_changes() で
+    適用できます（クライアントとの同期用）。
+    
+    archive（shopping_archive.CompletedArchive）を指定すると、完了済みアイテムは直近の
+    recent_completed 件だけをリストに残し、古いものを月ごとのアーカイブに移します。
+    アーカイブを含む履歴は completed_page()・iter_history() で参照できます。
     Manages shopping list items with add, remove, complete operations and JSON persistence.
     """
     
-    def __init__(self, auto_load_file="shopping_list.json"):
+    def __init__(self, auto_load_file="shopping_list.json", journal=False,
+                 compact_threshold=1000, check_consistency=False,
+                 write_behind=False, save_interval=1.0, backend=None, money=None,
+                 change_log_size=DEFAULT_CHANGE_LOG_SIZE, archive=None,
+                 recent_completed=DEFAULT_RECENT_COMPLETED):
         """ShoppingListクラスの初期化
         
         Args:
             auto_load_file (str): 自動読み込みするJSONファイル名
+            journal (bool): Trueの場合、変更をジャーナルに追記して保存する
+                （ファイル全体の書き直しを行わない）
+            compact_threshold (int): ジャーナルをスナップショットに
+                まとめるまでのレコード数
+            check_consistency (bool): Trueの場合、合計金額の読み出しごとに
+                全件再計算の結果と一致するか検証する（テスト用）
+            write_behind (bool): Trueの場合、変更をバックグラウンドのスレッドで
+                まとめて保存する（書き込み遅延モード）
+            save_interval (float): 書き込み遅延モードで保存をまとめる間隔（秒）
+            backend (StorageBackend, optional): 保存先（省略時は auto_load_file・journal・
+                compact_threshold を指定した JsonFileBackend）
+            money (MoneyMode, optional): 金額モード。指定した場合、小計と合計金額を
+                Decimalではなく最小単位の整数で保持し、小計を money.rounding で丸める
+            change_log_size (int): changes_since() のためにメモリに保持する変更内容の件数
+                （これより古いリビジョンからの差分はリスト全体のスナップショットになる）
+            archive (CompletedArchive, optional): 完了済みアイテムの履歴を移すアーカイブ
+            recent_completed (int): アーカイブを使用する場合にリストに残す完了済みアイテムの件数
+                （完了済みアイテムがこの2倍を超えた時点で、古いものをまとめてアーカイブに移す）
         """
-        self.items = []
-        self.completed_items = []
-        self.data_file = auto_load_file
+        if backend is None:
+            backend = shopping_backend.JsonFileBackend(auto_load_file, journal,
+                                                       compact_threshold)
+        self.backend = backend
+        self.money = money
+        if money is None:
+            self._line_total, self._to_number = line_total, to_number
+        else:
+            self._line_total, self._to_number = money.line_total, money.to_number
+        self.check_consistency = check_consistency
+        self.change_log_size = change_log_size
+        self.archive = archive
+        self.recent_completed = recent_completed
+        self.save_interval = save_interval
+        self._batch_depth = 0
+        self._pending = []
+        self._lock = threading.RLock()  # アイテムの変更を直列化するロック
+        self._save_lock = threading.Lock()  # 書き込み遅延モードで保存を直列化するロック
+        self._unsaved = []  # 書き込み遅延モードで保存待ちの変更内容
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._saver = None
+        if write_behind:
+            self._saver = threading.Thread(target=self._run_saver,
+                                           name="ShoppingListSaver", daemon=True)
+            self._saver.start()
+            _write_behind_lists.add(self)
+        # アイテム関連の属性（_items など）は最初のアクセス時に __getattr__ で読み込む
+    
+    def __getattr__(self, name):
+        """未読み込みの属性へのアクセス時に自動読み込みファイルを読み込む
         
-        # 起動時に既存ファイルがあれば自動読み込み
-        if os.path.exists(self.data_file):
-            try:
-                self.load_from_file(self.data_file)
-            except:
-                pass  # 読み込みエラーは無視（新規作成として扱う）
+        読み込み後は通常の属性として存在するため、このメソッドは呼ばれません。
+        """
+        if name not in _LAZY_ATTRIBUTES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        with self._lock:
+            if not self.loaded:
+                self._auto_load()
+        return object.__getattribute__(self, name)
+    
+    @property
+    def loaded(self):
+        """アイテムがメモリに読み込まれているかどうか"""
+        return '_items' in self.__dict__
+    
+    @property
+    def revision(self):
+        """最後の変更のリビジョン（変更のたびに1ずつ増える連番）"""
+        return self._seq
+    
+    @property
+    def write_behind(self):
+        """書き込み遅延モードで動作中かどうか（変更時にディスクへ書き込まない）"""
+        return self._saver is not None
     
+    @property
+    def items(self):
+        """未完了アイテムの読み取り専用ビュー（追加順、get_items() と同じ）"""
+        return _ItemsView(self)
+    
+    @_synchronized
     def add_item(self, item, quantity=1, price=None):
         """アイテムをリストに追加
         
@@ -45,16 +281,12 @@ class ShoppingList:
         Returns:
             str: 追加完了メッセージ
         """
-        item_data = {
-            'name': item,
-            'quantity': quantity,
-            'price': price,
-            'added_date': datetime.now().strftime("%Y-%m-%d %H:%M")
-        }
-        self.items.append(item_data)
-        self._auto_save()
+        item_data = ShoppingItem(self._next_id, item, quantity, price)
+        self._append_item(item_data)
+        self._auto_save({'op': 'add', 'item': item_data.to_dict()})
         return f"'{item}'をリストに追加しました"
     
+    @_synchronized
     def remove_item(self, index):
         """指定されたインデックスのアイテムを削除
         
@@ -67,13 +299,9 @@ class ShoppingList:
         Raises:
             IndexError: インデックスが範囲外の場合
         """
-        if 0 <= index < len(self.items):
-            removed_item = self.items.pop(index)
-            self._auto_save()
-            return f"'{removed_item['name']}'をリストから削除しました"
-        else:
-            raise IndexError("無効なアイテム番号です")
+        return self.remove_by_id(self._id_at(index))
     
+    @_synchronized
     def complete_item(self, index):
         """アイテムを完了済みに移動
         
@@ -86,48 +314,608 @@ class ShoppingList:
         Raises:
             IndexError: インデックスが範囲外の場合
         """
-        if 0 <= index < len(self.items):
-            completed_item = self.items.pop(index)
-            completed_item['completed_date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-            self.completed_items.append(completed_item)
-            self._auto_save()
-            return f"'{completed_item['name']}'を完了しました"
+        return self.complete_by_id(self._id_at(index))
+    
+    def get_item(self, item_id):
+        """IDでアイテムを取得
+        
+        Args:
+            item_id (int): アイテムID
+            
+        Returns:
+            ShoppingItem: 未完了アイテム
+            
+        Raises:
+            KeyError: 該当する未完了アイテムがない場合
+        """
+        try:
+            return self._items[item_id]
+        except KeyError:
+            raise KeyError(f"ID {item_id} のアイテムが見つかりません")
+    
+    def find_by_name(self, name):
+        """名前で未完了アイテムを検索
+        
+        名前は normalize_name() で正規化して比較します。
+        
+        Args:
+            name (str): アイテム名
+            
+        Returns:
+            list: 名前が一致する未完了アイテム（追加順）
+        """
+        return [self._items[item_id] for item_id in self._name_index.get(normalize_name(name), ())]
+    
+    @_synchronized
+    def remove_by_id(self, item_id):
+        """IDを指定してアイテムを削除
+        
+        Args:
+            item_id (int): 削除するアイテムのID
+            
+        Returns:
+            str: 削除完了メッセージ
+            
+        Raises:
+            KeyError: 該当する未完了アイテムがない場合
+        """
+        self.get_item(item_id)
+        removed_item = self._pop_item(item_id)
+        self._auto_save({'op': 'remove', 'id': item_id})
+        return f"'{removed_item.name}'をリストから削除しました"
+    
+    @_synchronized
+    def complete_by_id(self, item_id, completed_at=None):
+        """IDを指定してアイテムを完了済みに移動
+        
+        Args:
+            item_id (int): 完了するアイテムのID
+            completed_at (float, optional): 完了日時（エポック秒、省略時は現在時刻）
+            
+        Returns:
+            str: 完了メッセージ
+            
+        Raises:
+            KeyError: 該当する未完了アイテムがない場合
+        """
+        self.get_item(item_id)
+        completed_item = self._pop_item(item_id).completed(completed_at)
+        self.completed_items.append(completed_item)
+        self._auto_save({'op': 'complete', 'id': item_id,
+                         'completed_date': format_timestamp(completed_item.completed_at)})
+        return f"'{completed_item.name}'を完了しました"
+    
+    @_synchronized
+    def complete_by_name(self, name):
+        """名前を指定してアイテムを完了済みに移動
+        
+        同じ名前のアイテムが複数ある場合は、最も早く追加されたものを完了します。
+        
+        Args:
+            name (str): 完了するアイテムの名前（normalize_name() で正規化して比較）
+            
+        Returns:
+            str: 完了メッセージ
+            
+        Raises:
+            KeyError: 該当する未完了アイテムがない場合
+        """
+        item_ids = self._name_index.get(normalize_name(name))
+        if not item_ids:
+            raise KeyError(f"'{name}' はリストにありません")
+        return self.complete_by_id(next(iter(item_ids)))
+    
+    @_synchronized
+    def add_items(self, items):
+        """複数のアイテムをまとめてリストに追加
+        
+        自動保存は最後に1回だけ行います。
+        
+        Args:
+            items (iterable): アイテム名（str）、(名前, 数量, 価格) のタプル、
+                または 'name'・'quantity'・'price' キーを持つ辞書の列
+            
+        Returns:
+            str: 追加完了メッセージ
+        """
+        added_at = time.time()
+        count = 0
+        with self.batch():
+            for entry in items:
+                if isinstance(entry, str):
+                    name, quantity, price = entry, 1, None
+                elif isinstance(entry, dict):
+                    name = entry['name']
+                    quantity = entry.get('quantity', 1)
+                    price = entry.get('price')
+                else:
+                    name, quantity, price = (tuple(entry) + (1, None))[:3]
+                item_data = ShoppingItem(self._next_id, name, quantity, price, added_at)
+                self._append_item(item_data)
+                self._auto_save({'op': 'add', 'item': item_data.to_dict()})
+                count += 1
+        return f"{count}件のアイテムをリストに追加しました"
+    
+    @_synchronized
+    def remove_items(self, indices):
+        """指定された複数のインデックスのアイテムをまとめて削除
+        
+        インデックスはすべて削除前のリストに対する位置として解釈します。
+        
+        Args:
+            indices (iterable): 削除するアイテムのインデックス（0ベース）
+            
+        Returns:
+            str: 削除完了メッセージ
+            
+        Raises:
+            IndexError: インデックスが範囲外の場合（リストは変更されません）
+        """
+        targets = self._ids_at(indices)
+        with self.batch():
+            for item_id in targets:
+                self._pop_item(item_id)
+                self._auto_save({'op': 'remove', 'id': item_id})
+        return f"{len(targets)}件のアイテムをリストから削除しました"
+    
+    @_synchronized
+    def complete_items(self, indices):
+        """指定された複数のインデックスのアイテムをまとめて完了済みに移動
+        
+        インデックスはすべて変更前のリストに対する位置として解釈し、
+        完了済みリストにはリスト上の順序で追加します。
+        
+        Args:
+            indices (iterable): 完了するアイテムのインデックス（0ベース）
+            
+        Returns:
+            str: 完了メッセージ
+            
+        Raises:
+            IndexError: インデックスが範囲外の場合（リストは変更されません）
+        """
+        targets = self._ids_at(indices)
+        completed_at = time.time()
+        with self.batch():
+            for item_id in targets:
+                self.complete_by_id(item_id, completed_at)
+        return f"{len(targets)}件のアイテムを完了しました"
+    
+    @contextmanager
+    def batch(self):
+        """複数の変更をまとめて1回の保存で確定するコンテキストマネージャ
+        
+        ブロック内では自動保存を保留し、正常終了時に1回だけ保存します。
+        例外が発生した場合はブロック開始前の状態に戻します。
+        入れ子にした場合は最も外側のブロックでのみ保存・ロールバックします。
+        ブロックの実行中は、他のスレッドからの変更を待たせます。
+        
+        使用例:
+            with shopping.batch():
+                shopping.add_item('りんご', 3, 298)
+                shopping.complete_item(0)
+        """
+        with self._lock:
+            if self._batch_depth:
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                return
+            
+            saved_state = (dict(self._items), self.completed_items[:], self._seq, self._next_id)
+            self._batch_depth = 1
+            self._pending = []
+            try:
+                yield self
+            except BaseException:
+                self._items, self.completed_items, self._seq, self._next_id = saved_state
+                self._reset_indexes()
+                self._discard_changes(self._seq)
+                raise
+            finally:
+                self._batch_depth = 0
+                pending, self._pending = self._pending, []
+            if pending:
+                self._flush(pending)
+    
+    @_synchronized
+    def changes_since(self, revision):
+        """指定したリビジョンより後の変更を差分として取得
+        
+        差分は追加（'added'）・削除（'removed'）・完了（'completed'）にまとめ、
+        期間内に追加して削除したアイテムは含めません（完了日時を変更したアイテムは
+        'completed' に変更後の完了日時で含めます）。大きさはリストの件数ではなく
+        変更の件数に比例します。保持している変更内容（change_log_size 件）より古い
+        リビジョンや、load_from_file() などでリスト全体を置き換える前のリビジョンを
+        指定した場合は、差分の代わりにリスト全体（'snapshot'）を返します。
+        
+        使用例:
+            delta = server_list.changes_since(client_revision)
+            client_list.apply_changes(delta)
+            client_revision = delta['revision']
+            
+            # 双方向の場合は、受け取り側が振り直したIDを送信側にも適用する
+            delta = client_list.changes_since(pushed_revision)
+            client_list.apply_ids(server_list.apply_changes(delta)['ids'])
+            pushed_revision = delta['revision']
+        
+        Args:
+            revision (int): 受け取り側が最後に同期したリビジョン（初回は0）
+            
+        Returns:
+            dict: 'base'（指定したリビジョン）・'revision'（現在のリビジョン）と、
+                'added'（アイテムの辞書のリスト）・'removed'（IDのリスト）・
+                'completed'（'id'・'completed_date' の辞書のリスト、完了順）、
+                または 'snapshot'（'items'・'completed_items'・'next_id'）
+        """
+        delta = {'base': revision, 'revision': self._seq}
+        start = revision - self._changes_base
+        if not 0 <= start <= len(self._changes):
+            delta['snapshot'] = {
+                'items': [item.to_dict() for item in self._items.values()],
+                'completed_items': [item.to_dict() for item in self.completed_items],
+                'next_id': self._next_id,
+            }
+            return delta
+        added = {}
+        removed = []
+        completed = {}  # ID → 'id'・'completed_date' の辞書（完了順）
+        for record in self._changes[start:]:
+            op = record['op']
+            if op == 'add':
+                added[record['item']['id']] = record['item']
+            elif op in ('remove', 'remove_completed'):
+                completed.pop(record['id'], None)
+                if added.pop(record['id'], None) is None:
+                    removed.append(record['id'])
+            elif op in ('complete', 'recomplete'):
+                completed[record['id']] = {'id': record['id'],
+                                           'completed_date': record['completed_date']}
+            elif op == 'rename':
+                # IDの変更は送らず、期間内の追加・完了を新しいIDに書き換える
+                added = _renamed(added, record['id'], record['new_id'])
+                completed = _renamed(completed, record['id'], record['new_id'])
+        delta['added'] = list(added.values())
+        delta['removed'] = removed
+        delta['completed'] = list(completed.values())
+        return delta
+    
+    def apply_changes(self, delta):
+        """changes_since() で取得した差分をリストに適用
+        
+        差分の変更はこのリストの変更として保存され（1回の保存にまとめる）、
+        このリストのリビジョンも進みます。アイテムIDは差分のものを使用し、このリストの
+        別のアイテム（未完了または完了済み）が同じIDを使っている場合は新しいIDを割り当てます
+        （同じ内容のアイテムが既にある場合は、再送とみなして追加しません）。
+        双方向に同期する場合、送信側は戻り値の 'ids' を apply_ids() で適用してから
+        次の差分を受け取ってください（適用しないと、自分のアイテムが別のIDで戻ってきます）。
+        
+        同時に行われた変更は次の規則で解決し、'conflicts' で報告します。規則は
+        どちらの側で適用しても同じ結果になるため、双方向に同期したリストは一致します。
+        
+        - 既に完了済みのアイテムの完了: 完了日時の早い方を優先（差分の方が早い場合は
+          このリストの完了日時を変更する）。報告の 'completed_date' は優先した完了日時
+        - 既に削除されたアイテムの完了: 削除を優先
+        - 既に完了済みのアイテムの削除: 削除を優先（このリストの完了済みアイテムを削除する）
+        
+        既に削除されたアイテムの削除と、同じ完了日時で完了済みのアイテムの完了
+        （自分が送った変更の再送など）は、結果が同じため報告しません。
+        差分が 'snapshot' の場合は、リスト全体を置き換えます。
+        
+        Args:
+            delta (dict): changes_since() が返した差分
+            
+        Returns:
+            dict: 'revision'（適用後のこのリストのリビジョン）・'applied'（適用した変更の数）・
+                'ids'（IDを振り直したアイテムの 差分のID → このリストのID）・
+                'conflicts'（'op'・'id'・'reason'（このリストでの状態、'completed' または
+                'removed'）の辞書のリスト）
+        """
+        if 'snapshot' in delta:
+            return self._apply_snapshot(delta['snapshot'])
+        
+        applied = 0
+        ids = {}
+        conflicts = []
+        with self.batch():
+            for data in delta.get('added', ()):
+                item = ShoppingItem.from_dict(data)
+                existing = self._items.get(item.id)
+                if existing is None:
+                    existing = self._find_completed(item.id)
+                if existing is not None:
+                    existing = existing.to_dict()
+                    existing.pop('completed_date', None)
+                    if existing == item.to_dict():
+                        continue
+                    ids[item.id] = self._next_id
+                    item.id = self._next_id
+                self._append_item(item)
+                self._auto_save({'op': 'add', 'item': item.to_dict()})
+                applied += 1
+            for item_id in delta.get('removed', ()):
+                item_id = ids.get(item_id, item_id)
+                if item_id in self._items:
+                    self._pop_item(item_id)
+                    self._auto_save({'op': 'remove', 'id': item_id})
+                    applied += 1
+                elif self._completed_index(item_id) is not None:
+                    record = {'op': 'remove_completed', 'id': item_id}
+                    self._apply_record(record)
+                    self._auto_save(record)
+                    applied += 1
+                    conflicts.append({'op': 'remove', 'id': item_id, 'reason': 'completed'})
+            for change in delta.get('completed', ()):
+                item_id = ids.get(change['id'], change['id'])
+                if item_id in self._items:
+                    self.complete_by_id(item_id, parse_timestamp(change['completed_date']))
+                    applied += 1
+                    continue
+                existing = self._find_completed(item_id)
+                if existing is None:
+                    conflicts.append({'op': 'complete', 'id': item_id, 'reason': 'removed'})
+                    continue
+                # 完了日時はレコードと同じ分単位の文字列で比較する（固定長のため順序も同じ）
+                completed_date = format_timestamp(existing.completed_at)
+                if completed_date == change['completed_date']:
+                    continue
+                if change['completed_date'] < completed_date:
+                    completed_date = change['completed_date']
+                    record = {'op': 'recomplete', 'id': item_id, 'completed_date': completed_date}
+                    self._apply_record(record)
+                    self._auto_save(record)
+                    applied += 1
+                conflicts.append({'op': 'complete', 'id': item_id, 'reason': 'completed',
+                                  'completed_date': completed_date})
+        return {'revision': self._seq, 'applied': applied, 'ids': ids, 'conflicts': conflicts}
+    
+    def apply_ids(self, ids):
+        """apply_changes() で受け取り側が振り直したアイテムIDを、送信側のリストに適用
+        
+        アイテムの並び順は変わりません。新しいIDを使っているこのリストの別のアイテムには、
+        先に新しいIDを割り当てます。既に削除されたアイテムのIDは無視します。
+        
+        Args:
+            ids (dict): apply_changes() の戻り値の 'ids'（差分のID → 受け取り側のID）。
+                サーバーの応答の [差分のID, 受け取り側のID] の組のリストも指定できる
+            
+        Returns:
+            int: IDを変更したアイテムの数
+        """
+        count = 0
+        with self.batch():
+            pending = {old: new for old, new in dict(ids).items()
+                       if old != new and self._has_id(old)}
+            while pending:
+                for old, new in pending.items():
+                    if new not in pending:
+                        break  # 新しいIDを使っているアイテムが振り直しの対象でない
+                else:
+                    # 振り直しが循環している場合は、1件を一時的なIDに移してから続ける
+                    old, temporary = next(iter(pending)), self._next_id
+                    self._rename_id(old, temporary)
+                    pending[temporary] = pending.pop(old)
+                    continue
+                if self._has_id(new):
+                    self._rename_id(new, self._next_id)
+                self._rename_id(old, pending.pop(old))
+                count += 1
+        return count
+    
+    def iter_items(self, completed=False):
+        """アイテムを1件ずつ返す
+        
+        まだ読み込まれていない場合は、リスト全体を読み込まずに
+        保存先から直接読み出します（JSONファイルはストリーミング、SQLiteはSQLで読み出し）。
+        
+        Args:
+            completed (bool): Trueの場合は完了済みアイテム
+            
+        Yields:
+            ShoppingItem: アイテム
+        """
+        items = None if self.loaded else self.backend.iter_items(completed)
+        if items is not None:
+            yield from items
+        elif completed:
+            yield from self.completed_items
         else:
-            raise IndexError("無効なアイテム番号です")
+            yield from self._items.values()
     
     def get_items(self):
         """現在の未完了アイテムリストを取得
         
+        リストを複製せず、読み取り専用のビューを返します。ビューはインデックスで参照でき、
+        反復中にアイテムを完了・削除しても反復を続けられます。
+        
         Returns:
-            list: 未完了アイテムのコピー
+            Sequence: 未完了アイテム（ShoppingItem）のビュー（追加順）
         """
-        return self.items.copy()
+        return _ItemsView(self)
     
     def get_completed_items(self):
         """完了済みアイテムを取得
         
+        リストを複製せず、読み取り専用のビューを返します。
+        アーカイブを使用している場合は、リストに残っている直近の完了済みアイテムのみです。
+        
         Returns:
-            list: 完了済みアイテムのコピー
+            Sequence: 完了済みアイテム（ShoppingItem）のビュー（完了順）
         """
-        return self.completed_items.copy()
+        return _ListView(self.completed_items)
+    
+    @_synchronized
+    def completed_page(self, page=1, per_page=50):
+        """アーカイブを含む完了済みアイテムを新しい順にページ単位で取得
+        
+        アーカイブからは対象のページを含む月のファイルだけを読み込みます。
+        
+        Args:
+            page (int): ページ番号（1から）
+            per_page (int): 1ページの件数
+            
+        Returns:
+            CompletedPage: 'items'（新しい順）・'page'・'per_page'・'total'（全体の件数）・
+                'pages'（ページ数）
+            
+        Raises:
+            ValueError: ページ番号・件数が1未満の場合
+        """
+        from shopping_archive import make_page
+        if page < 1 or per_page < 1:
+            raise ValueError("ページ番号と件数は1以上を指定してください")
+        recent = self.completed_items
+        start = (page - 1) * per_page
+        end = start + per_page
+        items = [recent[-1 - i] for i in range(start, min(end, len(recent)))]
+        archived = 0
+        if self.archive is not None:
+            archived = self.archive.count()
+            if end > len(recent):
+                offset = max(start - len(recent), 0)
+                items += self.archive.items(offset, per_page - len(items))
+        return make_page(items, page, per_page, len(recent) + archived)
+    
+    def iter_history(self, newest_first=False):
+        """アーカイブを含む完了済みアイテムを1件ずつ返す
+        
+        アーカイブは月ごとに読み込むため、履歴全体をメモリに読み込みません。
+        
+        Args:
+            newest_first (bool): Trueの場合は新しい順（省略時は完了順）
+            
+        Yields:
+            ShoppingItem: 完了済みアイテム
+        """
+        with self._lock:
+            recent = self.completed_items[:]
+        archived = () if self.archive is None else self.archive.iter_items(newest_first)
+        if newest_first:
+            yield from reversed(recent)
+            yield from archived
+        else:
+            yield from archived
+            yield from recent
     
     def calculate_total(self):
-        """価格が設定されている未完了アイテムの合計金額を計算
+        """価格が設定されている未完了アイテムの合計金額を取得
+        
+        合計金額は変更のたびに差分で更新されているため、O(1)で取得できます。
+        まだ読み込まれていない場合、保存先が対応していれば（SQLiteBackend）
+        リストを読み込まずに保存先で計算します（金額モードでは常にリストを読み込みます）。
         
         Returns:
-            float: 合計金額
+            int | float: 合計金額（整数になる場合はint）
         """
-        total = 0
-        for item in self.items:
-            if item['price']:
-                total += item['price'] * item['quantity']
-        return total
+        if not self.loaded and self.money is None:
+            total = self.backend.total()
+            if total is not None:
+                return to_number(total)
+        if self.check_consistency:
+            self.verify_total()
+        return self._to_number(self._total)
     
-    def save_to_file(self, filename):
+    @_synchronized
+    def calculate_total_with_tax(self, tax=None):
+        """価格が設定されている未完了アイテムの小計・消費税・税込み合計を取得
+        
+        税額を合計に対して1回だけ計算する場合は、差分更新している合計金額からO(1)で
+        計算します。金額モードでない場合は、小数点以下2桁に偶数丸めした金額で計算します。
+        
+        Args:
+            tax (TaxRule, optional): 消費税の計算方法（省略時は金額モードの既定の計算方法）
+            
+        Returns:
+            MoneyTotal: 小計・税額・税込み合計
+            
+        Raises:
+            ValueError: 消費税の計算方法が指定されていない場合
+        """
+        import shopping_money
+        money = self.money or shopping_money.MoneyMode()
+        rule = tax or money.tax
+        if rule is None:
+            raise ValueError("消費税の計算方法が指定されていません")
+        if not rule.per_line:
+            amounts = [self._total if self.money else money.to_minor(self._total)]
+        elif self.money:
+            amounts = self._subtotals.values()
+        else:
+            amounts = [money.to_minor(subtotal) for subtotal in self._subtotals.values()
+                       if subtotal is not None]
+        return money.totals(amounts, rule)
+    
+    def completed_between(self, start, end):
+        """指定した期間に完了したアイテムを取得
+        
+        まだ読み込まれていない場合、保存先が対応していれば（SQLiteBackend）
+        リストを読み込まずに完了日時のインデックスで検索します。
+        アーカイブを使用している場合は、期間に含まれる月のアーカイブも検索します。
+        
+        Args:
+            start (datetime): 期間の開始（この日時を含む）
+            end (datetime): 期間の終了（この日時を含まない）
+            
+        Returns:
+            list: 完了済みアイテム（ShoppingItem、完了順）
+        """
+        start, end = start.timestamp(), end.timestamp()
+        archived = [] if self.archive is None else self.archive.completed_between(start, end)
+        if not self.loaded:
+            items = self.backend.completed_between(start, end)
+            if items is not None:
+                return archived + items
+        return archived + [item for item in self.completed_items
+                           if start <= item.completed_at < end]
+    
+    def get_subtotal(self, index):
+        """未完了アイテムの小計（価格 × 数量）を取得
+        
+        Args:
+            index (int): アイテムのインデックス（0ベース）
+            
+        Returns:
+            int | float: 小計（価格が設定されていない場合はNone）
+            
+        Raises:
+            IndexError: インデックスが範囲外の場合
+        """
+        subtotal = self._subtotals[self._id_at(index)]
+        return None if subtotal is None else self._to_number(subtotal)
+    
+    def count_unpriced(self):
+        """価格が設定されていない未完了アイテムの件数を取得
+        
+        Returns:
+            int: 価格未設定のアイテム数
+        """
+        return self._unpriced_count
+    
+    def verify_total(self):
+        """差分更新した合計金額が全件再計算の結果と一致するか検証
+        
+        Raises:
+            AssertionError: 合計金額・小計・価格未設定件数のいずれかが一致しない場合
+        """
+        subtotals = {item_id: self._line_total(item) for item_id, item in self._items.items()}
+        total = sum(sub for sub in subtotals.values() if sub is not None)
+        assert subtotals == self._subtotals, "小計が一致しません"
+        assert total == self._total, f"合計金額が一致しません: {self._total} != {total}"
+        assert (list(subtotals.values()).count(None) == self._unpriced_count), \
+            "価格未設定の件数が一致しません"
+    
+    @shopping_metrics.timed('shopping_list_save_to_file')
+    def save_to_file(self, filename, format=None):
         """リストをJSONファイルに保存
         
+        拡張子が .slc のファイル、または format='columnar' を指定した場合は
+        列指向のバイナリ形式（shopping_columnar モジュール）で保存します。
+        
         Args:
             filename (str): 保存先ファイル名
+            format (str, optional): 'json' または 'columnar'（省略時は拡張子で判定）
             
         Returns:
             str: 保存完了メッセージ
@@ -136,24 +924,29 @@ class ShoppingList:
             IOError: ファイル保存エラーの場合
         """
         try:
-            data = {
-                'items': self.items,
-                'completed_items': self.completed_items,
-                'saved_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            return f"リストを '{filename}' に保存しました"
+            with self._lock:
+                state = self._state()
+            shopping_backend.write_file(filename, state, format)
         except Exception as e:
             raise IOError(f"ファイル保存エラー: {e}")
+        
+        self.backend.file_saved(filename)
+        return f"リストを '{filename}' に保存しました"
     
-    def load_from_file(self, filename):
+    @shopping_metrics.timed('shopping_list_load_from_file')
+    def load_from_file(self, filename, format=None):
         """JSONファイルからリストを読み込み
         
+        ファイルの隣にジャーナル（<filename>.journal）がある場合は、
+        スナップショットの読み込み後にジャーナルを再生します。
+        拡張子が .slc のファイル、または format='columnar' を指定した場合は
+        列指向のバイナリ形式として読み込みます。
+        読み込みはロックを取得せずに行い、読み込み中に他のプロセスがファイルを
+        更新した場合は読み直します。読み込んだ内容は保存先に保存されます。
+        
         Args:
             filename (str): 読み込み元ファイル名
+            format (str, optional): 'json' または 'columnar'（省略時は拡張子で判定）
             
         Returns:
             str: 読み込み完了メッセージ
@@ -162,18 +955,61 @@ class ShoppingList:
             FileNotFoundError: ファイルが見つからない場合
             IOError: ファイル読み込みエラーの場合
         """
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        with self._save_lock:
+            # 書き込み遅延モードで保存待ちの変更は、読み込みで置き換える前に保存する
+            self._write_unsaved()
+            with self._lock:
+                revision = self._seq if self.loaded else 0
+                try:
+                    state, _ = shopping_backend.read_file(filename, format)
+                    self._replace_state(*state)
+                except FileNotFoundError:
+                    raise FileNotFoundError(f"ファイル '{filename}' が見つかりません")
+                except Exception as e:
+                    raise IOError(f"ファイル読み込みエラー: {e}")
+                # リスト全体を置き換えたため、リビジョンを進めて以前からの差分は作らない
+                self._seq = max(revision, self._seq) + 1
+                self._changes.clear()
+                self._changes_base = self._seq
+                try:
+                    # 読み込んだ内容で置き換えるため、他のプロセスの変更は読み直さない
+                    self._write([], snapshot=True, force=True)
+                except Exception as e:
+                    warnings.warn(f"自動保存に失敗しました: {e}")
+        return f"リストを '{filename}' から読み込みました"
+    
+    def export(self, filename, format=None):
+        """リストを人間が読みやすい形式で出力
+        
+        shopping_render モジュールのレンダラーで1行ずつ整形し、まとめて書き込みます。
+        まだ読み込まれていない場合は自動読み込みファイルからストリーミングで出力するため、
+        件数によらず一定のメモリで出力できます。
+        
+        Args:
+            filename (str): 出力先ファイル名
+            format (str, optional): 'text'・'csv'・'markdown'（省略時は拡張子で判定、
+                .csv・.md 以外はテキスト形式）
+            
+        Returns:
+            str: 出力完了メッセージ
             
-            self.items = data.get('items', [])
-            self.completed_items = data.get('completed_items', [])
+        Raises:
+            ValueError: 未対応の形式の場合
+            IOError: ファイル出力エラーの場合
+        """
+        if format is None:
+            format = shopping_render.format_for(filename)
+        lines = shopping_render.render(format, self.iter_items(),
+                                       self.iter_items(completed=True),
+                                       created_at=datetime.now())
+        try:
+            with file_store.atomic_write(filename) as f:
+                shopping_render.write_lines(lines, f)
             
-            return f"リストを '{filename}' から読み込みました"
-        except FileNotFoundError:
-            raise FileNotFoundError(f"ファイル '{filename}' が見つかりません")
+            return (f"リストを '{filename}' に"
+                    f"{shopping_render.FORMAT_LABELS[format]}形式で出力しました")
         except Exception as e:
-            raise IOError(f"ファイル読み込みエラー: {e}")
+            raise IOError(f"ファイル出力エラー: {e}")
     
     def export_to_text(self, filename):
         """リストを人間が読みやすいテキスト形式で出力
@@ -187,36 +1023,534 @@ class ShoppingList:
         Raises:
             IOError: ファイル出力エラーの場合
         """
+        return self.export(filename, 'text')
+    
+    def compact(self):
+        """ジャーナルをスナップショットにまとめる
+        
+        現在の状態を保存先に保存し、ジャーナルを空にします。
+        アーカイブを使用している場合は、直近の recent_completed 件より古い
+        完了済みアイテムをアーカイブに移してから保存します。
+        
+        Returns:
+            str: 保存完了メッセージ
+            
+        Raises:
+            IOError: ファイル保存エラーの場合
+        """
+        with self._save_lock, self._lock:
+            records, self._unsaved = self._unsaved, []
+            if self.archive is not None and len(self.completed_items) > self.recent_completed:
+                records += self._archive_completed()
+            try:
+                self._write(records, snapshot=True)
+            except Exception as e:
+                raise IOError(f"ファイル保存エラー: {e}")
+        return f"リストを '{self.backend.location}' に保存しました"
+    
+    def flush(self):
+        """保存待ちの変更を直ちに保存
+        
+        書き込み遅延モードで保存待ちの変更と、保存先がバッファしている変更を保存します。
+        
+        Raises:
+            IOError: ファイル保存エラーの場合
+        """
+        with self._save_lock:
+            try:
+                self._write_unsaved()
+                self.backend.flush()
+            except Exception as e:
+                raise IOError(f"ファイル保存エラー: {e}")
+    
+    def close(self):
+        """書き込み遅延モードを終了し、保存待ちの変更を保存して保存先を閉じる
+        
+        保存スレッドを停止し、保存待ちの変更を保存した後で保存先を閉じます
+        （JSONファイルの保存先では、以降の変更も直ちに保存されます）。
+        
+        Raises:
+            IOError: ファイル保存エラーの場合
+        """
+        saver = self._saver
+        if saver is not None:
+            self._stop.set()
+            self._dirty.set()
+            saver.join()
+            _write_behind_lists.discard(self)
+        with self._save_lock, self._lock:
+            self._saver = None
+            try:
+                self._write_unsaved()
+                self.backend.close()
+            except Exception as e:
+                raise IOError(f"ファイル保存エラー: {e}")
+    
+    def _run_saver(self):
+        """書き込み遅延モードの保存スレッド（内部メソッド）
+        
+        変更があると save_interval 秒待ち、その間の変更をまとめて1回で保存します。
+        """
+        # close() が _dirty を設定した直後に clear() しても停止を見逃さないよう、毎回 _stop を確認する
+        while not self._stop.is_set():
+            self._dirty.wait()
+            if self._stop.wait(self.save_interval):
+                return  # 残りの変更は close() で保存する
+            self._dirty.clear()
+            try:
+                self.flush()
+            except IOError as e:
+                warnings.warn(f"自動保存に失敗しました: {e}")
+    
+    def _write_unsaved(self):
+        """書き込み遅延モードで保存待ちの変更を保存（内部メソッド、self._save_lock の下で呼び出す）"""
+        with self._lock:
+            records, self._unsaved = self._unsaved, []
+        if records:
+            self._write(records)
+    
+    def _state(self):
+        """現在の状態を保存先に渡す形で取得（内部メソッド）
+        
+        書き込み中の変更の影響を受けないよう、アイテムの一覧を複製します。
+        
+        Returns:
+            tuple: (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq)
+        """
+        return list(self._items.values()), self.completed_items[:], self._next_id, self._seq
+    
+    def _replace_state(self, items, completed_items, next_id, seq, records):
+        """読み込んだ状態でリストを置き換える（内部メソッド）
+        
+        Args:
+            items (list): 未完了アイテム（ShoppingItem）
+            completed_items (list): 完了済みアイテム（ShoppingItem）
+            next_id (int): 次に割り当てるID
+            seq (int): 状態に含まれる最後の変更の連番
+            records (list): 状態に続けて適用する変更内容（ジャーナルレコード）
+        """
+        self._load_items(items, completed_items, next_id)
+        self._seq = seq
+        self._changes = []
+        self._changes_base = seq
+        for record in records:
+            self._apply_record(record)
+            self._seq = record['seq']
+            self._log_change(record)
+        if shopping_metrics.enabled:
+            self._record_sizes()
+    
+    def _apply_snapshot(self, snapshot):
+        """差分のスナップショットでリスト全体を置き換えて保存（内部メソッド）
+        
+        Args:
+            snapshot (dict): changes_since() の差分の 'snapshot'
+            
+        Returns:
+            dict: apply_changes() の戻り値
+        """
+        with self._save_lock:
+            self._write_unsaved()
+            with self._lock:
+                seq = self._seq + 1
+                self._replace_state([ShoppingItem.from_dict(data) for data in snapshot['items']],
+                                    [ShoppingItem.from_dict(data)
+                                     for data in snapshot['completed_items']],
+                                    snapshot['next_id'], seq, [])
+                try:
+                    # 差分のスナップショットで置き換えるため、他のプロセスの変更は読み直さない
+                    self._write([], snapshot=True, force=True)
+                except Exception as e:
+                    warnings.warn(f"自動保存に失敗しました: {e}")
+        return {'revision': seq, 'applied': 1, 'ids': {}, 'conflicts': []}
+    
+    def _archive_completed(self):
+        """直近の recent_completed 件より古い完了済みアイテムをアーカイブに移す（内部メソッド）
+        
+        アーカイブへの追記が完了してからリストから取り除くため、保存前にクラッシュしても
+        アイテムは失われません（再びアーカイブに渡されますが、重複して追記はされません）。
+        アーカイブに書き込めない場合は警告を出し、リストに残します。
+        
+        Returns:
+            list: 保存する変更内容（'archive' レコード、移したアイテムがない場合は空）
+        """
+        count = len(self.completed_items) - self.recent_completed
+        items = self.completed_items[:count]
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("=== 買い物リスト ===\n")
-                f.write(f"作成日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                
-                f.write("【未完了アイテム】\n")
-                for i, item in enumerate(self.items):
-                    price_str = f" - ¥{item['price']}" if item['price'] else ""
-                    f.write(f"{i+1}. {item['name']} (数量: {item['quantity']}){price_str}\n")
-                
-                if self.completed_items:
-                    f.write("\n【完了済みアイテム】\n")
-                    for item in self.completed_items:
-                        price_str = f" - ¥{item['price']}" if item['price'] else ""
-                        f.write(f"✓ {item['name']} (数量: {item['quantity']}){price_str}\n")
-                
-                total = self.calculate_total()
-                if total > 0:
-                    f.write(f"\n合計金額: ¥{total}\n")
-            
-            return f"リストを '{filename}' にテキスト形式で出力しました"
+            self.archive.append(items)
+        except IOError as e:
+            warnings.warn(f"アーカイブに移せませんでした: {e}")
+            return []
+        del self.completed_items[:count]
+        # 移したアイテムは最後のアイテムのIDで記録する（再生時はそのアイテムまでを取り除く）
+        self._seq += 1
+        record = {'op': 'archive', 'id': items[-1].id, 'seq': self._seq}
+        self._log_change(record)
+        if shopping_metrics.enabled:
+            shopping_metrics.increment('shopping_list_archived_items_total', count,
+                                       list=self.backend.location)
+        return [record]
+    
+    def _log_change(self, record):
+        """変更内容を changes_since() 用の変更履歴に追加（内部メソッド）
+        
+        変更履歴は連番の連続した変更内容を保持します。連番が連続しない場合は、
+        それより前の変更履歴を破棄します。
+        
+        Args:
+            record (dict): 連番（'seq'）を割り当て済みの変更内容
+        """
+        changes = self._changes
+        if record['op'] != 'add' and 'id' not in record:
+            # 旧形式のレコード（IDの代わりにインデックス）は差分にできない
+            changes.clear()
+            self._changes_base = record['seq']
+            return
+        if record['seq'] != self._changes_base + len(changes) + 1:
+            changes.clear()
+            self._changes_base = record['seq'] - 1
+        changes.append(record)
+        if len(changes) > 2 * self.change_log_size:
+            # 古い変更内容はまとめて破棄する（1件ずつ破棄するより速い）
+            discard = len(changes) - self.change_log_size
+            del changes[:discard]
+            self._changes_base += discard
+    
+    def _discard_changes(self, seq):
+        """連番が seq より後の変更内容を変更履歴から破棄（batch() のロールバック用、内部メソッド）"""
+        if seq < self._changes_base:
+            self._changes.clear()
+            self._changes_base = seq
+        else:
+            del self._changes[seq - self._changes_base:]
+    
+    def _has_id(self, item_id):
+        """IDのアイテムが未完了または完了済み（アーカイブ以外）にあるか（内部メソッド）"""
+        return item_id in self._items or self._completed_index(item_id) is not None
+    
+    def _rename_id(self, item_id, new_id):
+        """アイテムのIDを変更して保存（内部メソッド、batch() の中で呼び出す）
+        
+        Args:
+            item_id (int): 現在のID
+            new_id (int): 新しいID（使われていないもの）
+        """
+        record = {'op': 'rename', 'id': item_id, 'new_id': new_id}
+        self._apply_record(record)
+        self._auto_save(record)
+    
+    def _find_completed(self, item_id):
+        """IDで完了済みアイテムを検索（新しいものから、内部メソッド）
+        
+        Returns:
+            ShoppingItem: 完了済みアイテム（見つからない場合はNone）
+        """
+        index = self._completed_index(item_id)
+        return None if index is None else self.completed_items[index]
+    
+    def _completed_index(self, item_id):
+        """IDで完了済みアイテムの位置を検索（新しいものから、内部メソッド）
+        
+        Returns:
+            int: completed_items での位置（見つからない場合はNone）
+        """
+        for index in range(len(self.completed_items) - 1, -1, -1):
+            if self.completed_items[index].id == item_id:
+                return index
+        return None
+    
+    @shopping_metrics.timed('shopping_list_auto_load')
+    def _auto_load(self):
+        """保存先からリストを読み込む（内部メソッド）
+        
+        読み込めなかった場合は未読み込みの状態のままとし、空のリストで上書きしないようにします。
+        
+        Raises:
+            IOError: 保存先を読み込めない場合
+        """
+        try:
+            state = self.backend.read()
         except Exception as e:
-            raise IOError(f"ファイル出力エラー: {e}")
+            raise IOError(f"ファイル読み込みエラー: {e}")
+        self._replace_state(*state)
+    
+    def _load_items(self, items, completed_items, next_id=1):
+        """アイテム一覧を読み込み、IDを割り当てて索引を再構築（内部メソッド）
+        
+        IDを持たないアイテム（旧形式のファイル）や重複したIDには新しいIDを割り当てます。
+        
+        Args:
+            items (list): 未完了アイテム（ShoppingItem）
+            completed_items (list): 完了済みアイテム（ShoppingItem）
+            next_id (int): 次に割り当てるID
+        """
+        used_ids = {item.id for item in items + completed_items if item.id is not None}
+        self._next_id = max([next_id] + [item_id + 1 for item_id in used_ids])
+        self._items = {}
+        for item in items:
+            if item.id is None or item.id in self._items:
+                item.id = self._next_id
+                self._next_id += 1
+            self._items[item.id] = item
+        for item in completed_items:
+            if item.id is None:
+                item.id = self._next_id
+                self._next_id += 1
+        self.completed_items = completed_items
+        self._reset_indexes()
+    
+    def _reset_indexes(self):
+        """名前の索引・小計・合計金額・価格未設定件数を全件から再構築（内部メソッド）"""
+        self._name_index = {}
+        self._subtotals = {}
+        self._total = Decimal(0) if self.money is None else 0
+        self._unpriced_count = 0
+        for item in self._items.values():
+            self._index_item(item)
+    
+    def _index_item(self, item):
+        """アイテムを名前の索引と合計金額に反映（内部メソッド）
+        
+        Args:
+            item (ShoppingItem): 未完了アイテム
+        """
+        self._name_index.setdefault(normalize_name(item.name), {})[item.id] = None
+        subtotal = self._line_total(item)
+        self._subtotals[item.id] = subtotal
+        if subtotal is None:
+            self._unpriced_count += 1
+        else:
+            self._total += subtotal
+    
+    def _append_item(self, item):
+        """未完了リストの末尾にアイテムを追加し、索引と合計金額を更新（内部メソッド）
+        
+        Args:
+            item (ShoppingItem): 追加するアイテム
+        """
+        self._items[item.id] = item
+        self._next_id = max(self._next_id, item.id + 1)
+        self._index_item(item)
     
-    def _auto_save(self):
+    def _pop_item(self, item_id):
+        """未完了リストからアイテムを取り出し、索引と合計金額を更新（内部メソッド）
+        
+        辞書からの削除のため、リストの先頭から取り出してもO(1)です。
+        
+        Args:
+            item_id (int): 取り出すアイテムのID
+            
+        Returns:
+            ShoppingItem: 取り出したアイテム
+        """
+        item = self._items.pop(item_id)
+        key = normalize_name(item.name)
+        del self._name_index[key][item_id]
+        if not self._name_index[key]:
+            del self._name_index[key]
+        subtotal = self._subtotals.pop(item_id)
+        if subtotal is None:
+            self._unpriced_count -= 1
+        else:
+            self._total -= subtotal
+        return item
+    
+    def _id_at(self, index):
+        """表示順のインデックスに対応するアイテムIDを取得（内部メソッド）
+        
+        Args:
+            index (int): アイテムのインデックス（0ベース）
+            
+        Returns:
+            int: アイテムID
+            
+        Raises:
+            IndexError: インデックスが範囲外の場合
+        """
+        if not 0 <= index < len(self._items):
+            raise IndexError("無効なアイテム番号です")
+        return next(islice(self._items, index, None))
+    
+    def _ids_at(self, indices):
+        """複数のインデックスを検証し、対応するアイテムIDを表示順で取得（内部メソッド）
+        
+        Args:
+            indices (iterable): アイテムのインデックス（0ベース）
+            
+        Returns:
+            list: 重複のないアイテムIDのリスト（表示順）
+            
+        Raises:
+            IndexError: インデックスが範囲外の場合
+        """
+        targets = set(indices)
+        if targets and not (0 <= min(targets) and max(targets) < len(self._items)):
+            raise IndexError("無効なアイテム番号です")
+        return [item_id for index, item_id in enumerate(self._items) if index in targets]
+    
+    def _apply_record(self, record):
+        """ジャーナルレコードをリストに適用（内部メソッド）
+        
+        Args:
+            record (dict): ジャーナルレコード
+        """
+        op = record['op']
+        if op == 'add':
+            item = ShoppingItem.from_dict(record['item'])
+            if item.id is None:
+                item.id = self._next_id
+            self._append_item(item)
+            return
+        # 旧形式のレコードはIDの代わりにインデックスを持つ
+        item_id = record['id'] if 'id' in record else self._id_at(record['index'])
+        if op == 'remove':
+            self._pop_item(item_id)
+        elif op == 'complete':
+            completed_at = parse_timestamp(record['completed_date'])
+            self.completed_items.append(self._pop_item(item_id).completed(completed_at))
+        elif op == 'recomplete':
+            index = self._completed_index(item_id)
+            completed_at = parse_timestamp(record['completed_date'])
+            self.completed_items[index] = self.completed_items[index].completed(completed_at)
+        elif op == 'remove_completed':
+            del self.completed_items[self._completed_index(item_id)]
+        elif op == 'rename':
+            new_id = record['new_id']
+            if item_id in self._items:
+                # 並び順を保つため辞書を作り直す（アイテムはIDを変えたコピーに置き換える）
+                self._items = {
+                    (new_id if key == item_id else key):
+                        (item.renamed(new_id) if key == item_id else item)
+                    for key, item in self._items.items()}
+                self._reset_indexes()
+            else:
+                index = self._completed_index(item_id)
+                self.completed_items[index] = self.completed_items[index].renamed(new_id)
+            self._next_id = max(self._next_id, new_id + 1)
+        elif op == 'archive':
+            for index, item in enumerate(self.completed_items):
+                if item.id == item_id:
+                    del self.completed_items[:index + 1]
+                    break
+    
+    @shopping_metrics.timed('shopping_list_auto_save')
+    def _auto_save(self, record):
         """データの自動保存（内部メソッド）
         
-        アイテムの変更時に自動的にJSONファイルに保存します。
+        アイテムの変更時に変更内容を保存先に渡して保存します。
+        JSONファイルのジャーナルモードでは変更内容のみをジャーナルに追記し、
+        レコード数が compact_threshold に達した時点でスナップショットを作成します。
+        batch() ブロック内では保存を保留します。
+        
+        Args:
+            record (dict): 保存する変更内容
+        """
+        self._seq += 1
+        record['seq'] = self._seq
+        self._log_change(record)
+        if self._batch_depth:
+            self._pending.append(record)
+            return
+        self._flush([record])
+    
+    def _flush(self, records):
+        """保留中の変更を保存（内部メソッド）
+        
+        書き込み遅延モードでは保存待ちに加えて保存スレッドに通知し、
+        それ以外は直ちに書き込みます。保存に失敗した場合は警告を出します（例外は送出しません）。
+        
+        アーカイブを使用していて、完了済みアイテムが recent_completed の2倍を超えた場合は、
+        古いものをアーカイブに移す変更も同じ保存に含めます。
+        
+        Args:
+            records (list): ジャーナルに追記する変更内容の列
         """
+        if self.archive is not None and len(self.completed_items) > 2 * self.recent_completed:
+            records = records + self._archive_completed()
+        if self._saver is not None:
+            self._unsaved.extend(records)
+            self._dirty.set()
+            return
         try:
-            self.save_to_file(self.data_file)
-        except:
-            pass  # 自動保存エラーは無視
\ No newline at end of file
+            self._write(records)
+        except Exception as e:
+            warnings.warn(f"自動保存に失敗しました: {e}")
+    
+    @shopping_metrics.timed('shopping_list_write')
+    def _write(self, records, snapshot=False, force=False):
+        """変更内容を保存先に書き込む（内部メソッド）
+        
+        保存先が状態全体を必要とする場合（JSONファイルの全体保存・ジャーナルのまとめ）、
+        状態は self._lock の下で確定し、保存先への書き込みは self._lock を解放した状態で
+        行います（書き込み遅延モードでは書き込み中も変更できます）。最後に同期した後で
+        他のプロセスが保存先を更新していた場合は、_rebase() で最新の内容に変更を
+        適用し直してからやり直します（force=True の場合は読み直さずに上書きします）。
+        
+        Args:
+            records (list): 保存する変更内容の列
+            snapshot (bool): Trueの場合、変更内容の代わりに状態全体を保存する
+            force (bool): Trueの場合、他のプロセスの更新を読み直さずに状態全体で上書きする
+                （リスト全体を置き換えた直後の保存用、snapshot=True と合わせて指定する）
+        """
+        while True:
+            with self._lock:
+                state = None
+                if snapshot or self.backend.needs_snapshot(len(records)):
+                    state = self._state()
+            if self.backend.write(records, state, force):
+                if shopping_metrics.enabled:
+                    shopping_metrics.increment('shopping_list_records_written_total',
+                                               len(records), list=self.backend.location)
+                    self._record_sizes()
+                return
+            with self._lock:
+                records, self._unsaved = self._rebase(records + self._unsaved), []
+    
+    def _record_sizes(self):
+        """リストのアイテム数を計測結果のゲージに記録（内部メソッド）"""
+        location = self.backend.location
+        shopping_metrics.set_gauge('shopping_list_items', len(self._items), list=location)
+        shopping_metrics.set_gauge('shopping_list_completed_items', len(self.completed_items),
+                                   list=location)
+    
+    def _rebase(self, records):
+        """保存先の最新の内容を読み直し、未保存の変更を適用し直す（内部メソッド）
+        
+        self._lock の下で呼び出します。
+        他のプロセスと同じIDを割り当てたアイテムには新しいIDを割り当てます。
+        他のプロセスが既に削除・完了したアイテムに対する変更は適用しません（先に保存した方を優先）。
+        他のプロセスが既にアーカイブに移した完了済みアイテムのアーカイブも適用しません。
+        
+        Args:
+            records (list): 未保存の変更内容の列
+            
+        Returns:
+            list: 適用し直した変更内容の列（連番・IDを振り直したもの）
+        """
+        self._replace_state(*self.backend.read())
+        id_map = {}
+        rebased = []
+        for record in records:
+            record = dict(record)
+            if record['op'] == 'add':
+                item = dict(record['item'])
+                if item['id'] < self._next_id:
+                    id_map[item['id']] = self._next_id
+                    item['id'] = self._next_id
+                record['item'] = item
+            else:
+                record['id'] = id_map.get(record['id'], record['id'])
+                if record['op'] == 'rename':
+                    if not self._has_id(record['id']) or self._has_id(record['new_id']):
+                        continue
+                elif record['op'] in ('archive', 'recomplete', 'remove_completed'):
+                    if self._completed_index(record['id']) is None:
+                        continue
+                elif record['id'] not in self._items:
+                    continue
+            self._apply_record(record)
+            self._seq += 1
+            record['seq'] = self._seq
+            self._log_change(record)
+            rebased.append(record)
+        return rebased
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+計測モジュール
+Lightweight counters, gauges and latency histograms for the hot paths.
+
+環境変数 SHOPPING_METRICS に出力先のファイル名を指定すると計測が有効になり、
+終了時に計測結果を書き出します（拡張子が .prom・.txt の場合は Prometheus の
+テキスト形式、それ以外は JSON）。計測の有効・無効はモジュールの読み込み時に決まり、
+無効の場合は timed() がメソッドをそのまま返すため、実行時の負荷はありません。
+
+    SHOPPING_METRICS=metrics.json python3 shopping_calculator.py
+
+計測される主な値:
+    calculator_calculate_expression_seconds     式計算1回あたりの時間
+    shopping_list_auto_save_seconds             自動保存1回あたりの時間
+    shopping_list_write_seconds                 保存先への書き込み1回あたりの時間
+    shopping_list_bytes_written_total           JSONファイル・ジャーナルに書き込んだバイト数
+    shopping_list_load_from_file_seconds        ファイルからの読み込みの時間
+    shopping_list_items / shopping_list_completed_items  リストごとのアイテム数
+    shopping_list_archived_items_total          アーカイブに移した完了済みアイテムの数
+
+同様に、SHOPPING_PROFILE を指定すると cProfile の結果（pstats 形式、メインスレッドのみ）を、
+SHOPPING_TRACEMALLOC を指定すると tracemalloc によるメモリ割り当ての上位を、
+終了時に指定したファイルへ書き出します（いずれもモジュールの読み込み時から計測します）。
+"""
+
+import atexit
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+import file_store
+
+# 計測が有効かどうか（SHOPPING_METRICS が設定されている場合）
+enabled = bool(os.environ.get("SHOPPING_METRICS"))
+
+# 時間のヒストグラムのバケットの上限（秒）
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# tracemalloc の結果に書き出す割り当て元の件数
+TRACEMALLOC_TOP = 30
+
+
+def _series(name, labels):
+    """メトリクス名とラベルから系列名を作成（例: 'name{list="a.json"}'、内部関数）
+
+    Args:
+        name (str): メトリクス名
+        labels (tuple): (ラベル名, 値) の組の列
+    """
+    if not labels:
+        return name
+    pairs = ",".join('{}="{}"'.format(key, str(value).replace('\\', '\\\\')
+                                      .replace('"', '\\"').replace('\n', '\\n'))
+                     for key, value in labels)
+    return f"{name}{{{pairs}}}"
+
+
+class MetricsRegistry:
+    """カウンター・ゲージ・ヒストグラムを保持するクラス
+
+    値は (メトリクス名, ラベル) ごとに保持し、系列名への整形は書き出し時にのみ行います。
+    記録はスレッドセーフで、書き込み遅延モードの保存スレッドからも呼び出せます。
+
+    Attributes:
+        buckets (tuple): ヒストグラムのバケットの上限（昇順）
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """MetricsRegistryクラスの初期化
+
+        Args:
+            buckets (tuple): ヒストグラムのバケットの上限（昇順）
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """記録したすべての値を消去"""
+        with self._lock:
+            self._counters = {}  # (メトリクス名, ラベル) → 値
+            self._gauges = {}
+            self._histograms = {}  # (メトリクス名, ラベル) → [バケットごとの件数, 合計]
+
+    def increment(self, name, value=1, **labels):
+        """カウンターを増やす
+
+        Args:
+            name (str): メトリクス名（'_total' で終わる名前）
+            value (int | float): 増やす値
+            **labels: ラベル
+        """
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """ゲージを設定
+
+        Args:
+            name (str): メトリクス名
+            value (int | float): 値
+            **labels: ラベル
+        """
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        """ヒストグラムに値を記録
+
+        Args:
+            name (str): メトリクス名（時間の場合は '_seconds' で終わる名前）
+            value (float): 値
+            **labels: ラベル
+        """
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][bisect_left(self.buckets, value)] += 1
+            histogram[1] += value
+
+    def snapshot(self):
+        """記録した値を辞書で取得
+
+        ヒストグラムのバケットの件数は Prometheus と同様に累積（上限以下の件数）です。
+
+        Returns:
+            dict: 'counters'・'gauges'（系列名 → 値）と
+                'histograms'（系列名 → 'count'・'sum'・'buckets'）
+        """
+        with self._lock:
+            histograms = {}
+            for (name, labels), (counts, total) in self._histograms.items():
+                buckets = dict(self._cumulative(counts))
+                histograms[_series(name, labels)] = {'count': buckets["+Inf"], 'sum': total,
+                                                     'buckets': buckets}
+            return {
+                'counters': {_series(*key): value for key, value in self._counters.items()},
+                'gauges': {_series(*key): value for key, value in self._gauges.items()},
+                'histograms': histograms,
+            }
+
+    def to_prometheus(self):
+        """記録した値を Prometheus のテキスト形式で取得
+
+        Returns:
+            str: Prometheus のテキスト形式（exposition format）
+        """
+        with self._lock:
+            lines = []
+            for kind, metrics in (('counter', self._counters), ('gauge', self._gauges)):
+                typed = set()
+                for (name, labels), value in sorted(metrics.items()):
+                    if name not in typed:
+                        typed.add(name)
+                        lines.append(f"# TYPE {name} {kind}")
+                    lines.append(f"{_series(name, labels)} {value}")
+            typed = set()
+            for (name, labels), (counts, total) in sorted(self._histograms.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} histogram")
+                for le, cumulative in self._cumulative(counts):
+                    lines.append(f"{_series(name + '_bucket', labels + (('le', le),))} "
+                                 f"{cumulative}")
+                lines.append(f"{_series(name + '_sum', labels)} {total}")
+                lines.append(f"{_series(name + '_count', labels)} {cumulative}")
+            return "\n".join(lines) + "\n"
+
+    def _cumulative(self, counts):
+        """バケットの上限（文字列）と累積件数の組を順に返す（内部メソッド）"""
+        cumulative = 0
+        for bound, count in zip(self.buckets + (None,), counts):
+            cumulative += count
+            yield ("+Inf" if bound is None else repr(bound)), cumulative
+
+
+# 計測結果を記録する既定のレジストリ
+registry = MetricsRegistry()
+
+
+def increment(name, value=1, **labels):
+    """既定のレジストリのカウンターを増やす（MetricsRegistry.increment を参照）"""
+    registry.increment(name, value, **labels)
+
+
+def set_gauge(name, value, **labels):
+    """既定のレジストリのゲージを設定（MetricsRegistry.set_gauge を参照）"""
+    registry.set_gauge(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    """既定のレジストリのヒストグラムに値を記録（MetricsRegistry.observe を参照）"""
+    registry.observe(name, value, **labels)
+
+
+def timed(name):
+    """関数の実行時間と例外の件数を記録するデコレータ
+
+    '<name>_seconds' のヒストグラムに実行時間を、例外が発生した場合は
+    '<name>_errors_total' のカウンターに件数を記録します。
+    計測が無効の場合は関数をそのまま返します。
+
+    Args:
+        name (str): メトリクス名の接頭辞
+
+    Returns:
+        callable: デコレータ
+    """
+    def decorator(function):
+        if not enabled:
+            return function
+        seconds, errors = f"{name}_seconds", f"{name}_errors_total"
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except BaseException:
+                registry.increment(errors)
+                raise
+            finally:
+                registry.observe(seconds, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def write_metrics(filename, format=None):
+    """既定のレジストリの計測結果をファイルに書き出す
+
+    Args:
+        filename (str): 出力先ファイル名
+        format (str, optional): 'json' または 'prometheus'
+            （省略時は拡張子が .prom・.txt の場合に 'prometheus'、それ以外は 'json'）
+
+    Raises:
+        ValueError: 未対応の形式の場合
+    """
+    if format is None:
+        format = 'prometheus' if filename.endswith(('.prom', '.txt')) else 'json'
+    if format == 'prometheus':
+        text = registry.to_prometheus()
+    elif format == 'json':
+        import json
+        text = json.dumps(registry.snapshot(), ensure_ascii=False, indent=2) + "\n"
+    else:
+        raise ValueError(f"未対応の形式です: {format}")
+    with file_store.atomic_write(filename) as f:
+        f.write(text)
+
+
+def _write_tracemalloc(filename):
+    """tracemalloc の結果（割り当て元の上位と使用量）を書き出す（内部関数）"""
+    import tracemalloc
+
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics('lineno')
+    with file_store.atomic_write(filename) as f:
+        f.write(f"現在の使用量: {current / 2 ** 20:.1f}MB, ピーク: {peak / 2 ** 20:.1f}MB\n")
+        for statistic in statistics[:TRACEMALLOC_TOP]:
+            f.write(f"{statistic}\n")
+    tracemalloc.stop()
+
+
+def _start_capture():
+    """環境変数で指定された計測を開始し、終了時の書き出しを登録（内部関数）"""
+    metrics_file = os.environ.get("SHOPPING_METRICS")
+    if metrics_file:
+        atexit.register(write_metrics, metrics_file)
+
+    tracemalloc_file = os.environ.get("SHOPPING_TRACEMALLOC")
+    if tracemalloc_file:
+        import tracemalloc
+
+        tracemalloc.start()
+        atexit.register(_write_tracemalloc, tracemalloc_file)
+
+    profile_file = os.environ.get("SHOPPING_PROFILE")
+    if profile_file:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def write_profile():
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+        # 終了時の他の書き出しを含めないよう最後に登録する（atexit は登録と逆順に実行）
+        atexit.register(write_profile)
+
+
+_start_capture()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+金額計算モジュール
+Fixed-point money arithmetic on integer minor units with explicit rounding rules.
+
+金額を最小単位（円の場合は銭など）の整数で保持し、浮動小数点数の誤差
+（298 * 1.08 = 321.84000000000003 など）なしに計算します。演算はすべてPythonの整数で行い、
+端数処理は丸め方（FLOOR・CEILING・HALF_UP・HALF_EVEN）を指定した整数除算の1か所だけで行います。
+
+価格・数量・税率などの値は、書かれたとおりの10進数として解釈します
+（浮動小数点数は repr() の文字列で解釈するため、1.08 は 108/100 として扱います）。
+
+使用例:
+    money = MoneyMode(digits=2, tax=TaxRule("0.08", FLOOR, per_line=True))
+    money.multiply(298, 1.08)              # 321.84
+    money.evaluate("298 * 1.08")           # 321.84
+    money.totals([money.amount(298, 2)])   # MoneyTotal(subtotal=596, tax=47, total=643)
+"""
+
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+import expression as expression_engine
+
+# 丸め方
+FLOOR = 'floor'            # 切り捨て（負の無限大の方向）
+CEILING = 'ceiling'        # 切り上げ（正の無限大の方向）
+HALF_UP = 'half_up'        # 四捨五入（0.5はゼロから遠い方向）
+HALF_EVEN = 'half_even'    # 偶数丸め（0.5は偶数の方向、銀行丸め）
+ROUNDINGS = (FLOOR, CEILING, HALF_UP, HALF_EVEN)
+
+# 式の計算の途中で保持する小数点以下の桁数（最後に金額の桁数に丸める）
+EXACT_DIGITS = 12
+_EXACT_SCALE = 10 ** EXACT_DIGITS
+
+# 税込みの合計（金額はすべて表示・計算用の数値）
+MoneyTotal = namedtuple('MoneyTotal', ['subtotal', 'tax', 'total'])
+
+
+def divide(numerator, denominator, rounding=HALF_EVEN):
+    """整数の割り算を指定した丸め方で整数に丸める
+
+    Args:
+        numerator (int): 割られる数
+        denominator (int): 割る数
+        rounding (str): 丸め方（FLOOR・CEILING・HALF_UP・HALF_EVEN）
+
+    Returns:
+        int: 丸めた商
+
+    Raises:
+        ZeroDivisionError: 割る数が0の場合
+    """
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    if not remainder or rounding == FLOOR:
+        return quotient
+    if rounding == CEILING:
+        return quotient + 1
+    twice = remainder * 2
+    if twice > denominator:
+        return quotient + 1
+    if twice < denominator:
+        return quotient
+    # ちょうど半分（quotient は負の無限大方向に丸めた商）
+    if rounding == HALF_UP:
+        return quotient if numerator < 0 else quotient + 1
+    return quotient + (quotient & 1)
+
+
+@lru_cache(maxsize=4096)
+def _ratio(value):
+    """数値を10進数として誤差なく分数に変換（同じ値の変換はキャッシュ、内部関数）
+
+    Returns:
+        tuple: (分子, 分母) の整数の組（分母は正）
+
+    Raises:
+        ValueError: 数値として解釈できない値（NaN・無限大を含む）の場合
+    """
+    if type(value) is int:
+        return value, 1
+    try:
+        number = Decimal(repr(value) if isinstance(value, float) else str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"金額にできない値です: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"金額にできない値です: {value!r}")
+    return number.as_integer_ratio()
+
+
+class _Exact:
+    """式の計算に使う固定小数点数（小数点以下 EXACT_DIGITS 桁の整数、内部クラス）
+
+    乗算・除算の結果は EXACT_DIGITS 桁に偶数丸めします。べき乗の指数は整数のみです。
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    @classmethod
+    def of(cls, value):
+        numerator, denominator = _ratio(value)
+        return cls(divide(numerator * _EXACT_SCALE, denominator))
+
+    def __add__(self, other):
+        return _Exact(self.value + other.value)
+
+    def __sub__(self, other):
+        return _Exact(self.value - other.value)
+
+    def __mul__(self, other):
+        return _Exact(divide(self.value * other.value, _EXACT_SCALE))
+
+    def __truediv__(self, other):
+        return _Exact(divide(self.value * _EXACT_SCALE, other.value))
+
+    def __mod__(self, other):
+        return _Exact(self.value % other.value)
+
+    def __pow__(self, other):
+        exponent, fraction = divmod(other.value, _EXACT_SCALE)
+        if fraction:
+            raise ValueError("金額モードでは整数のべき乗のみ計算できます")
+        expression_engine.check_power(self.value.bit_length(), abs(exponent))
+        if exponent == 0:
+            return _Exact(_EXACT_SCALE)
+        if exponent > 0:
+            return _Exact(divide(self.value ** exponent, _EXACT_SCALE ** exponent // _EXACT_SCALE))
+        return _Exact(divide(_EXACT_SCALE ** (1 - exponent), self.value ** -exponent))
+
+    def __neg__(self):
+        return _Exact(-self.value)
+
+    def __pos__(self):
+        return self
+
+
+_literal = lru_cache(maxsize=1024)(_Exact.of)
+
+
+class TaxRule:
+    """消費税の計算方法
+
+    Attributes:
+        rate (str | int | float | Decimal): 税率（例: "0.10"）
+        rounding (str): 税額の丸め方
+        per_line (bool): Trueの場合は行（アイテム）ごとに税額を丸めて合計する。
+            Falseの場合は小計の合計に対して1回だけ税額を計算する
+        digits (int): 税額を丸める小数点以下の桁数（0の場合は1円単位）
+    """
+
+    def __init__(self, rate, rounding=FLOOR, per_line=False, digits=0):
+        """TaxRuleクラスの初期化
+
+        Raises:
+            ValueError: 税率を数値として解釈できない場合、または丸め方が不明な場合
+        """
+        if rounding not in ROUNDINGS:
+            raise ValueError(f"不明な丸め方です: {rounding}")
+        self.rate = rate
+        self.rounding = rounding
+        self.per_line = per_line
+        self.digits = digits
+        self._numerator, self._denominator = _ratio(rate)
+
+    def __repr__(self):
+        return (f"TaxRule({self.rate!r}, {self.rounding!r}, per_line={self.per_line}, "
+                f"digits={self.digits})")
+
+    def tax(self, amount, scale):
+        """金額に対する税額を計算
+
+        Args:
+            amount (int): 金額（最小単位の整数）
+            scale (int): 金額の最小単位の数（1円 = scale）
+
+        Returns:
+            int: 税額（最小単位の整数、digits の桁に丸め済み）
+        """
+        unit = scale // 10 ** self.digits
+        return divide(amount * self._numerator, self._denominator * unit, self.rounding) * unit
+
+    def tax_lines(self, amounts, scale):
+        """行ごとの税額を丸めて合計
+
+        Args:
+            amounts (iterable): 行ごとの金額（最小単位の整数）
+            scale (int): 金額の最小単位の数（1円 = scale）
+
+        Returns:
+            int: 税額の合計（最小単位の整数）
+        """
+        unit = scale // 10 ** self.digits
+        numerator, denominator, rounding = self._numerator, self._denominator * unit, self.rounding
+        if rounding == FLOOR:
+            # 切り捨ては整数の切り捨て除算そのもの
+            return sum(amount * numerator // denominator for amount in amounts) * unit
+        return sum(divide(amount * numerator, denominator, rounding) for amount in amounts) * unit
+
+
+class MoneyMode:
+    """最小単位の整数で金額を計算する設定（金額モード）
+
+    digits=2 の場合、321.84円は整数 32184 として保持します。値はすべて10進数として
+    誤差なく解釈し、最小単位に満たない端数は rounding の丸め方で1回だけ丸めます。
+
+    Attributes:
+        digits (int): 金額の小数点以下の桁数（0〜EXACT_DIGITS）
+        scale (int): 1円あたりの最小単位の数（10 ** digits）
+        rounding (str): 最小単位への丸め方
+        tax (TaxRule): 既定の消費税の計算方法（未設定の場合はNone）
+    """
+
+    def __init__(self, digits=2, rounding=HALF_EVEN, tax=None):
+        """MoneyModeクラスの初期化
+
+        Raises:
+            ValueError: 桁数が範囲外の場合、または丸め方が不明な場合
+        """
+        if not 0 <= digits <= EXACT_DIGITS:
+            raise ValueError(f"金額の桁数は0〜{EXACT_DIGITS}です: {digits}")
+        if rounding not in ROUNDINGS:
+            raise ValueError(f"不明な丸め方です: {rounding}")
+        if tax is not None and tax.digits > digits:
+            raise ValueError("税額の桁数が金額の桁数を超えています")
+        self.digits = digits
+        self.scale = 10 ** digits
+        self.rounding = rounding
+        self.tax = tax
+
+    def __repr__(self):
+        return f"MoneyMode(digits={self.digits}, rounding={self.rounding!r}, tax={self.tax!r})"
+
+    def to_minor(self, value):
+        """数値を最小単位の整数に変換
+
+        Args:
+            value (int | float | str | Decimal): 金額
+
+        Returns:
+            int: 最小単位の整数（rounding で丸め済み）
+
+        Raises:
+            ValueError: 数値として解釈できない場合
+        """
+        if type(value) is int:
+            return value * self.scale
+        numerator, denominator = _ratio(value)
+        return divide(numerator * self.scale, denominator, self.rounding)
+
+    def to_number(self, minor):
+        """最小単位の整数を表示・計算用の数値に変換
+
+        Args:
+            minor (int): 最小単位の整数
+
+        Returns:
+            int | float: 整数になる場合はint、それ以外はfloat（321.84 のように誤差のない表示になる）
+        """
+        whole, fraction = divmod(minor, self.scale)
+        return minor / self.scale if fraction else whole
+
+    def format(self, minor):
+        """最小単位の整数を小数点以下 digits 桁の文字列に整形
+
+        Args:
+            minor (int): 最小単位の整数
+
+        Returns:
+            str: 整形した金額（例: "321.84"）
+        """
+        whole, fraction = divmod(abs(minor), self.scale)
+        sign = "-" if minor < 0 else ""
+        return f"{sign}{whole}.{fraction:0{self.digits}d}" if self.digits else f"{sign}{whole}"
+
+    def amount(self, price, quantity):
+        """価格 × 数量 を最小単位の整数で計算
+
+        Args:
+            price (int | float): 価格（未設定の場合はNone）
+            quantity (int | float): 数量
+
+        Returns:
+            int: 金額（最小単位の整数、価格が設定されていない場合はNone）
+        """
+        if not price:
+            return None
+        if type(price) is int and type(quantity) is int:
+            return price * quantity * self.scale
+        price_numerator, price_denominator = _ratio(price)
+        quantity_numerator, quantity_denominator = _ratio(quantity)
+        return divide(price_numerator * quantity_numerator * self.scale,
+                      price_denominator * quantity_denominator, self.rounding)
+
+    def line_total(self, item):
+        """アイテムの小計（価格 × 数量）を最小単位の整数で計算
+
+        Args:
+            item (ShoppingItem): アイテム
+
+        Returns:
+            int: 小計（価格が設定されていない場合はNone）
+        """
+        return self.amount(item.price, item.quantity)
+
+    def _result(self, numerator, denominator):
+        """分数を最小単位に丸めて数値に変換（内部メソッド）"""
+        return self.to_number(divide(numerator * self.scale, denominator, self.rounding))
+
+    def add(self, a, b):
+        """a + b を計算し、最小単位に丸める"""
+        (an, ad), (bn, bd) = _ratio(a), _ratio(b)
+        return self._result(an * bd + bn * ad, ad * bd)
+
+    def subtract(self, a, b):
+        """a - b を計算し、最小単位に丸める"""
+        (an, ad), (bn, bd) = _ratio(a), _ratio(b)
+        return self._result(an * bd - bn * ad, ad * bd)
+
+    def multiply(self, a, b):
+        """a × b を計算し、最小単位に丸める"""
+        (an, ad), (bn, bd) = _ratio(a), _ratio(b)
+        return self._result(an * bn, ad * bd)
+
+    def divide(self, a, b):
+        """a ÷ b を計算し、最小単位に丸める
+
+        Raises:
+            ZeroDivisionError: b が0の場合
+        """
+        (an, ad), (bn, bd) = _ratio(a), _ratio(b)
+        return self._result(an * bd, ad * bn)
+
+    def evaluate(self, expression, variables=None):
+        """数式を固定小数点数で計算し、最小単位に丸める
+
+        途中の計算は小数点以下 EXACT_DIGITS 桁で行い、結果を rounding で丸めます。
+
+        Args:
+            expression (str): 計算する数式（例: "298 * 1.08"）
+            variables (dict, optional): 式中の変数名と値の対応
+
+        Returns:
+            int | float: 計算結果
+
+        Raises:
+            ValueError: 無効な式、未定義の変数、ゼロ除算、または整数でない指数の場合
+        """
+        result = expression_engine.evaluate_exact(expression, variables or {}, self._number)
+        minor = divide(result.value, _EXACT_SCALE // self.scale, self.rounding)
+        return expression_engine.check_result(self.to_number(minor))
+
+    @staticmethod
+    def _number(value):
+        """数値リテラルの文字列・変数の値を固定小数点数に変換（内部メソッド）"""
+        return _literal(value) if type(value) is str else _Exact.of(value)
+
+    def totals(self, amounts, tax=None):
+        """金額の合計と消費税を計算
+
+        Args:
+            amounts (iterable): 金額（最小単位の整数、Noneは無視）
+            tax (TaxRule, optional): 消費税の計算方法（省略時は self.tax、どちらもない場合は税額0）
+
+        Returns:
+            MoneyTotal: 小計・税額・税込み合計（表示・計算用の数値）
+
+        Raises:
+            ValueError: 税額の桁数が金額の桁数を超えている場合
+        """
+        rule = tax or self.tax
+        amounts = [amount for amount in amounts if amount is not None]
+        subtotal = sum(amounts)
+        if rule is None:
+            tax_minor = 0
+        else:
+            if rule.digits > self.digits:
+                raise ValueError("税額の桁数が金額の桁数を超えています")
+            if rule.per_line:
+                tax_minor = rule.tax_lines(amounts, self.scale)
+            else:
+                tax_minor = rule.tax(subtotal, self.scale)
+        return MoneyTotal(self.to_number(subtotal), self.to_number(tax_minor),
+                          self.to_number(subtotal + tax_minor))
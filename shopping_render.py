@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+買い物リスト出力モジュール
+Streaming renderers for shopping lists (text, CSV and Markdown).
+
+各形式のレンダラーはアイテムを1件ずつ受け取り、整形した行を1行ずつ返すジェネレータです。
+合計金額は出力しながら計算するため、アイテムを読み込んだリストとファイルから
+ストリーミングで読み出したアイテムのどちらでも、件数によらず一定のメモリで出力できます。
+write_lines() は行をまとめて大きな単位で書き込みます。
+
+使用例:
+    write_lines(render('markdown', shopping.iter_items(), shopping.iter_items(completed=True)))
+"""
+
+import csv
+import os
+import sys
+from decimal import Decimal
+
+from shopping_item import format_timestamp, line_total, to_number
+
+# write_lines() で1回に書き込む文字数の目安
+BUFFER_SIZE = 1 << 16
+
+# テキスト形式の見出し
+TITLE = "=== 買い物リスト ==="
+
+# 形式名と出力完了メッセージでの表示名
+FORMAT_LABELS = {
+    'text': "テキスト",
+    'csv': "CSV",
+    'markdown': "Markdown",
+}
+
+# 拡張子と形式名の対応（それ以外の拡張子はテキスト形式）
+_EXTENSIONS = {
+    '.csv': 'csv',
+    '.md': 'markdown',
+    '.markdown': 'markdown',
+}
+
+# CSV形式の列
+CSV_FIELDS = ('section', 'id', 'name', 'quantity', 'price', 'subtotal',
+              'added_date', 'completed_date')
+
+
+def _price_suffix(item):
+    """価格の表示（価格が設定されていない場合は空文字）"""
+    return f" - ¥{item.price}" if item.price else ""
+
+
+def iter_text(items, completed_items=(), created_at=None, show_total=True,
+              title=TITLE, indent=""):
+    """テキスト形式の行を1行ずつ返す
+
+    Args:
+        items (iterable): 未完了アイテム（ShoppingItem）
+        completed_items (iterable): 完了済みアイテム（ShoppingItem）
+        created_at (datetime, optional): 作成日時（省略時は出力しない）
+        show_total (bool): Trueの場合、最後に合計金額を出力する
+        title (str, optional): 見出し（Noneの場合は出力しない）
+        indent (str): アイテムの行の前に付ける文字列
+
+    Yields:
+        str: 改行を含まない行
+    """
+    if title is not None:
+        yield title
+    if created_at is not None:
+        yield f"作成日時: {created_at:%Y-%m-%d %H:%M:%S}"
+        yield ""
+
+    yield "【未完了アイテム】"
+    total = Decimal(0)
+    count = 0
+    for count, item in enumerate(items, 1):
+        yield f"{indent}{count}. {item.name} (数量: {item.quantity}){_price_suffix(item)}"
+        subtotal = line_total(item)
+        if subtotal is not None:
+            total += subtotal
+    if not count:
+        yield f"{indent}(なし)"
+
+    for i, item in enumerate(completed_items):
+        if i == 0:
+            yield ""
+            yield "【完了済みアイテム】"
+        yield f"{indent}✓ {item.name} (数量: {item.quantity}){_price_suffix(item)}"
+
+    total = to_number(total)
+    if show_total and total > 0:
+        yield ""
+        yield f"合計金額: ¥{total}"
+
+
+class _LineCollector:
+    """csv.writer の出力を1行ずつ受け取るオブジェクト"""
+
+    __slots__ = ('line',)
+
+    def write(self, line):
+        self.line = line
+
+
+def iter_csv(items, completed_items=(), created_at=None, show_total=True):
+    """CSV形式の行を1行ずつ返す
+
+    1行目は列名（CSV_FIELDS）です。'section' 列は 'items'（未完了）または
+    'completed_items'（完了済み）です。表形式を保つため、作成日時と合計金額は出力しません。
+
+    Args:
+        items (iterable): 未完了アイテム（ShoppingItem）
+        completed_items (iterable): 完了済みアイテム（ShoppingItem）
+        created_at (datetime, optional): 使用しません（他の形式との互換性のため）
+        show_total (bool): 使用しません（他の形式との互換性のため）
+
+    Yields:
+        str: 改行を含まない行
+    """
+    collector = _LineCollector()
+    writer = csv.writer(collector, lineterminator="")
+    writer.writerow(CSV_FIELDS)
+    yield collector.line
+    for section, section_items in (('items', items), ('completed_items', completed_items)):
+        for item in section_items:
+            subtotal = line_total(item)
+            writer.writerow((
+                section, item.id, item.name, item.quantity,
+                "" if item.price is None else item.price,
+                "" if subtotal is None else to_number(subtotal),
+                format_timestamp(item.added_at),
+                "" if item.completed_at is None else format_timestamp(item.completed_at),
+            ))
+            yield collector.line
+
+
+def _markdown_cell(value):
+    """Markdownの表のセルに入れられるように文字列を変換"""
+    return str(value).replace("\\", "\\\\").replace("|", "\\|").replace("\n", " ")
+
+
+def iter_markdown(items, completed_items=(), created_at=None, show_total=True):
+    """Markdown形式の行を1行ずつ返す
+
+    Args:
+        items (iterable): 未完了アイテム（ShoppingItem）
+        completed_items (iterable): 完了済みアイテム（ShoppingItem）
+        created_at (datetime, optional): 作成日時（省略時は出力しない）
+        show_total (bool): Trueの場合、最後に合計金額を出力する
+
+    Yields:
+        str: 改行を含まない行
+    """
+    yield "# 買い物リスト"
+    yield ""
+    if created_at is not None:
+        yield f"作成日時: {created_at:%Y-%m-%d %H:%M:%S}"
+        yield ""
+
+    yield "## 未完了アイテム"
+    yield ""
+    total = Decimal(0)
+    count = 0
+    for count, item in enumerate(items, 1):
+        if count == 1:
+            yield "| # | アイテム | 数量 | 価格 |"
+            yield "|--:|---|--:|--:|"
+        price = f"¥{item.price}" if item.price else ""
+        yield f"| {count} | {_markdown_cell(item.name)} | {item.quantity} | {price} |"
+        subtotal = line_total(item)
+        if subtotal is not None:
+            total += subtotal
+    if not count:
+        yield "(なし)"
+
+    for i, item in enumerate(completed_items):
+        if i == 0:
+            yield ""
+            yield "## 完了済みアイテム"
+            yield ""
+            yield "| アイテム | 数量 | 価格 |"
+            yield "|---|--:|--:|"
+        price = f"¥{item.price}" if item.price else ""
+        yield f"| ✓ {_markdown_cell(item.name)} | {item.quantity} | {price} |"
+
+    total = to_number(total)
+    if show_total and total > 0:
+        yield ""
+        yield f"**合計金額: ¥{total}**"
+
+
+# 形式名とレンダラーの対応
+RENDERERS = {
+    'text': iter_text,
+    'csv': iter_csv,
+    'markdown': iter_markdown,
+}
+
+
+def format_for(filename):
+    """ファイル名の拡張子から出力形式を判定
+
+    Args:
+        filename (str): 出力先ファイル名
+
+    Returns:
+        str: 'csv'・'markdown'・'text' のいずれか
+    """
+    return _EXTENSIONS.get(os.path.splitext(filename)[1].lower(), 'text')
+
+
+def render(format, items, completed_items=(), created_at=None, show_total=True):
+    """指定した形式の行を1行ずつ返すジェネレータを作成
+
+    Args:
+        format (str): 'text'・'csv'・'markdown' のいずれか
+        items (iterable): 未完了アイテム（ShoppingItem）
+        completed_items (iterable): 完了済みアイテム（ShoppingItem）
+        created_at (datetime, optional): 作成日時（省略時は出力しない）
+        show_total (bool): Trueの場合、合計金額を出力する
+
+    Returns:
+        iterator: 改行を含まない行
+
+    Raises:
+        ValueError: 未対応の形式の場合
+    """
+    try:
+        renderer = RENDERERS[format]
+    except KeyError:
+        raise ValueError(f"未対応の出力形式です: {format}")
+    return renderer(items, completed_items, created_at=created_at, show_total=show_total)
+
+
+def write_lines(lines, file=None, buffer_size=BUFFER_SIZE):
+    """行に改行を付けて、まとめて書き込む
+
+    1行ごとに write() を呼ばず、約 buffer_size 文字ごとにまとめて書き込みます。
+
+    Args:
+        lines (iterable): 改行を含まない行
+        file (file, optional): 書き込み先（省略時は標準出力）
+        buffer_size (int): 1回に書き込む文字数の目安
+
+    Returns:
+        int: 書き込んだ行数
+    """
+    if file is None:
+        file = sys.stdout
+    chunk = []
+    size = 0
+    count = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line) + 1
+        if size >= buffer_size:
+            chunk.append("")
+            file.write("\n".join(chunk))
+            count += len(chunk) - 1
+            chunk = []
+            size = 0
+    if chunk:
+        chunk.append("")
+        file.write("\n".join(chunk))
+        count += len(chunk) - 1
+    return count
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数リストの集計モジュール
+Parallel aggregation of totals and spend over many saved shopping list files.
+
+多数の保存済みリストファイルを複数のプロセスで分担して読み込み、合計金額・アイテム数・
+アイテム名ごとの金額・完了率を集計します。ファイルはまとまり（チャンク）ごとに
+ProcessPoolExecutor のワーカーで集計し、完了したものから部分的な集計結果として受け取って
+まとめます。
+
+ShoppingList は作成せずにファイルを直接読み込むため、自動読み込み・自動保存は行われません
+（読み込みのみで、集計対象のファイルを変更することはありません）。JSONのスナップショットは
+アイテムを ShoppingItem に変換せずに集計し、ジャーナルがある場合と列指向形式の場合は
+shopping_backend.read_file() で読み込んで集計します。
+
+使用例:
+    report = aggregate(glob.glob("lists/*.json"))
+    print(report.total, report.completion_ratio, report.top_spend(10))
+
+    python3 shopping_report.py lists/ --workers 8 --json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
+
+import shopping_backend
+from shopping_item import amount, to_number
+from shopping_journal import MutationJournal
+from shopping_list import ShoppingList, normalize_name
+
+# 1つのワーカーに一度に渡すファイル数の上限
+MAX_CHUNK_SIZE = 64
+
+
+class AggregateReport:
+    """複数のリストの集計結果
+
+    部分的な集計結果は merge() でまとめられます（ワーカーからはこのクラスで返します）。
+    金額はすべてDecimalで誤差なく集計します。
+
+    Attributes:
+        list_count (int): 集計したリストの数
+        item_count (int): 未完了アイテムの数
+        completed_count (int): 完了済みアイテムの数
+        unpriced_count (int): 価格が設定されていないアイテムの数（未完了・完了済み）
+        total (Decimal): 未完了アイテムの合計金額（calculate_total() の合計）
+        completed_total (Decimal): 完了済みアイテムの合計金額
+        spend_by_name (dict): 正規化したアイテム名 → 金額（未完了・完了済みの合計）
+        names (dict): 正規化したアイテム名 → 表示名（最初に集計した名前）
+        lists (dict): ファイル名 → リストごとの集計（'total'・'items'・'completed'）
+        errors (dict): ファイル名 → 読み込めなかった理由
+    """
+
+    def __init__(self):
+        """AggregateReportクラスの初期化（空の集計結果）"""
+        self.list_count = 0
+        self.item_count = 0
+        self.completed_count = 0
+        self.unpriced_count = 0
+        self.total = Decimal(0)
+        self.completed_total = Decimal(0)
+        self.spend_by_name = {}
+        self.names = {}
+        self.lists = {}
+        self.errors = {}
+
+    @property
+    def completion_ratio(self):
+        """すべてのリストを合わせた完了率（アイテムがない場合は0.0）"""
+        count = self.item_count + self.completed_count
+        return self.completed_count / count if count else 0.0
+
+    def add_list(self, filename, items, completed_items):
+        """1つのリストを集計に加える
+
+        途中で例外が発生した場合（金額にできない価格など）は、集計結果を変更しません。
+
+        Args:
+            filename (str): リストのファイル名
+            items (iterable): 未完了アイテムの (名前, 数量, 価格) の組
+            completed_items (iterable): 完了済みアイテムの (名前, 数量, 価格) の組
+        """
+        partial = AggregateReport()
+        spend_by_name, names = partial.spend_by_name, partial.names
+        totals = []
+        counts = []
+        for entries in (items, completed_items):
+            total = Decimal(0)
+            count = 0
+            for name, quantity, price in entries:
+                count += 1
+                subtotal = amount(price, quantity)
+                if subtotal is None:
+                    partial.unpriced_count += 1
+                    continue
+                total += subtotal
+                key = normalize_name(name)
+                if key in spend_by_name:
+                    spend_by_name[key] += subtotal
+                else:
+                    spend_by_name[key] = subtotal
+                    names[key] = name
+            totals.append(total)
+            counts.append(count)
+        partial.list_count = 1
+        partial.item_count, partial.completed_count = counts
+        partial.total, partial.completed_total = totals
+        partial.lists[filename] = {'total': totals[0], 'items': counts[0], 'completed': counts[1]}
+        self.merge(partial)
+
+    def merge(self, other):
+        """他の集計結果をまとめる
+
+        Args:
+            other (AggregateReport): まとめる集計結果
+
+        Returns:
+            AggregateReport: self
+        """
+        self.list_count += other.list_count
+        self.item_count += other.item_count
+        self.completed_count += other.completed_count
+        self.unpriced_count += other.unpriced_count
+        self.total += other.total
+        self.completed_total += other.completed_total
+        for key, spend in other.spend_by_name.items():
+            self.spend_by_name[key] = self.spend_by_name.get(key, 0) + spend
+        for key, name in other.names.items():
+            self.names.setdefault(key, name)
+        self.lists.update(other.lists)
+        self.errors.update(other.errors)
+        return self
+
+    def top_spend(self, count=10):
+        """金額の大きいアイテム名を取得
+
+        Args:
+            count (int): 取得する件数
+
+        Returns:
+            list: (表示名, 金額) のタプルのリスト（金額の大きい順）
+        """
+        top = sorted(self.spend_by_name.items(), key=lambda entry: entry[1], reverse=True)
+        return [(self.names[key], to_number(spend)) for key, spend in top[:count]]
+
+    def to_dict(self):
+        """集計結果をJSONに変換できる辞書で取得
+
+        Returns:
+            dict: 集計結果（金額は数値、リストごとの集計に完了率を含む）
+        """
+        lists = {}
+        for filename, summary in self.lists.items():
+            count = summary['items'] + summary['completed']
+            lists[filename] = {
+                'total': to_number(summary['total']),
+                'items': summary['items'],
+                'completed': summary['completed'],
+                'completion_ratio': summary['completed'] / count if count else 0.0,
+            }
+        return {
+            'list_count': self.list_count,
+            'item_count': self.item_count,
+            'completed_count': self.completed_count,
+            'unpriced_count': self.unpriced_count,
+            'total': to_number(self.total),
+            'completed_total': to_number(self.completed_total),
+            'completion_ratio': self.completion_ratio,
+            'spend_by_name': {self.names[key]: to_number(spend)
+                              for key, spend in self.spend_by_name.items()},
+            'lists': lists,
+            'errors': dict(self.errors),
+        }
+
+
+class _StateBackend(shopping_backend.StorageBackend):
+    """読み込み済みの状態を返す読み取り専用の保存先（ジャーナルの再生用、内部クラス）"""
+
+    def __init__(self, state):
+        self.state = state
+
+    def read(self):
+        return self.state
+
+    def write(self, records, state=None, force=False):
+        raise IOError("集計用のリストには保存できません")
+
+
+def _entries(items):
+    """ShoppingItem を (名前, 数量, 価格) の組に変換（内部関数）"""
+    return ((item.name, item.quantity, item.price) for item in items)
+
+
+def summarize_file(filename, report=None):
+    """1つのリストファイルを集計
+
+    読み込めないファイルは report.errors に記録します（例外は送出しません）。
+
+    Args:
+        filename (str): リストのファイル名（JSONまたは列指向形式）
+        report (AggregateReport, optional): 集計に加える集計結果（省略時は新しく作成）
+
+    Returns:
+        AggregateReport: 集計結果
+    """
+    if report is None:
+        report = AggregateReport()
+    journal = MutationJournal(filename + ".journal")
+    try:
+        if (not os.path.exists(journal.filename)
+                and not shopping_backend.is_columnar(filename)):
+            # ジャーナルのないJSONは ShoppingItem に変換せずに集計する
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            report.add_list(filename,
+                            ((item['name'], item.get('quantity', 1), item.get('price'))
+                             for item in data.get('items', [])),
+                            ((item['name'], item.get('quantity', 1), item.get('price'))
+                             for item in data.get('completed_items', [])))
+            return report
+        state, _ = shopping_backend.read_file(filename, journal=journal)
+        items, completed_items = state[0], state[1]
+        if state[4]:
+            # スナップショット以降の変更は ShoppingList で再生する（保存はしない）
+            shopping = ShoppingList(backend=_StateBackend(state))
+            items, completed_items = shopping.get_items(), shopping.get_completed_items()
+        report.add_list(filename, _entries(items), _entries(completed_items))
+    except Exception as e:
+        report.errors[filename] = str(e)
+    return report
+
+
+def _summarize_chunk(filenames):
+    """ファイルのまとまりを集計（ワーカーで実行する関数、内部関数）"""
+    report = AggregateReport()
+    for filename in filenames:
+        summarize_file(filename, report)
+    return report
+
+
+def iter_reports(filenames, workers=None, chunk_size=None):
+    """ファイルをまとまりごとに並列に集計し、部分的な集計結果を完了した順に返す
+
+    Args:
+        filenames (iterable): リストのファイル名
+        workers (int, optional): ワーカープロセスの数（省略時はCPUの数。1の場合は
+            プロセスを使わずにこのプロセスで集計する）
+        chunk_size (int, optional): 1つのワーカーに一度に渡すファイル数
+            （省略時はワーカーあたり4つ程度のまとまりになる数、最大 MAX_CHUNK_SIZE）
+
+    Yields:
+        AggregateReport: まとまりごとの集計結果
+    """
+    filenames = list(filenames)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = min(MAX_CHUNK_SIZE, math.ceil(len(filenames) / (workers * 4)) or 1)
+    chunks = [filenames[i:i + chunk_size] for i in range(0, len(filenames), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield _summarize_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        futures = [executor.submit(_summarize_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def aggregate(filenames, workers=None, chunk_size=None):
+    """複数のリストファイルを並列に集計
+
+    Args:
+        filenames (iterable): リストのファイル名
+        workers (int, optional): ワーカープロセスの数（iter_reports() を参照）
+        chunk_size (int, optional): 1つのワーカーに一度に渡すファイル数
+
+    Returns:
+        AggregateReport: すべてのファイルの集計結果
+    """
+    report = AggregateReport()
+    for partial in iter_reports(filenames, workers, chunk_size):
+        report.merge(partial)
+    return report
+
+
+def find_list_files(paths):
+    """パス（ファイルまたはディレクトリ）からリストファイルを列挙
+
+    ディレクトリの場合は直下の .json・.slc ファイルを名前順に列挙します。
+
+    Args:
+        paths (iterable): ファイルまたはディレクトリのパス
+
+    Returns:
+        list: リストのファイル名
+    """
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            filenames.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                             if name.endswith(('.json', '.slc')))
+        else:
+            filenames.append(path)
+    return filenames
+
+
+def main(argv=None):
+    """コマンドラインから集計を実行
+
+    Args:
+        argv (list, optional): コマンドライン引数（省略時は sys.argv[1:]）
+
+    Returns:
+        int: 終了ステータス（読み込めないファイルがあった場合は1）
+    """
+    parser = argparse.ArgumentParser(description="複数の買い物リストファイルを集計")
+    parser.add_argument("paths", nargs="+", help="リストファイルまたはディレクトリ")
+    parser.add_argument("--workers", type=int, help="ワーカープロセスの数（省略時はCPUの数）")
+    parser.add_argument("--top", type=int, default=10, help="表示する金額上位のアイテム数")
+    parser.add_argument("--json", action="store_true", help="集計結果をJSONで出力する")
+    args = parser.parse_args(argv)
+
+    report = aggregate(find_list_files(args.paths), args.workers)
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(f"リスト数: {report.list_count}")
+        print(f"未完了: {report.item_count} 件（合計 ¥{to_number(report.total)}）")
+        print(f"完了済み: {report.completed_count} 件（合計 ¥{to_number(report.completed_total)}）")
+        print(f"完了率: {report.completion_ratio:.1%}")
+        for name, spend in report.top_spend(args.top):
+            print(f"  {name}: ¥{spend}")
+        for filename, error in report.errors.items():
+            print(f"読み込みエラー: {filename}: {error}")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
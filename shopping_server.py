@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+買い物リストサーバーモジュール
+Local JSON line-protocol server for shopping lists and the calculator.
+
+1行に1つのJSONで要求を受け取り、1行に1つのJSONで応答を返します。
+1つのイベントループで多数のクライアントを同時に処理し、
+ファイルの読み書きは AsyncShoppingList がスレッドプールで行います。
+
+要求: {"id": 1, "method": "add_item", "params": {"list": "household", "item": "りんご",
+       "quantity": 3, "price": 298}}
+応答: {"id": 1, "result": "'りんご'をリストに追加しました"}
+      {"id": 1, "error": "無効なアイテム番号です"}
+
+params の "list" でリスト名を指定します（省略時は "default"）。電卓の計算履歴は接続ごとです。
+save・load・export の "filename" はサーバーのディレクトリの exports/ 内のファイル名で
+（リストの保存ファイルとは別のディレクトリ）、ディレクトリの区切りや先頭の "." は使えません。
+
+使用例:
+    python3 shopping_server.py --port 8765 --directory lists
+    python3 shopping_server.py --stdio --database shopping_lists.db
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import re
+import sys
+
+from shopping_archive import CompletedArchive
+from shopping_async import AsyncCalculator, AsyncShoppingList
+from shopping_list import ShoppingList
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# リスト名に使える文字（ファイル名として安全な文字のみ）
+_LIST_NAME = re.compile(r"[\w\-]+")
+
+# save・load・export のファイルを置くサブディレクトリ（リストの保存ファイルを上書き・
+# 読み出しできないよう、リストのファイルとは分ける）
+FILES_DIRECTORY = "exports"
+
+# save・load・export のファイル名（リスト名と同じ文字を "." でつないだもの）
+_FILE_NAME = re.compile(r"[\w\-]+(?:\.[\w\-]+)*")
+
+# パラメータの型（パラメータ名 → 型または型の組）
+_PARAM_TYPES = {
+    'item': str,
+    'quantity': int,
+    'price': (int, float, type(None)),
+    'index': int,
+    'id': int,
+    'revision': int,
+    'page': int,
+    'per_page': int,
+    'delta': dict,
+    'list': str,
+    'filename': str,
+    'format': (str, type(None)),
+    'expression': str,
+    'variables': (dict, type(None)),
+}
+
+# エラーメッセージに使う型の名前
+_TYPE_NAMES = {str: "文字列", int: "整数", float: "数値", dict: "オブジェクト", type(None): "null"}
+
+
+def _check_params(method, params):
+    """パラメータの型を検証（内部関数）
+
+    JSONの true・false は整数として扱いません。
+
+    Raises:
+        ValueError: パラメータの型が正しくない場合
+    """
+    for name, value in params.items():
+        expected = _PARAM_TYPES.get(name)
+        if expected is None:
+            continue
+        if not isinstance(expected, tuple):
+            expected = (expected,)
+        if isinstance(value, bool) or not isinstance(value, expected):
+            names = "・".join(_TYPE_NAMES[t] for t in expected)
+            raise ValueError(f"{method} のパラメータ {name} は{names}で指定してください")
+
+
+class ShoppingServer:
+    """JSON行プロトコルで買い物リストと電卓の操作を提供するサーバー
+
+    リストは最初に使用された時点で open_list(リスト名) で開き、
+    サーバーを閉じるまで AsyncShoppingList として保持します。
+    save・load・export のファイルは directory の exports/ 内に限ります。
+    """
+
+    def __init__(self, open_list=None, executor=None, directory="."):
+        """ShoppingServerクラスの初期化
+
+        Args:
+            open_list (callable, optional): リスト名から ShoppingList を開く関数
+                （省略時は directory の '<リスト名>.json'）
+            executor (concurrent.futures.Executor, optional): ファイル操作を実行する executor
+            directory (str): リストのディレクトリ（save・load・export のファイルは
+                その exports/ サブディレクトリに置く）
+        """
+        self.directory = directory
+        self.files_directory = os.path.join(directory, FILES_DIRECTORY)
+        self._open_list = open_list or (
+            lambda name: ShoppingList(os.path.join(directory, f"{name}.json")))
+        self.executor = executor
+        self._lists = {}  # リスト名 → AsyncShoppingList
+
+    def get_list(self, name="default"):
+        """リストを取得（初回は開く）
+
+        Args:
+            name (str): リスト名
+
+        Returns:
+            AsyncShoppingList: リスト
+
+        Raises:
+            ValueError: リスト名に使えない文字が含まれている場合
+        """
+        shopping = self._lists.get(name)
+        if shopping is None:
+            if not isinstance(name, str) or not _LIST_NAME.fullmatch(name):
+                raise ValueError(f"無効なリスト名です: {name}")
+            shopping = self._lists[name] = AsyncShoppingList(self._open_list(name),
+                                                             self.executor)
+        return shopping
+
+    def file_path(self, filename):
+        """save・load・export のファイル名を files_directory 内のパスに変換（初回は作成）
+
+        Args:
+            filename (str): ファイル名（ディレクトリを含まない）
+
+        Returns:
+            str: ファイルのパス
+
+        Raises:
+            ValueError: ファイル名に使えない文字が含まれている場合
+        """
+        if not isinstance(filename, str) or not _FILE_NAME.fullmatch(filename):
+            raise ValueError(f"無効なファイル名です: {filename}")
+        os.makedirs(self.files_directory, exist_ok=True)
+        return os.path.join(self.files_directory, filename)
+
+    async def handle(self, request, calculator):
+        """1件の要求を処理
+
+        Args:
+            request (dict): 要求（'id'・'method'・'params'）
+            calculator (AsyncCalculator): 接続ごとの電卓
+
+        Returns:
+            dict: 応答（'id' と 'result' または 'error'）
+        """
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("要求はJSONオブジェクトで指定してください")
+            method = request.get('method')
+            handler = getattr(self, f"_rpc_{method}", None) if isinstance(method, str) else None
+            if handler is None:
+                raise ValueError(f"未対応のメソッドです: {method}")
+            params = request.get('params') or {}
+            if not isinstance(params, dict):
+                raise ValueError("params はJSONオブジェクトで指定してください")
+            try:
+                inspect.signature(handler).bind(calculator, **params)
+            except TypeError as e:
+                raise ValueError(f"{method} のパラメータが正しくありません: {e}")
+            _check_params(method, params)
+            result = await handler(calculator, **params)
+        except Exception as e:
+            return {'id': request_id, 'error': str(e)}
+        return {'id': request_id, 'result': result}
+
+    async def handle_connection(self, reader, writer):
+        """1つの接続の要求を順に処理して応答を返す
+
+        Args:
+            reader (asyncio.StreamReader): 要求を読み込むストリーム
+            writer (asyncio.StreamWriter): 応答を書き込むストリーム
+        """
+        calculator = AsyncCalculator()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {'id': None, 'error': f"JSONの形式が正しくありません: {e}"}
+                else:
+                    response = await self.handle(request, calculator)
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        """開いているすべてのリストの変更を保存して閉じる"""
+        lists, self._lists = list(self._lists.values()), {}
+        for shopping in lists:
+            await shopping.close()
+
+    # ここから下の _rpc_<method> がプロトコルのメソッド（第1引数は接続ごとの電卓）
+
+    async def _rpc_ping(self, calculator):
+        return "pong"
+
+    async def _rpc_add_item(self, calculator, item, quantity=1, price=None, list="default"):
+        return await self.get_list(list).add_item(item, quantity, price)
+
+    async def _rpc_remove_item(self, calculator, index, list="default"):
+        return await self.get_list(list).remove_item(index)
+
+    async def _rpc_complete_item(self, calculator, index, list="default"):
+        return await self.get_list(list).complete_item(index)
+
+    async def _rpc_remove_by_id(self, calculator, id, list="default"):
+        return await self.get_list(list).remove_by_id(id)
+
+    async def _rpc_complete_by_id(self, calculator, id, list="default"):
+        return await self.get_list(list).complete_by_id(id)
+
+    async def _rpc_get_items(self, calculator, list="default"):
+        shopping = self.get_list(list)
+        return {'items': [item.to_dict() for item in await shopping.get_items()],
+                'completed_items': [item.to_dict()
+                                    for item in await shopping.get_completed_items()]}
+
+    async def _rpc_completed_page(self, calculator, page=1, per_page=50, list="default"):
+        result = await self.get_list(list).completed_page(page, per_page)
+        return {**result._asdict(), 'items': [item.to_dict() for item in result.items]}
+
+    async def _rpc_changes(self, calculator, revision=0, list="default"):
+        return await self.get_list(list).changes_since(revision)
+
+    async def _rpc_apply_changes(self, calculator, delta, list="default"):
+        result = await self.get_list(list).apply_changes(delta)
+        # JSONのキーは文字列になるため、IDの対応は組のリストで返す
+        return {**result, 'ids': [[old, new] for old, new in result['ids'].items()]}
+
+    async def _rpc_calculate_total(self, calculator, list="default"):
+        return await self.get_list(list).calculate_total()
+
+    async def _rpc_save(self, calculator, filename, format=None, list="default"):
+        return await self.get_list(list).save_to_file(self.file_path(filename), format)
+
+    async def _rpc_load(self, calculator, filename, format=None, list="default"):
+        return await self.get_list(list).load_from_file(self.file_path(filename), format)
+
+    async def _rpc_export(self, calculator, filename, format=None, list="default"):
+        return await self.get_list(list).export(self.file_path(filename), format)
+
+    async def _rpc_calculate(self, calculator, expression, variables=None):
+        return await calculator.calculate(expression, variables)
+
+    async def _rpc_history(self, calculator):
+        return await calculator.get_history()
+
+
+class _StdinReader:
+    """標準入力から1行ずつ読み込むストリーム（内部クラス）
+
+    標準入力はパイプとは限らない（ファイルのリダイレクトなど）ため、
+    読み込みは executor で行います。
+    """
+
+    async def readline(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, sys.stdin.buffer.readline)
+
+
+class _StdoutWriter:
+    """標準出力に書き込むストリーム（内部クラス）"""
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT, stdio=False):
+    """サーバーを実行（終了時にリストを閉じる）
+
+    Args:
+        server (ShoppingServer): 要求を処理するサーバー
+        host (str): 待ち受けるアドレス
+        port (int): 待ち受けるポート（0の場合は空いているポート）
+        stdio (bool): Trueの場合はTCPの代わりに標準入出力で1つの接続として処理する
+    """
+    try:
+        if stdio:
+            await server.handle_connection(_StdinReader(), _StdoutWriter())
+            return
+        tcp_server = await asyncio.start_server(server.handle_connection, host, port)
+        address = tcp_server.sockets[0].getsockname()
+        print(f"{address[0]}:{address[1]} で待ち受けています", file=sys.stderr, flush=True)
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """コマンドラインからサーバーを起動
+
+    Args:
+        argv (list, optional): コマンドライン引数（省略時は sys.argv[1:]）
+    """
+    parser = argparse.ArgumentParser(description="買い物リスト & 電卓のJSON行プロトコルサーバー")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="待ち受けるアドレス")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="待ち受けるポート")
+    parser.add_argument("--stdio", action="store_true", help="標準入出力で要求を処理する")
+    parser.add_argument("--directory", default=".",
+                        help="リストのJSONファイルを置くディレクトリ"
+                             "（save・load・export のファイルはその exports/ に置く）")
+    parser.add_argument("--database", help="リストを保存するSQLiteデータベース（ShoppingListStore）")
+    parser.add_argument("--journal", action="store_true",
+                        help="JSONファイルのリストをジャーナル保存モードで開く")
+    parser.add_argument("--write-behind", action="store_true",
+                        help="JSONファイルのリストを書き込み遅延モードで開く")
+    parser.add_argument("--archive", action="store_true",
+                        help="JSONファイルのリストの古い完了済みアイテムを"
+                             "'<リスト名>.archive' に移す")
+    args = parser.parse_args(argv)
+
+    store = None
+    if args.database:
+        from shopping_store import ShoppingListStore
+        store = ShoppingListStore(args.database)
+        open_list = store.open
+    else:
+        def open_list(name):
+            path = os.path.join(args.directory, name)
+            archive = CompletedArchive(f"{path}.archive") if args.archive else None
+            return ShoppingList(f"{path}.json", journal=args.journal,
+                                write_behind=args.write_behind, archive=archive)
+    try:
+        server = ShoppingServer(open_list, directory=args.directory)
+        asyncio.run(serve(server, args.host, args.port, args.stdio))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
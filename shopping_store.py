@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数リストのストアモジュール
+Store for many named shopping lists backed by a single SQLite database.
+
+リストごとにJSONファイルを作る代わりに、名前付きの多数のリストを1つのSQLiteデータベースに
+格納します。よく使うリストは最大 cache_size 件までメモリ上にキャッシュし（LRU）、
+変更はキャッシュから追い出す時点、またはリストを閉じる・flush() を呼ぶ時点で
+まとめてデータベースに書き戻します（ライトバック）。
+
+使用例:
+    with ShoppingListStore("shopping_lists.db") as store:
+        shopping = store.open("household-42")
+        shopping.add_item('りんご', 3, 298)
+        shopping.close()
+"""
+
+import atexit
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
+
+import shopping_backend
+from shopping_list import ShoppingList
+
+# メモリ上に保持するリストの数の既定値
+DEFAULT_CACHE_SIZE = 128
+
+# キャッシュの統計情報
+StoreCacheInfo = namedtuple('StoreCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# 開いているストア（終了時に未保存の変更を書き戻す）
+_open_stores = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_stores():
+    """終了時に開いているストアを閉じる"""
+    for store in list(_open_stores):
+        store.close()
+
+
+class _StoreBackend(shopping_backend.StorageBackend):
+    """ShoppingListStore を保存先とする StoredShoppingList の保存先（内部クラス）
+
+    変更内容はデータベースに書き込まず、ストアの書き戻し待ちに加えます。
+    """
+
+    def __init__(self, store, name, shopping):
+        self.location = f"{store.database}#{name}"
+        self._store = store
+        self._name = name
+        # リストとの循環参照でストアの WeakValueDictionary から消えなくならないよう弱参照とする
+        self._shopping = weakref.ref(shopping)
+
+    def read(self):
+        return self._store._read(self._name) + ([],)
+
+    def write(self, records, state=None, force=False):
+        if state is not None:
+            records = [shopping_backend.replace_record(state)]
+        if records:
+            self._store._mark_dirty(self._shopping(), records)
+        return True
+
+    def flush(self):
+        self._store._write_back(self._name)
+
+    def close(self):
+        self._store._release(self._name)
+
+
+class StoredShoppingList(ShoppingList):
+    """ShoppingListStore に格納される買い物リスト
+
+    ShoppingList と同じ操作ができます。自動保存ではファイルに書き込まず、
+    変更内容をストアに渡します。flush()・close() でストアのデータベースに書き戻します。
+    ShoppingListStore.open() で作成してください。
+
+    Attributes:
+        name (str): リスト名
+    """
+
+    def __init__(self, store, name):
+        """StoredShoppingListクラスの初期化
+
+        Args:
+            store (ShoppingListStore): 格納先のストア
+            name (str): リスト名
+        """
+        super().__init__(backend=_StoreBackend(store, name, self))
+        self.name = name
+
+    def compact(self):
+        """変更を直ちにストアのデータベースに書き戻す
+
+        Returns:
+            str: 保存完了メッセージ
+        """
+        self.flush()
+        return f"リスト '{self.name}' を保存しました"
+
+
+class ShoppingListStore:
+    """多数の名前付き買い物リストを1つのSQLiteデータベースで管理するクラス
+
+    リストの変更はメモリ上で行い、キャッシュから追い出す時点で
+    変更内容（追加・削除・完了）を1行単位の INSERT・DELETE・UPDATE として書き戻します。
+    スレッドセーフで、複数のスレッドから同時に使用できます。
+
+    Attributes:
+        database (str): データベースファイル名（':memory:' も可）
+        cache_size (int): メモリ上に保持するリストの最大数
+    """
+
+    def __init__(self, database="shopping_lists.db", cache_size=DEFAULT_CACHE_SIZE):
+        """ShoppingListStoreクラスの初期化
+
+        Args:
+            database (str): データベースファイル名
+            cache_size (int): メモリ上に保持するリストの最大数
+        """
+        self.database = database
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(shopping_backend.SCHEMA)
+        self._cache = OrderedDict()  # リスト名 → リスト（最近使った順）
+        self._instances = weakref.WeakValueDictionary()  # 使用中のすべてのリスト
+        self._dirty = {}  # リスト名 → 変更内容の列
+        self._hits = 0
+        self._misses = 0
+        _open_stores.add(self)
+
+    def open(self, name):
+        """リストを開く
+
+        同じ名前のリストが既に開かれている場合は同じインスタンスを返します。
+        存在しない名前の場合は空のリストを作成します（最初の変更時に保存されます）。
+
+        Args:
+            name (str): リスト名
+
+        Returns:
+            StoredShoppingList: リスト
+        """
+        with self._lock:
+            shopping = self._cache.get(name)
+            if shopping is not None:
+                self._hits += 1
+                self._cache.move_to_end(name)
+                return shopping
+            self._misses += 1
+            shopping = self._instances.get(name)
+            if shopping is None:
+                # 破棄されたインスタンスの未保存の変更を書き戻してから読み込む
+                self._write_back(name)
+                shopping = self._instances[name] = StoredShoppingList(self, name)
+            self._touch(shopping)
+            return shopping
+
+    def names(self):
+        """保存されているリスト名の一覧を取得
+
+        Returns:
+            list: リスト名（名前順）
+        """
+        with self._lock:
+            self.flush()
+            return [name for name, in
+                    self._connection.execute("SELECT name FROM lists ORDER BY name")]
+
+    def __contains__(self, name):
+        with self._lock:
+            if name in self._dirty:
+                return True
+            return self._connection.execute(
+                "SELECT 1 FROM lists WHERE name = ?", (name,)).fetchone() is not None
+
+    def delete(self, name):
+        """リストを削除
+
+        Args:
+            name (str): リスト名
+        """
+        with self._lock:
+            self._cache.pop(name, None)
+            self._instances.pop(name, None)
+            self._dirty.pop(name, None)
+            with self._connection:
+                row = self._connection.execute(
+                    "SELECT id FROM lists WHERE name = ?", (name,)).fetchone()
+                if row is not None:
+                    self._connection.execute("DELETE FROM items WHERE list_id = ?", row)
+                    self._connection.execute("DELETE FROM lists WHERE id = ?", row)
+
+    def flush(self):
+        """すべてのリストの未保存の変更をデータベースに書き戻す"""
+        with self._lock:
+            for name in list(self._dirty):
+                self._write_back(name)
+
+    def close(self):
+        """未保存の変更を書き戻し、データベースを閉じる"""
+        with self._lock:
+            if self._connection is None:
+                return
+            self.flush()
+            self._cache.clear()
+            self._connection.close()
+            self._connection = None
+            _open_stores.discard(self)
+
+    def cache_info(self):
+        """キャッシュの統計情報を取得
+
+        Returns:
+            StoreCacheInfo: (hits, misses, maxsize, currsize)
+        """
+        with self._lock:
+            return StoreCacheInfo(self._hits, self._misses, self.cache_size, len(self._cache))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _touch(self, shopping):
+        """リストをキャッシュの末尾に置き、あふれたリストを書き戻して追い出す（内部メソッド）
+
+        Args:
+            shopping (StoredShoppingList): 使用したリスト
+        """
+        self._cache[shopping.name] = shopping
+        self._cache.move_to_end(shopping.name)
+        while len(self._cache) > self.cache_size:
+            name, _ = self._cache.popitem(last=False)
+            self._write_back(name)
+
+    def _release(self, name):
+        """リストの変更を書き戻し、キャッシュから外す（内部メソッド）
+
+        Args:
+            name (str): リスト名
+        """
+        with self._lock:
+            self._write_back(name)
+            self._cache.pop(name, None)
+
+    def _mark_dirty(self, shopping, records):
+        """リストの変更内容を書き戻し待ちに加える（内部メソッド）
+
+        Args:
+            shopping (StoredShoppingList): 変更されたリスト
+            records (list): 変更内容の列
+        """
+        with self._lock:
+            self._dirty.setdefault(shopping.name, []).extend(records)
+            self._touch(shopping)
+
+    def _read(self, name):
+        """リストをデータベースから読み込む（内部メソッド）
+
+        Args:
+            name (str): リスト名
+
+        Returns:
+            tuple: (未完了アイテムのリスト, 完了済みアイテムのリスト, next_id, seq)
+        """
+        with self._lock:
+            return shopping_backend.read_list(self._connection, name)
+
+    def _write_back(self, name):
+        """リストの未保存の変更をデータベースに書き戻す（内部メソッド）
+
+        連続する同じ種類の変更は executemany() でまとめて実行し、
+        1つのトランザクションで確定します。
+
+        Args:
+            name (str): リスト名
+        """
+        with self._lock:
+            records = self._dirty.pop(name, None)
+            if records is None:
+                return
+            with self._connection:
+                list_id, _, _ = shopping_backend.ensure_list(self._connection, name)
+                shopping_backend.write_records(self._connection, list_id, records)
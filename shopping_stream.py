@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ストリーミング読み込みモジュール
+Streaming reader for shopping list snapshot files.
+
+JSONファイル全体を json.load() で読み込まず、一定サイズずつ読みながら
+'items'・'completed_items' 配列の要素を1件ずつ取り出します。
+大きなリストでもメモリ使用量はほぼ一定です。
+"""
+
+import json
+import re
+
+import shopping_columnar
+from shopping_item import ShoppingItem
+
+# 1回に読み込む文字数
+CHUNK_SIZE = 1 << 20
+
+# 1件ずつ取り出す配列のキー
+SECTIONS = ('items', 'completed_items')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _StreamReader:
+    """ファイルをチャンク単位で読みながらJSONの値を取り出すクラス"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """次のチャンクを読み込む（ファイル終端ではFalse）"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """空白を読み飛ばし、次の1文字を返す（ファイル終端では空文字）"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        """次の文字が char であることを確認して読み進める"""
+        if self.peek() != char:
+            raise ValueError(f"JSONの形式が正しくありません（'{char}' が必要です）")
+        self.pos += 1
+
+    def decode(self):
+        """次のJSONの値を1つ取り出す"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # バッファ末尾で終わる数値は次のチャンクに続いている可能性がある
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_sections(filename, sections=SECTIONS):
+    """JSONスナップショットの配列要素を1件ずつ返す
+
+    Args:
+        filename (str): JSONファイル名
+        sections (tuple): 要素を返す配列のキー
+
+    Yields:
+        tuple: (キー, 要素の辞書)
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.decode()
+            reader.expect(':')
+            if key in SECTIONS and reader.peek() == '[':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        element = reader.decode()
+                        if key in sections:
+                            yield key, element
+                        separator = reader.peek()
+                        reader.pos += 1
+                        if separator == ']':
+                            break
+                        if separator != ',':
+                            raise ValueError("JSONの形式が正しくありません")
+            else:
+                reader.decode()
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError("JSONの形式が正しくありません")
+
+
+def iter_items(filename, completed=False):
+    """スナップショットファイルのアイテムを1件ずつ返す
+
+    JSON形式と列指向形式（.slc）の両方に対応します。
+
+    Args:
+        filename (str): スナップショットファイル名
+        completed (bool): Trueの場合は完了済みアイテム
+
+    Yields:
+        ShoppingItem: アイテム
+    """
+    if shopping_columnar.is_columnar_file(filename):
+        with shopping_columnar.ColumnarSnapshot(filename) as snapshot:
+            yield from snapshot.iter_items(completed)
+        return
+    section = 'completed_items' if completed else 'items'
+    for _, data in iter_json_sections(filename, (section,)):
+        yield ShoppingItem.from_dict(data)
+
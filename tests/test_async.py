@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+非同期APIのテスト
+Tests for AsyncShoppingList.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_archive import CompletedArchive  # noqa: E402
+from shopping_async import AsyncShoppingList  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+
+class _RecordingArchive(CompletedArchive):
+    """ファイルを読み書きしたスレッドを記録するアーカイブ"""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.threads = set()
+
+    def append(self, items):
+        self.threads.add(threading.current_thread())
+        super().append(items)
+
+    def count(self, month=None):
+        self.threads.add(threading.current_thread())
+        return super().count(month)
+
+
+class ArchiveOffLoopTest(unittest.TestCase):
+    """アーカイブのファイル操作をイベントループのスレッドで実行しない"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive = _RecordingArchive(os.path.join(directory.name, "list.archive"))
+        self.shopping = ShoppingList(os.path.join(directory.name, "list.json"),
+                                     write_behind=True, archive=self.archive,
+                                     recent_completed=1)
+
+    def test_write_behind_mutations_and_pages(self):
+        async def run():
+            shopping = AsyncShoppingList(self.shopping)
+            for i in range(5):
+                await shopping.add_item(f"アイテム{i}")
+            for _ in range(5):
+                await shopping.complete_item(0)
+            page = await shopping.completed_page(1, per_page=10)
+            await shopping.close()
+            return threading.current_thread(), page
+
+        loop_thread, page = asyncio.run(run())
+        self.assertEqual(page.total, 5)
+        self.assertTrue(self.archive.threads)
+        self.assertNotIn(loop_thread, self.archive.threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数式コンパイルモジュールのテスト
+Tests for the safe expression compiler.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import expression  # noqa: E402
+from calculator import Calculator  # noqa: E402
+from shopping_money import MoneyMode  # noqa: E402
+
+
+class PowerLimitTest(unittest.TestCase):
+    """べき乗の指数と結果の大きさの制限"""
+
+    def test_nested_powers_are_rejected(self):
+        for source in ("((9**999)**999)**999", "(9**999)**999", "(2**1000)**1000"):
+            with self.subTest(source=source), self.assertRaises(ValueError):
+                expression.evaluate(source)
+
+    def test_nested_powers_are_not_folded(self):
+        compiled = expression.compile_expression("(9**999)**999")
+        with self.assertRaises(ValueError):
+            compiled.function()
+
+    def test_nested_powers_with_variables(self):
+        with self.assertRaises(ValueError):
+            expression.evaluate("(x ** 999) ** 999", {'x': 9})
+
+    def test_large_exponent_is_rejected(self):
+        with self.assertRaises(ValueError):
+            expression.evaluate("2 ** 100000")
+
+    def test_allowed_powers(self):
+        self.assertEqual(expression.evaluate("2 ** 10"), 1024)
+        self.assertEqual(expression.evaluate("9 ** 999"), 9 ** 999)
+        self.assertEqual(expression.evaluate("1 ** 100000"), 1)
+        self.assertEqual(expression.evaluate("2 ** -2"), 0.25)
+
+    def test_calculator(self):
+        with self.assertRaises(ValueError):
+            Calculator().calculate_expression("((9**999)**999)**999")
+
+    def test_money_mode(self):
+        calculator = Calculator(money=MoneyMode())
+        with self.assertRaises(ValueError):
+            calculator.calculate_expression("(9**999)**999")
+        self.assertEqual(calculator.calculate_expression("1.08 ** 2"), 1.17)
+
+    def test_result_fits_int_string_limit(self):
+        bits = expression.max_result_bits()
+        if hasattr(sys, 'get_int_max_str_digits') and sys.get_int_max_str_digits():
+            self.assertLessEqual(len(str(2 ** bits)), sys.get_int_max_str_digits())
+        for source in ("(2**1000)**15", "2**1000 * 2**1000 * 2**1000 * 2**1000 * 2**1000 * "
+                       "2**1000 * 2**1000 * 2**1000 * 2**1000 * 2**1000 * 2**1000 * 2**1000 * "
+                       "2**1000 * 2**1000 * 2**1000"):
+            with self.subTest(source=source), self.assertRaises(ValueError):
+                expression.evaluate(source)
+
+    def test_history_after_large_power(self):
+        calculator = Calculator()
+        with self.assertRaises(ValueError):
+            calculator.calculate_expression("(2**1000)**15")
+        result = calculator.calculate_expression("(2**1000)**4")
+        self.assertEqual(result, 2 ** 4000)
+        self.assertEqual(calculator.get_history(), [f"(2**1000)**4 = {2 ** 4000}"])
+
+
+class RealResultTest(unittest.TestCase):
+    """複素数・無限大・NaN になる式"""
+
+    SOURCES = ("(-8) ** 0.5", "1e308 * 10", "-1e308 * 10", "1e308 * 10 - 1e308 * 10")
+
+    def test_evaluate(self):
+        for source in self.SOURCES:
+            with self.subTest(source=source), self.assertRaisesRegex(ValueError, "無効な式です"):
+                expression.evaluate(source)
+
+    def test_not_folded(self):
+        compiled = expression.compile_expression("(-8) ** 0.5")
+        self.assertIn('_pow', compiled.code.co_names)  # 定数に置き換えず実行時に計算する
+
+    def test_variables_and_batch(self):
+        with self.assertRaises(ValueError):
+            expression.evaluate("x ** 0.5", {'x': -8})
+        with self.assertRaises(ValueError):
+            expression.evaluate_batch(["x * 2", "x * 1e308"], {'x': 10})
+        with self.assertRaises(ValueError):
+            expression.evaluate_many("x ** 0.5", {'x': [4, -8]}, use_numpy=False)
+
+    def test_calculator_history(self):
+        calculator = Calculator()
+        for source in self.SOURCES:
+            with self.assertRaises(ValueError):
+                calculator.calculate_expression(source)
+        self.assertEqual(calculator.get_history(), [])
+        self.assertEqual(calculator.calculate_expression("4 ** 0.5"), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ファイル保存ユーティリティモジュールのテスト
+Tests for atomic writes and advisory file locks.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import file_store  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+WORKERS = 4
+INCREMENTS = 200
+
+
+def increment(filename):
+    """ロックの下でファイルの数値を INCREMENTS 回増やす（別プロセスで実行）"""
+    for _ in range(INCREMENTS):
+        with file_store.file_lock(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                value = int(f.read())
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(str(value + 1))
+
+
+@unittest.skipIf(file_store.fcntl is None, "ロックファイルの削除は fcntl が必要")
+class FileLockTest(unittest.TestCase):
+    """file_lock() のロックファイルの扱い"""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self.filename = os.path.join(self._directory.name, "counter.txt")
+
+    def lock_files(self):
+        return [name for name in os.listdir(self._directory.name) if name.endswith(".lock")]
+
+    def test_lock_file_is_removed(self):
+        with file_store.file_lock(self.filename):
+            self.assertEqual(self.lock_files(), ["counter.txt.lock"])
+        self.assertEqual(self.lock_files(), [])
+
+    def test_saves_leave_no_lock_files(self):
+        shopping = ShoppingList(os.path.join(self._directory.name, "list.json"), journal=True)
+        shopping.add_item("りんご", 3, 298)
+        shopping.complete_item(0)
+        shopping.compact()
+        shopping.close()
+        self.assertEqual(self.lock_files(), [])
+
+    def test_mutual_exclusion_across_processes(self):
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write("0")
+        processes = [multiprocessing.Process(target=increment, args=(self.filename,))
+                     for _ in range(WORKERS)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            self.assertEqual(int(f.read()), WORKERS * INCREMENTS)
+        self.assertEqual(self.lock_files(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+変更ジャーナルのテスト
+Tests for MutationJournal and the journaled storage mode.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_journal import MutationJournal  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+# クラッシュで書き込みが途中で止まったレコード
+TORN_LINE = '{"op": "add", "it'
+
+
+class TornTailTest(unittest.TestCase):
+    """書き込み途中でクラッシュして不完全な末尾行が残ったジャーナル"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "list.json")
+        self.journal = self.filename + ".journal"
+
+    def tear(self):
+        """ジャーナルの末尾に不完全な行を書き込む"""
+        with open(self.journal, 'a', encoding='utf-8') as f:
+            f.write(TORN_LINE)
+
+    def open_list(self):
+        shopping = ShoppingList(self.filename, journal=True)
+        self.addCleanup(shopping.close)
+        return shopping
+
+    def test_append_after_torn_tail(self):
+        journal = MutationJournal(self.journal)
+        journal.append({'op': 'remove', 'id': 1, 'seq': 1})
+        self.tear()
+        journal.append({'op': 'remove', 'id': 2, 'seq': 2})
+        journal.append_many([{'op': 'remove', 'id': 3, 'seq': 3},
+                             {'op': 'remove', 'id': 4, 'seq': 4}])
+        self.assertEqual([record['id'] for record in journal.replay()], [1, 2, 3, 4])
+        with open(self.journal, encoding='utf-8') as f:
+            self.assertNotIn(TORN_LINE, f.read())
+
+    def test_torn_first_line(self):
+        self.tear()
+        journal = MutationJournal(self.journal)
+        journal.append({'op': 'remove', 'id': 1, 'seq': 1})
+        self.assertEqual([record['id'] for record in journal.replay()], [1])
+
+    def test_list_keeps_records_after_torn_tail(self):
+        shopping = self.open_list()
+        shopping.add_items([f"アイテム{i}" for i in range(10)])
+        shopping.add_item("最後")  # スナップショットの後のジャーナル
+        shopping.close()
+        self.tear()
+        shopping = self.open_list()
+        shopping.add_item("after")
+        shopping.close()
+        names = [item.name for item in self.open_list().get_items()]
+        self.assertEqual(len(names), 12)
+        self.assertEqual(names[-2:], ["最後", "after"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+金額計算モジュールのテスト
+Tests for fixed-point money arithmetic and rounding.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_money import CEILING, FLOOR, HALF_EVEN, HALF_UP, MoneyMode, TaxRule, divide  # noqa: E402
+
+# ちょうど半分の値と、丸め方ごとの期待値
+HALVES = ("0.5", "1.5", "2.5", "-0.5", "-1.5", "-2.5")
+EXPECTED = {
+    HALF_UP: (1, 2, 3, -1, -2, -3),
+    HALF_EVEN: (0, 2, 2, 0, -2, -2),
+    FLOOR: (0, 1, 2, -1, -2, -3),
+    CEILING: (1, 2, 3, 0, -1, -2),
+}
+
+
+class RoundingTest(unittest.TestCase):
+    """0.5ちょうどの境界と負の金額の丸め"""
+
+    def test_divide(self):
+        for rounding, expected in EXPECTED.items():
+            for numerator, value in zip((1, 3, 5, -1, -3, -5), expected):
+                with self.subTest(rounding=rounding, numerator=numerator):
+                    self.assertEqual(divide(numerator, 2, rounding), value)
+                    self.assertEqual(divide(-numerator, -2, rounding), value)
+
+    def test_to_minor(self):
+        for rounding, expected in EXPECTED.items():
+            money = MoneyMode(digits=0, rounding=rounding)
+            for half, value in zip(HALVES, expected):
+                with self.subTest(rounding=rounding, value=half):
+                    self.assertEqual(money.to_minor(half), value)
+
+    def test_evaluate(self):
+        for rounding, expected in EXPECTED.items():
+            money = MoneyMode(digits=0, rounding=rounding)
+            for half, value in zip(HALVES, expected):
+                with self.subTest(rounding=rounding, value=half):
+                    self.assertEqual(money.evaluate(f"{half} * 3 / 3"), value)
+                    self.assertEqual(money.evaluate("x / 2", {'x': float(half) * 2}), value)
+
+    def test_minor_unit_boundary(self):
+        # 2.675 は浮動小数点数では 2.67499... だが、書かれたとおりの10進数として丸める
+        expected = {HALF_UP: (2.68, -2.68), HALF_EVEN: (2.68, -2.68),
+                    FLOOR: (2.67, -2.68), CEILING: (2.68, -2.67)}
+        for rounding, (positive, negative) in expected.items():
+            money = MoneyMode(digits=2, rounding=rounding)
+            with self.subTest(rounding=rounding):
+                self.assertEqual(money.multiply(2.675, 1), positive)
+                self.assertEqual(money.multiply(-2.675, 1), negative)
+                self.assertEqual(money.evaluate("2.675"), positive)
+                self.assertEqual(money.evaluate("-2.675"), negative)
+
+    def test_half_even_at_minor_unit(self):
+        money = MoneyMode(digits=2, rounding=HALF_EVEN)
+        self.assertEqual(money.multiply("0.125", 1), 0.12)
+        self.assertEqual(money.multiply("0.135", 1), 0.14)
+        self.assertEqual(money.multiply("-0.125", 1), -0.12)
+        self.assertEqual(money.format(money.to_minor("-0.135")), "-0.14")
+
+    def test_negative_amount(self):
+        for rounding, expected in EXPECTED.items():
+            money = MoneyMode(digits=0, rounding=rounding)
+            with self.subTest(rounding=rounding):
+                self.assertEqual(money.amount(-0.5, 3), expected[4])
+                self.assertEqual(money.amount(0.5, -3), expected[4])
+                self.assertEqual(money.amount(-0.5, 1), expected[3])
+
+
+class TaxRoundingTest(unittest.TestCase):
+    """税額の丸め（返品などの負の金額を含む）"""
+
+    def test_tax_at_half(self):
+        expected = {HALF_UP: (13, -13), HALF_EVEN: (12, -12), FLOOR: (12, -13), CEILING: (13, -12)}
+        for rounding, (positive, negative) in expected.items():
+            rule = TaxRule("0.10", rounding)
+            with self.subTest(rounding=rounding):
+                self.assertEqual(rule.tax(125, 1), positive)
+                self.assertEqual(rule.tax(-125, 1), negative)
+                self.assertEqual(rule.tax_lines([125, -125], 1), positive + negative)
+
+    def test_totals_with_refund(self):
+        money = MoneyMode(digits=0, tax=TaxRule("0.10", HALF_UP, per_line=True))
+        total = money.totals([money.amount(125, 1), money.amount(-125, 1), None])
+        self.assertEqual(total, (0, 0, 0))
+        money = MoneyMode(digits=0, tax=TaxRule("0.10", FLOOR, per_line=True))
+        total = money.totals([money.amount(125, 1), money.amount(-125, 1)])
+        self.assertEqual(total, (0, -1, -1))
+
+
+if __name__ == "__main__":
+    unittest.main()
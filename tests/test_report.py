@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数リストの集計のテスト
+Tests for AggregateReport and parallel aggregation.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_list import ShoppingList  # noqa: E402
+from shopping_report import AggregateReport, aggregate, summarize_file  # noqa: E402
+
+
+class MergeTest(unittest.TestCase):
+    """部分的な集計結果のまとめ"""
+
+    def test_merge_equals_single_report(self):
+        single = AggregateReport()
+        single.add_list("a.json", [("Apple", 2, 100), ("パン", 1, None)], [("卵", 1, 0.5)])
+        single.add_list("b.json", [("apple", 1, 150)], [])
+        first, second = AggregateReport(), AggregateReport()
+        first.add_list("a.json", [("Apple", 2, 100), ("パン", 1, None)], [("卵", 1, 0.5)])
+        second.add_list("b.json", [("apple", 1, 150)], [])
+        merged = AggregateReport().merge(first).merge(second)
+        self.assertEqual(merged.to_dict(), single.to_dict())
+        self.assertEqual(merged.list_count, 2)
+        self.assertEqual(merged.total, Decimal(350))
+        self.assertEqual(merged.completed_total, Decimal("0.5"))
+        self.assertEqual(merged.unpriced_count, 1)
+        self.assertEqual(merged.top_spend(1), [("Apple", 350)])  # 名前は正規化して集計する
+        self.assertAlmostEqual(merged.completion_ratio, 1 / 4)
+
+    def test_merge_keeps_errors(self):
+        first, second = AggregateReport(), AggregateReport()
+        first.errors["x.json"] = "壊れています"
+        second.add_list("a.json", [("パン", 1, 100)], [])
+        merged = first.merge(second)
+        self.assertEqual(merged.errors, {"x.json": "壊れています"})
+        self.assertEqual(merged.list_count, 1)
+
+    def test_bad_price_leaves_report_unchanged(self):
+        report = AggregateReport()
+        report.add_list("a.json", [("パン", 1, 100)], [])
+        before = report.to_dict()
+        with self.assertRaises(Exception):
+            report.add_list("b.json", [("卵", 1, 100), ("牛乳", 1, "abc")], [])
+        self.assertEqual(report.to_dict(), before)
+
+
+class AggregateFilesTest(unittest.TestCase):
+    """リストファイルの集計"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.filenames = []
+        for i in range(4):
+            shopping = ShoppingList(self.path(f"list{i}.json"), journal=i % 2 == 1)
+            shopping.add_items([("りんご", i + 1, 100), ("パン", 1, 200)])
+            shopping.complete_item(0)
+            shopping.close()
+            self.filenames.append(self.path(f"list{i}.json"))
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_parallel_matches_serial(self):
+        serial = aggregate(self.filenames, workers=1)
+        parallel = aggregate(self.filenames, workers=2, chunk_size=1)
+        self.assertEqual(parallel.to_dict(), serial.to_dict())
+        self.assertEqual(serial.list_count, 4)
+        self.assertEqual(serial.total, Decimal(800))
+        self.assertEqual(serial.completed_total, Decimal(1000))
+        self.assertEqual(serial.errors, {})
+
+    def test_unreadable_files_are_errors(self):
+        broken = self.path("broken.json")
+        with open(broken, 'w', encoding='utf-8') as f:
+            f.write('{"items": [')
+        bad_price = self.path("bad_price.json")
+        with open(bad_price, 'w', encoding='utf-8') as f:
+            json.dump({'items': [{'name': "パン", 'quantity': 1, 'price': "abc"}]}, f)
+        missing = self.path("missing.json")
+        report = aggregate(self.filenames + [broken, bad_price, missing], workers=2, chunk_size=2)
+        self.assertEqual(set(report.errors), {broken, bad_price, missing})
+        self.assertEqual(report.list_count, 4)
+        self.assertEqual(report.total, Decimal(800))
+
+    def test_summarize_file_does_not_modify_files(self):
+        journal = self.path("list1.json.journal")
+        with open(journal, 'rb') as f:
+            before = f.read()
+        report = summarize_file(self.path("list1.json"))
+        self.assertEqual(report.lists[self.path("list1.json")]['completed'], 1)
+        with open(journal, 'rb') as f:
+            self.assertEqual(f.read(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+買い物リストサーバーのテスト
+Tests for ShoppingServer request validation.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_async import AsyncCalculator  # noqa: E402
+from shopping_server import ShoppingServer  # noqa: E402
+
+
+class ShoppingServerTest(unittest.TestCase):
+    """要求のファイル名とパラメータの検証"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.server = ShoppingServer(directory=self.directory)
+        self.addCleanup(lambda: asyncio.run(self.server.close()))
+        self.call("add_item", item="りんご", quantity=3, price=298)
+
+    def call(self, method, **params):
+        """要求を1件処理して応答を返す"""
+        request = {'id': 1, 'method': method, 'params': params}
+        return asyncio.run(self.server.handle(request, AsyncCalculator()))
+
+    def test_save_and_load_in_directory(self):
+        self.assertIn('result', self.call("save", filename="backup.json"))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "exports", "backup.json")))
+        self.assertIn('result', self.call("load", filename="backup.json", list="copy"))
+        items = self.call("get_items", list="copy")['result']['items']
+        self.assertEqual([item['name'] for item in items], ["りんご"])
+
+    def test_rejects_paths(self):
+        outside = os.path.join(self.directory, os.pardir, "outside.json")
+        for filename in ("../outside.json", outside, ".hidden", "a/b.json", "", "a..json"):
+            for method in ("save", "load", "export"):
+                with self.subTest(method=method, filename=filename):
+                    response = self.call(method, filename=filename)
+                    self.assertEqual(response['error'], f"無効なファイル名です: {filename}")
+        self.assertFalse(os.path.exists(outside))
+
+    def test_cannot_touch_list_files(self):
+        self.call("add_item", item="パン", list="other")
+        asyncio.run(self.server.close())
+        list_file = os.path.join(self.directory, "other.json")
+        with open(list_file, 'rb') as f:
+            saved = f.read()
+        self.assertIn('result', self.call("save", filename="other.json"))
+        with open(list_file, 'rb') as f:
+            self.assertEqual(f.read(), saved)
+        # load で読み出すのは save したファイルで、リストの保存ファイルではない
+        self.call("load", filename="other.json", list="copy")
+        items = self.call("get_items", list="copy")['result']['items']
+        self.assertEqual([item['name'] for item in items], ["りんご"])
+        response = self.call("load", filename="other.json.journal", list="copy")
+        self.assertIn("見つかりません", response['error'])
+
+    def test_rejects_param_types(self):
+        response = self.call("complete_item", index="0")
+        self.assertEqual(response['error'],
+                         "complete_item のパラメータ index は整数で指定してください")
+        response = self.call("remove_item", index=True)
+        self.assertIn("整数", response['error'])
+        response = self.call("add_item", item="パン", price="100")
+        self.assertEqual(response['error'],
+                         "add_item のパラメータ price は整数・数値・nullで指定してください")
+        response = self.call("save", filename=["x.json"])
+        self.assertIn("文字列", response['error'])
+        self.assertEqual(len(self.call("get_items")['result']['items']), 1)
+
+    def test_valid_params(self):
+        self.assertIn('result', self.call("add_item", item="パン", price=None))
+        self.assertIn('result', self.call("add_item", item="卵", price=1.5))
+        self.assertIn('result', self.call("complete_item", index=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
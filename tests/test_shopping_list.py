@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+買い物リスト管理モジュールのテスト
+Tests for ShoppingList.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from collections.abc import Sequence
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_backend import SQLiteBackend  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+
+class ShoppingListTestCase(unittest.TestCase):
+    """一時ディレクトリのファイルに保存するリストを使うテストの基底クラス"""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self.directory = self._directory.name
+
+    def path(self, name):
+        """一時ディレクトリ内のファイル名"""
+        return os.path.join(self.directory, name)
+
+    def make_list(self, name="list.json", **kwargs):
+        """一時ディレクトリのファイルに保存するリストを作成"""
+        shopping = ShoppingList(self.path(name), **kwargs)
+        self.addCleanup(shopping.close)
+        return shopping
+
+
+class GetItemsTest(ShoppingListTestCase):
+    """get_items() のビュー"""
+
+    def setUp(self):
+        super().setUp()
+        self.shopping = self.make_list()
+        for name in ("りんご", "牛乳", "卵", "バナナ", "豆腐"):
+            self.shopping.add_item(name, 1, 100)
+
+    def names(self, items):
+        return [item.name for item in items]
+
+    def test_is_sequence(self):
+        self.assertIsInstance(self.shopping.get_items(), Sequence)
+
+    def test_indexing(self):
+        items = self.shopping.get_items()
+        self.assertEqual(items[0].name, "りんご")
+        self.assertEqual(items[3].name, "バナナ")
+        self.assertEqual(items[-1].name, "豆腐")
+        self.assertEqual(items[-5].name, "りんご")
+        self.assertEqual(self.names(items[1:3]), ["牛乳", "卵"])
+        self.assertEqual(items.index(items[2]), 2)
+        for index in (5, -6):
+            with self.subTest(index=index), self.assertRaises(IndexError):
+                items[index]
+
+    def test_view_is_live(self):
+        items = self.shopping.get_items()
+        self.shopping.add_item("納豆")
+        self.assertEqual(len(items), 6)
+        self.assertEqual(items[-1].name, "納豆")
+
+    def test_complete_while_iterating(self):
+        seen = []
+        for item in self.shopping.get_items():
+            seen.append(item.name)
+            self.shopping.complete_by_id(item.id)
+        self.assertEqual(seen, ["りんご", "牛乳", "卵", "バナナ", "豆腐"])
+        self.assertEqual(len(self.shopping.get_items()), 0)
+        self.assertEqual(len(self.shopping.get_completed_items()), 5)
+
+    def test_add_and_remove_while_iterating(self):
+        for item in self.shopping.get_items():
+            self.shopping.remove_by_id(item.id)
+            self.shopping.add_item(item.name + "2")
+        self.assertEqual(self.names(self.shopping.get_items()),
+                         ["りんご2", "牛乳2", "卵2", "バナナ2", "豆腐2"])
+
+    def test_reversed(self):
+        self.assertEqual(self.names(reversed(self.shopping.get_items())),
+                         ["豆腐", "バナナ", "卵", "牛乳", "りんご"])
+
+    def test_view_after_batch_rollback(self):
+        items = self.shopping.get_items()
+        with self.assertRaises(RuntimeError):
+            with self.shopping.batch():
+                self.shopping.complete_item(0)
+                raise RuntimeError
+        self.assertEqual(items[0].name, "りんご")
+        self.assertEqual(len(items), 5)
+
+
+class BatchTest(ShoppingListTestCase):
+    """batch() による変更のまとめとロールバック"""
+
+    def setUp(self):
+        super().setUp()
+        self.shopping = self.make_list(journal=True, check_consistency=True)
+        self.shopping.add_items([("りんご", 3, 298), ("パン", 1, None), ("卵", 2, 220)])
+        self.journal = self.path("list.json.journal")
+
+    def journal_lines(self):
+        with open(self.journal, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def state(self, shopping):
+        return ([(item.id, item.name) for item in shopping.get_items()],
+                [(item.id, item.name) for item in shopping.get_completed_items()],
+                shopping.calculate_total())
+
+    def test_rollback_restores_items_totals_and_indexes(self):
+        before = self.state(self.shopping)
+        lines = self.journal_lines()
+        with self.assertRaises(RuntimeError):
+            with self.shopping.batch():
+                self.shopping.add_item("牛乳", 1, 200)
+                self.shopping.add_item("バナナ", 1, None)
+                self.shopping.complete_item(0)
+                self.shopping.remove_by_id(3)
+                raise RuntimeError
+        self.assertEqual(self.state(self.shopping), before)  # 合計金額も検証される
+        self.assertEqual(self.shopping.find_by_name("卵")[0].id, 3)
+        self.assertEqual(self.shopping.find_by_name("牛乳"), [])
+        self.assertEqual(self.journal_lines(), lines)
+        # ロールバックした追加のIDは再び使われる
+        self.shopping.add_item("牛乳", 1, 200)
+        self.assertEqual(self.shopping.find_by_name("牛乳")[0].id, 4)
+        self.shopping.complete_by_id(1)
+        self.assertEqual(self.shopping.calculate_total(), 220 * 2 + 200)
+
+    def test_nested_rollback(self):
+        before = self.state(self.shopping)
+        with self.assertRaises(KeyError):
+            with self.shopping.batch():
+                self.shopping.add_item("牛乳", 1, 200)
+                with self.shopping.batch():
+                    self.shopping.remove_by_id(1)
+                self.shopping.complete_by_id(99)
+        self.assertEqual(self.state(self.shopping), before)
+
+    def test_batch_is_one_journal_line(self):
+        lines = self.journal_lines()
+        with self.shopping.batch():
+            self.shopping.add_item("牛乳", 1, 200)
+            self.shopping.complete_item(0)
+            self.shopping.remove_by_id(2)
+        added = self.journal_lines()[len(lines):]
+        self.assertEqual(len(added), 1)
+        self.assertEqual(added[0]['op'], 'batch')
+        self.assertEqual([record['op'] for record in added[0]['records']],
+                         ['add', 'complete', 'remove'])
+        expected = self.state(self.shopping)
+        self.shopping.close()
+        self.assertEqual(self.state(self.make_list(journal=True)), expected)
+
+    def test_bulk_operations_are_atomic(self):
+        before = self.state(self.shopping)
+        with self.assertRaises(IndexError):
+            self.shopping.remove_items([0, 5])
+        with self.assertRaises(IndexError):
+            self.shopping.complete_items([1, -1])
+        self.assertEqual(self.state(self.shopping), before)
+        self.shopping.complete_items([2, 0])
+        self.assertEqual([name for _, name in self.state(self.shopping)[1]], ["りんご", "卵"])
+
+
+class LoadFromFileTest(ShoppingListTestCase):
+    """load_from_file() で読み込んだ内容を、同じ保存先を使う他のインスタンスの更新より優先する"""
+
+    def setUp(self):
+        super().setUp()
+        source = self.make_list("source.json")
+        source.add_item("パン", 1, 180)
+        source.add_item("卵", 1, 220)
+        source.complete_item(0)
+        source.close()
+
+    def check_load(self, first, second, reopen):
+        first.add_item("牛乳", 1, 200)
+        second.add_item("バナナ", 2, 100)  # first が知らない更新
+        first.load_from_file(self.path("source.json"))
+        for shopping in (first, reopen()):
+            self.assertEqual([item.name for item in shopping.get_items()], ["卵"])
+            self.assertEqual([item.name for item in shopping.get_completed_items()], ["パン"])
+        # 置き換えを知らない second の次の変更は、読み込んだ内容に対して行われる
+        second.add_item("りんご", 1, 150)
+        self.assertEqual([item.name for item in reopen().get_items()], ["卵", "りんご"])
+
+    def test_json(self):
+        self.check_load(self.make_list(), self.make_list(), self.make_list)
+
+    def test_journal(self):
+        self.check_load(self.make_list(journal=True), self.make_list(journal=True),
+                        lambda: self.make_list(journal=True))
+
+    def test_sqlite(self):
+        def make():
+            return self.make_list(backend=SQLiteBackend(self.path("list.db")))
+        self.check_load(make(), make(), make)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数リストのストアのテスト
+Tests for ShoppingListStore.
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_store import ShoppingListStore  # noqa: E402
+
+
+class ShoppingListStoreTest(unittest.TestCase):
+    """LRUキャッシュからの追い出しと書き戻し"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.database = os.path.join(directory.name, "lists.db")
+        self.store = ShoppingListStore(self.database, cache_size=2)
+        self.addCleanup(self.store.close)
+
+    def saved_names(self, name):
+        """別のストアでデータベースから読み込んだリストのアイテム名"""
+        with ShoppingListStore(self.database) as other:
+            return [item.name for item in other.open(name).get_items()]
+
+    def test_eviction_writes_back_dirty_lists(self):
+        for name in ("a", "b"):
+            self.store.open(name).add_item(f"{name}のアイテム")
+        self.assertEqual(self.saved_names("a"), [])  # まだ書き戻していない
+        self.store.open("c").add_item("cのアイテム")
+        self.assertEqual(self.store.cache_info().currsize, 2)
+        self.assertEqual(self.saved_names("a"), ["aのアイテム"])  # 追い出しで書き戻した
+        self.assertEqual(self.saved_names("c"), [])
+
+    def test_open_returns_live_instance(self):
+        first = self.store.open("a")
+        self.assertIs(self.store.open("a"), first)
+        self.store.open("b").add_item("b")
+        self.store.open("c").add_item("c")  # "a" はキャッシュから追い出される
+        self.assertIs(self.store.open("a"), first)
+        info = self.store.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 4))
+        first.add_item("追い出し後の変更")
+        self.store.flush()
+        self.assertEqual(self.saved_names("a"), ["追い出し後の変更"])
+
+    def test_dropped_instance_is_reloaded(self):
+        shopping = self.store.open("a")
+        shopping.add_item("りんご")
+        del shopping
+        for name in ("b", "c"):
+            self.store.open(name).add_item(name)
+        gc.collect()
+        reopened = self.store.open("a")
+        reopened.add_item("パン")
+        self.assertEqual([item.name for item in reopened.get_items()], ["りんご", "パン"])
+        self.store.close()
+        self.assertEqual(self.saved_names("a"), ["りんご", "パン"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差分同期（changes_since()・apply_changes()）のテスト
+Tests for delta sync between ShoppingList replicas.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from shopping_backend import SQLiteBackend  # noqa: E402
+from shopping_item import format_timestamp  # noqa: E402
+from shopping_list import ShoppingList  # noqa: E402
+
+
+class SyncTestCase(unittest.TestCase):
+    """一時ディレクトリのファイルに保存するリストを使うテストの基底クラス"""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self.directory = self._directory.name
+
+    def make_list(self, name, **kwargs):
+        """一時ディレクトリのファイルに保存するリストを作成"""
+        shopping = ShoppingList(os.path.join(self.directory, name), **kwargs)
+        self.addCleanup(shopping.close)
+        return shopping
+
+
+def names(items):
+    """アイテム名のリスト"""
+    return [item.name for item in items]
+
+
+class SnapshotTest(SyncTestCase):
+    """差分のスナップショットの適用"""
+
+    def test_snapshot_overwrites_other_instance(self):
+        server = self.make_list("server.json", change_log_size=1)
+        for name in ("パン", "卵", "牛乳"):
+            server.add_item(name, 1, 100)
+        delta = server.changes_since(0)
+        self.assertIn('snapshot', delta)
+
+        replica = self.make_list("replica.json")
+        replica.add_item("りんご", 1, 100)
+        other = self.make_list("replica.json")
+        other.add_item("バナナ", 1, 100)  # replica が知らない更新
+        replica.apply_changes(delta)
+        self.assertEqual(names(replica.get_items()), ["パン", "卵", "牛乳"])
+        reopened = self.make_list("replica.json")
+        self.assertEqual(names(reopened.get_items()), ["パン", "卵", "牛乳"])
+
+
+def completed(shopping):
+    """完了済みアイテムの (名前, 完了日時) のリスト"""
+    return [(item.name, format_timestamp(item.completed_at))
+            for item in shopping.get_completed_items()]
+
+
+class ConflictTest(SyncTestCase):
+    """両側で同時に行った変更の解決（どちらの側で適用しても同じ結果になる）"""
+
+    EARLY = 1700000000.0
+    LATE = EARLY + 3600
+
+    def make_pair(self, prefix=""):
+        """同じアイテムを持つ2つのリストと、それぞれが最後に同期したリビジョン"""
+        first = self.make_list(f"{prefix}first.json")
+        first.add_items(["パン", "卵"])
+        second = self.make_list(f"{prefix}second.json")
+        second.apply_changes(first.changes_since(0))
+        return first, second, first.revision, second.revision
+
+    def sync_both(self, first, second, first_revision, second_revision):
+        """second → first、first → second の順に差分を適用して結果を返す"""
+        pushed = first.apply_changes(second.changes_since(second_revision))
+        pulled = second.apply_changes(first.changes_since(first_revision))
+        return pushed, pulled
+
+    def test_earliest_completion_wins(self):
+        for early_side in (0, 1):
+            with self.subTest(early_side=early_side):
+                pair = self.make_pair(f"{early_side}-")
+                lists = pair[:2]
+                lists[early_side].complete_by_id(1, self.EARLY)
+                lists[1 - early_side].complete_by_id(1, self.LATE)
+                pushed, pulled = self.sync_both(*pair)
+                expected = [("パン", format_timestamp(self.EARLY))]
+                self.assertEqual(completed(lists[0]), expected)
+                self.assertEqual(completed(lists[1]), expected)
+                self.assertEqual(pushed['conflicts'], [
+                    {'op': 'complete', 'id': 1, 'reason': 'completed',
+                     'completed_date': format_timestamp(self.EARLY)}])
+
+    def test_remove_wins_over_complete(self):
+        first, second, first_revision, second_revision = self.make_pair()
+        first.complete_by_id(1, self.EARLY)
+        second.remove_by_id(1)
+        pushed, pulled = self.sync_both(first, second, first_revision, second_revision)
+        for shopping in (first, second):
+            self.assertEqual([item.name for item in shopping.get_items()], ["卵"])
+            self.assertEqual(completed(shopping), [])
+        self.assertEqual(pushed['conflicts'], [{'op': 'remove', 'id': 1, 'reason': 'completed'}])
+        self.assertEqual(pulled['conflicts'], [])
+
+    def test_resolution_is_saved(self):
+        backends = {
+            'journal': lambda name: {'journal': True},
+            'sqlite': lambda name: {'backend': SQLiteBackend(
+                os.path.join(self.directory, "lists.db"), name)},
+        }
+        for label, options in backends.items():
+            with self.subTest(backend=label):
+                first = self.make_list(f"{label}1.json", **options("first"))
+                first.add_items(["パン", "卵"])
+                second = self.make_list(f"{label}2.json", **options("second"))
+                second.apply_changes(first.changes_since(0))
+                revision = second.revision
+                first.complete_by_id(1, self.EARLY)
+                first.complete_by_id(2, self.EARLY)
+                second.complete_by_id(1, self.LATE)
+                second.remove_by_id(2)
+                first.apply_changes(second.changes_since(revision))
+                first.close()
+                reopened = self.make_list(f"{label}1.json", **options("first"))
+                self.assertEqual(completed(reopened), [("パン", format_timestamp(self.EARLY))])
+                self.assertEqual(len(reopened.get_items()), 0)
+
+
+class TwoWaySyncTest(SyncTestCase):
+    """送信（apply_changes() と apply_ids()）と受信を繰り返す双方向の同期"""
+
+    def setUp(self):
+        super().setUp()
+        self.server = self.make_list("server.json")
+        self.server.add_item("牛乳")
+        self.client = self.make_list("client.json")
+        self.client_revision = 0  # クライアントが最後に受け取ったサーバーのリビジョン
+        self.pushed_revision = 0  # サーバーに最後に送ったクライアントのリビジョン
+        self.pull()
+
+    def push(self):
+        delta = self.client.changes_since(self.pushed_revision)
+        result = self.server.apply_changes(delta)
+        self.client.apply_ids(result['ids'])
+        self.pushed_revision = delta['revision']
+        return result
+
+    def pull(self):
+        delta = self.server.changes_since(self.client_revision)
+        result = self.client.apply_changes(delta)
+        self.client_revision = delta['revision']
+        return result
+
+    def assert_same_items(self):
+        """両方のリストが同じIDで同じアイテムを持つ"""
+        def items(shopping):
+            return sorted((item.id, item.name) for item in shopping.get_items())
+        self.assertEqual(items(self.client), items(self.server))
+
+    def test_push_then_pull_with_colliding_ids(self):
+        self.server.add_item("x")
+        self.client.add_item("y")  # サーバーの "x" と同じID
+        self.assertEqual(self.push()['ids'], {2: 3})
+        self.pull()
+        self.assertEqual(sorted(item.name for item in self.client.get_items()),
+                         ["x", "y", "牛乳"])
+        self.assert_same_items()
+        # 次の送信・受信で何も増えない
+        self.assertEqual(self.push()['applied'], 0)
+        self.assertEqual(self.pull()['applied'], 0)
+        self.assert_same_items()
+
+    def test_repeated_rounds(self):
+        for round in range(3):
+            self.server.add_item(f"サーバー{round}")
+            self.client.add_item(f"クライアント{round}a")
+            self.client.add_item(f"クライアント{round}b")
+            self.client.complete_item(0)
+            self.push()
+            self.pull()
+            self.assert_same_items()
+        self.assertEqual(len(self.client.get_items()), 7)
+        self.assertEqual(sorted(item.id for item in self.client.get_completed_items()),
+                         sorted(item.id for item in self.server.get_completed_items()))
+
+    def test_apply_ids_keeps_order_and_frees_targets(self):
+        self.client.add_items(["a", "b", "c"])  # ID 2, 3, 4
+        self.client.complete_by_id(2)
+        self.assertEqual(self.client.apply_ids({2: 3, 3: 4, 4: 9}), 3)
+        self.assertEqual([(item.id, item.name) for item in self.client.get_items()],
+                         [(1, "牛乳"), (4, "b"), (9, "c")])
+        self.assertEqual([item.id for item in self.client.get_completed_items()], [3])
+        self.assertEqual(self.client.find_by_name("c")[0].id, 9)
+        self.client.close()
+        reopened = self.make_list("client.json")
+        self.assertEqual([(item.id, item.name) for item in reopened.get_items()],
+                         [(1, "牛乳"), (4, "b"), (9, "c")])
+
+    def test_apply_ids_cycle_and_sqlite(self):
+        database = os.path.join(self.directory, "client.db")
+        client = self.make_list("unused.json", backend=SQLiteBackend(database))
+        client.add_items(["a", "b"])  # ID 1, 2
+        self.assertEqual(client.apply_ids({1: 2, 2: 1}), 2)
+        self.assertEqual([(item.id, item.name) for item in client.get_items()],
+                         [(2, "a"), (1, "b")])
+        client.close()
+        reopened = self.make_list("unused.json", backend=SQLiteBackend(database))
+        self.assertEqual([(item.id, item.name) for item in reopened.get_items()],
+                         [(2, "a"), (1, "b")])
+
+
+if __name__ == "__main__":
+    unittest.main()